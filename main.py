@@ -1,11 +1,20 @@
 # Standard library imports
 import sys
+import argparse
 import os
 import math
 import time
 import threading
 import datetime
 import pickle
+import struct
+import binascii
+import collections
+import re
+import csv
+import json
+import mmap
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from functools import partial
 from os import path
 
@@ -28,7 +37,7 @@ from pygrabber.dshow_graph import FilterGraph
 # Application code #
 
 class RobotArmApp:
-    def __init__(self):
+    def __init__(self, recordPath=None, replayPath=None, replayRealtime=True, simTimeScale=1.0, profilePath=None):
         self.root = ctk.CTk()
         self.root.title("Robot Arm Software Ver 6.0")
         self.root.iconbitmap(os.path.join('assets', 'EE.ico'))
@@ -50,13 +59,18 @@ class RobotArmApp:
             if messagebox.askokcancel("Close Program", "Do you want to quit?"):
                 try:
                     command = "CL"
-                    if self.ser:
-                        self.ser.write(command.encode())
+                    for session in self.sessions:
+                        if session.teensy:
+                            session.teensy.write(command)
                 except Exception as e:
                     print("Error in closing command:", e)
                 finally:
-                    if self.ser:
-                        self.ser.close()
+                    for session in self.sessions:
+                        session.close()
+                    self.auxPorts.closeAll()
+                    if self.recorder:
+                        self.recorder.close()
+                    self.programJournal.close()
                     self.root.destroy()
 
         self.root.wm_protocol("WM_DELETE_WINDOW", on_closing)
@@ -102,7 +116,25 @@ class RobotArmApp:
         self.SplineTrue = False
         self.gcodeSpeed = "10"
         self.inchTrue = False
-        self.moveInProc = 0
+        self.lookaheadDepth = 3
+        # Seconds to wait for the controller to answer a setup command (UP, SE, CE)
+        self.setupTimeout = 2.0
+        self.telemetryInterval = 0.1
+        # Main Controls tab (the position readout) on screen, kept by pumpExecutorEvents
+        self.positionShown = True
+        # Opt-in per-row profile, exported to profilePath when the app closes
+        self.profilePath = profilePath
+        # Each arm's links, executor, program, registers and telemetry live on a RobotSession
+        self.sessions = []
+        self.activeSession = self.addSession("Robot 1")
+        self.programCache = ProgramCache()
+        self.programJournal = ProgramJournal(self.programCache, onError=self.reportJournalError)
+        self.shownProgram = None
+        self.progViewPage = 500
+        self.executorEvents = collections.deque()
+        self.executorRefresh = 50
+        self.activeSession.executor.subscribe(self.progexec.followExecutor)
+        self.root.after(self.executorRefresh, self.progexec.pumpExecutorEvents)
         self.cropping = False
         self.cam_on = False
         self.cap = None
@@ -128,9 +160,19 @@ class RobotArmApp:
         self.J9NegLim = 0
 
         # Initialize serial connection
-        self.ser = None
-        self.ser2 = None
-        self.ser3 = None
+        self.auxPorts = AuxSerialPool()
+
+        # Serial traffic capture and playback (ports 2n Teensy and 2n + 1 IO board of the n-th robot)
+        self.recorder = SerialRecorder(recordPath) if recordPath else None
+        self.replay = None
+        if replayPath:
+            events = SerialRecorder.load(replayPath)
+            portIds = {0, 1} | {event[1] for event in events}
+            self.replay = {portId: ReplayPort(events, portId, replayRealtime) for portId in portIds}
+
+        # Simulated controllers, used when a COM field is set to SIM
+        self.simulators = {}
+        self.simTimeScale = simTimeScale
 
         # Define Tabs
         self.nb = ctk.CTkTabview(self.root, width=1536, height=792)
@@ -1204,10 +1246,15 @@ class RobotArmApp:
             text="Stop", 
             width=80,
             image=ctk.CTkImage(Image.open(os.path.join('assets', 'stop-icon.png'))), 
-            command=self.progexec.stopProg
+            command=lambda: self.progexec.stopProg(self.activeSession)
         )
         self.stopProgBut.place(x=220, y=80)
 
+        self.cycleTimeBut = ctk.CTkButton(
+            self.tab1, text="Cycle Time", width=80, command=self.progfunc.estimateCycleTime
+        )
+        self.cycleTimeBut.place(x=305, y=80)
+
         self.revBut = ctk.CTkButton(
             self.tab1, text="REV", width=50, command=self.progexec.stepRev
         )
@@ -1655,13 +1702,24 @@ class RobotArmApp:
         self.comPortBut3 = ctk.CTkButton(self.tab2, text="Test Aux COM Device", command=self.TestAuxCom, width=140)
         self.comPortBut3.place(x=50, y=315)
 
+        self.sessionLab = ctk.CTkLabel(self.tab2, text="Robot")
+        self.sessionLab.place(x=102, y=355)
+
+        self.sessionMenu = ctk.CTkOptionMenu(
+            self.tab2, values=[session.name for session in self.sessions], width=100, command=self.selectSession
+        )
+        self.sessionMenu.place(x=30, y=385)
+
+        self.addSessionBut = ctk.CTkButton(self.tab2, text="Add Robot", command=self.newSession, width=80)
+        self.addSessionBut.place(x=140, y=385)
+
         self.lightBut = ctk.CTkButton(self.tab2, text="Light", command=self.lightTheme, width=60)
         self.lightBut.place(x=890, y=90)
 
         self.darkBut = ctk.CTkButton(self.tab2, text="Dark", command=self.darkTheme, width=60)
         self.darkBut.place(x=950, y=90)
 
-        self.autoCalBut = ctk.CTkButton(self.tab2, text="Auto Calibrate", command=self.calRobotAll, width=120)
+        self.autoCalBut = ctk.CTkButton(self.tab2, text="Auto Calibrate", command=lambda: self.calRobotAll(self.activeSession), width=120)
         self.autoCalBut.place(x=285, y=90)
 
         # Calibration Checkboxes
@@ -2473,6 +2531,9 @@ class RobotArmApp:
 
         for index in range(16):  # 0 to 15
             setattr(self, f"R{index + 1}EntryField", self.R_entry_fields[index])
+            # Fields are views of the register bank; typed values are written back
+            self.R_entry_fields[index].bind("<FocusOut>", partial(self.progexec.storeRegisterField, index + 1, None))
+            self.R_entry_fields[index].bind("<Return>", partial(self.progexec.storeRegisterField, index + 1, None))
 
         # Create SP fields
         self.SP_entry_fields = {}
@@ -2489,6 +2550,8 @@ class RobotArmApp:
             group_key = f"E{group}"
             for index in range(16):  # 1 to 16
                 setattr(self, f"SP_{index + 1}_{group_key}_EntryField", self.SP_entry_fields[group_key][index])
+                self.SP_entry_fields[group_key][index].bind("<FocusOut>", partial(self.progexec.storeRegisterField, index + 1, group))
+                self.SP_entry_fields[group_key][index].bind("<Return>", partial(self.progexec.storeRegisterField, index + 1, group))
 
         ## TAB 6 LABELS ##
 
@@ -3096,6 +3159,8 @@ class RobotArmApp:
             "J7CalStatVal2": ("192.0", "193.0"),
             "J8CalStatVal2": ("193.0", "194.0"),
             "J9CalStatVal2": ("194.0", "195.0"),
+            "comBaud": ("195.0", "196.0"),
+            "com2Baud": ("196.0", "197.0"),
         }
 
         # Loop through the mapping and extract values
@@ -3466,14 +3531,8 @@ class RobotArmApp:
 
     def startup(self):
         self.updateParams()
-        time.sleep(0.1)
-
         self.calExtAxis()
-        time.sleep(0.1)
-
         self.sendPos()
-        time.sleep(0.1)
-
         self.requestPos()
 
     def darkTheme(self):
@@ -3484,13 +3543,84 @@ class RobotArmApp:
         self.curTheme = 1
         ctk.set_appearance_mode("light")
 
+    # Robot session defs #
+
+    def addSession(self, name):
+        session = RobotSession(self, name, 2 * len(self.sessions))
+        if self.sessions:
+            session.comBaud, session.com2Baud = self.activeSession.comBaud, self.activeSession.com2Baud
+        self.sessions.append(session)
+        return session
+
+    def newSession(self):
+        session = self.addSession(f"Robot {len(self.sessions) + 1}")
+        self.sessionMenu.configure(values=[s.name for s in self.sessions])
+        self.sessionMenu.set(session.name)
+        self.selectSession(session.name)
+
+    def selectSession(self, name):
+        session = next(s for s in self.sessions if s.name == name)
+        if session is self.activeSession:
+            return
+        self.activeSession.executor.unsubscribe(self.progexec.followExecutor)
+        self.activeSession = session
+        self.executorEvents.clear()
+        session.executor.subscribe(self.progexec.followExecutor)
+
+        # Show the selected arm's ports, program, row and registers
+        for field, port in ((self.comPortEntryField, session.comPort), (self.com2PortEntryField, session.com2Port)):
+            field.delete(0, 'end')
+            field.insert(0, port)
+        self.showProgram(session.program)
+        self.showCurrentRow(session.executor.pc)
+        session.registers.markAll()
+        self.showRegisters()
+        status = "SYSTEM READY" if session.teensy else "NO CONTROLLER CONNECTED"
+        self.almStatusLab.configure(text=f"{name} - {status}", text_color="green", font=('Arial', 10, 'bold'))
+        self.almStatusLab2.configure(text=f"{name} - {status}", text_color="green", font=('Arial', 10, 'bold'))
+        # An error the arm's rows hit while it was in the background
+        if session.lastError:
+            self.errorStatusLabel.configure(text=f"{name} - {session.lastError}", text_color="red", font=('Arial', 10, 'bold'))
+
     # Communication defs #
 
+    def portOpener(self, portId):
+        # Ports come from the replay log, the simulator or the device, recorded when a log is open
+        if self.replay:
+            def openReplay(port, baud, timeout=None):
+                return self.replay[portId].reopen(baud, timeout)
+            return openReplay
+
+        def openPort(port, baud, timeout=None):
+            if port.upper().endswith("SIM"):
+                if portId not in self.simulators:
+                    self.simulators[portId] = SimulatedTeensy(self.simTimeScale)
+                ser = self.simulators[portId].reopen(baud, timeout)
+            else:
+                ser = serial.Serial(port, baud, timeout=timeout)
+            return self.recorder.wrap(ser, portId) if self.recorder else ser
+        return openPort
+
     def setCom(self):
+        session = self.activeSession
         try:
+            session.comPort = self.comPortEntryField.get()
             port = "COM" + self.comPortEntryField.get()
-            baud = 9600
-            self.ser = serial.Serial(port, baud)
+            if session.teensy:
+                session.teensy.close()
+            session.ser, baud = BaudNegotiation.connect(port, 9600, session.comBaud, self.portOpener(session.portBase))
+            session.comBaud = str(baud)
+            framing = BinaryFraming.negotiate(session.ser)
+            streaming = PositionTelemetry.negotiate(session.ser, self.telemetryInterval)
+            sequenced = SerialTransport.negotiateSequencing(session.ser)
+            session.teensy = SerialTransport(session.ser, "TEENSY 4.1 CONTROLLER", framing, sequenced)
+            session.telemetry.attach(
+                session.teensy, self.telemetryInterval, streaming,
+                lambda: session.executor.running or (session is self.activeSession and self.positionShown),
+            )
+            if session.profiler:
+                session.profiler.watch(session.teensy)
+            session.lookahead = MotionLookahead(session.teensy, self.lookaheadDepth)
 
             # Update status labels
             self.almStatusLab.configure(text="SYSTEM READY", text_color="green", font=('Arial', 10, 'bold'))
@@ -3498,14 +3628,13 @@ class RobotArmApp:
 
             # Log success
             Curtime = datetime.datetime.now().strftime("%B %d %Y - %I:%M%p")
+            protocol = "BINARY" if framing else "ASCII"
             self.ElogView.insert(
-                "end", f"{Curtime} - COMMUNICATIONS STARTED WITH TEENSY 4.1 CONTROLLER"
+                "end", f"{Curtime} - COMMUNICATIONS STARTED WITH TEENSY 4.1 CONTROLLER AT {baud} BAUD ({protocol} FRAMING)"
             )
             value = self.ElogView.get("1.0", "end")
             pickle.dump(value, open("ErrorLog", "wb"))
 
-            time.sleep(0.1)
-            self.ser.flushInput()
             self.startup()
 
         except:
@@ -3524,11 +3653,34 @@ class RobotArmApp:
             value = self.ElogView.get("1.0", "end")
             pickle.dump(value, open("ErrorLog", "wb"))
 
+    def reportIOError(self, command, error):
+        # Called on the IO worker thread for commands nobody waits on; Tk runs the update
+        message = f"IO BOARD COMMAND {command.strip()} FAILED: {error}"
+        self.root.after(0, lambda: self.errorStatusLabel.configure(
+            text=message, text_color="red", font=('Arial', 10, 'bold')))
+
+    def reportJournalError(self, path, error):
+        # Called on the journal thread when edits could not be folded into the program
+        message = f"PROGRAM {os.path.basename(path)} NOT SAVED: {error}"
+        self.root.after(0, lambda: self.errorStatusLabel.configure(
+            text=message, text_color="red", font=('Arial', 10, 'bold')))
+
     def setCom2(self):
+        session = self.activeSession
         try:
+            session.com2Port = self.com2PortEntryField.get()
             port = "COM" + self.com2PortEntryField.get()
-            baud = 115200
-            self.ser2 = serial.Serial(port, baud)
+            if session.ioWorker:
+                session.ioWorker.close()
+            if session.ioBoard:
+                session.ioBoard.close()
+            session.ser2, baud = BaudNegotiation.connect(port, 115200, session.com2Baud, self.portOpener(session.portBase + 1))
+            session.com2Baud = str(baud)
+            events = IOWorker.negotiateEvents(session.ser2)
+            session.ioBoard = SerialTransport(session.ser2, "ARDUINO IO BOARD")
+            session.ioWorker = IOWorker(session.ioBoard, self.reportIOError, events)
+            if session.profiler:
+                session.profiler.watch(session.ioBoard)
 
             # Update status labels
             self.almStatusLab.configure(text="SYSTEM READY", text_color="green", font=('Arial', 10, 'bold'))
@@ -3536,8 +3688,9 @@ class RobotArmApp:
 
             # Log success
             Curtime = datetime.datetime.now().strftime("%B %d %Y - %I:%M%p")
+            mode = "INPUT EVENTS" if events else "INPUT QUERIES"
             self.ElogView.insert(
-                "end", f"{Curtime} - COMMUNICATIONS STARTED WITH ARDUINO IO BOARD"
+                "end", f"{Curtime} - COMMUNICATIONS STARTED WITH ARDUINO IO BOARD AT {baud} BAUD ({mode})"
             )
             value = self.ElogView.get("1.0", "end")
             pickle.dump(value, open("ErrorLog", "wb"))
@@ -3557,76 +3710,30 @@ class RobotArmApp:
 
 class ProgExec:
     def runProg(self):
-        def threadProg():
-            self.estopActive = False
-            self.posOutreach = False
-            self.stopQueue = "0"
-            self.splineActive = "0"
-            try:
-                curRow = self.progView.curselection()[0]
-                if curRow == 0:
-                    curRow = 1
-            except:
+        self.estopActive = False
+        self.posOutreach = False
+        self.stopQueue = "0"
+        self.splineActive = "0"
+        try:
+            curRow = self.progView.curselection()[0]
+            if curRow == 0:
                 curRow = 1
-                self.progView.selection_clear("1.0", "end")
-                self.progView.select_set(curRow)
-
-            self.tab1.runTrue = 1
-            while self.tab1.runTrue == 1:
-                if (self.tab1.runTrue == 0):
-                    if self.estopActive:
-                        self.almStatusLab.configure(
-                            text="Estop Button was Pressed", fg_color="red")
-                    elif self.posOutreach:
-                        self.almStatusLab.configure(
-                            text="Position Out of Reach", fg_color="red")
-                    else:
-                        self.almStatusLab.configure(
-                            text="PROGRAM STOPPED", fg_color="red")
-                else:
-                    self.almStatusLab.configure(
-                        text="PROGRAM RUNNING", fg_color="green")
-
-                rowInProc = True
-                self.executeRow()
-                while rowInProc:
-                    time.sleep(0.1)
-
-                selRow = self.progView.curselection()[0]
-                last = self.progView.index('end')
-                self.progView.selection_clear("1.0", "end")
-                selRow += 1
-                self.progView.select_set(selRow)
-                curRow += 1
-                time.sleep(0.1)
+        except IndexError:
+            curRow = 1
 
-                try:
-                    selRow = self.progView.curselection()[
-                        0]
-                    self.curRowEntryField.delete(0, 'end')
-                    self.curRowEntryField.insert(0, selRow)
-                except:
-                    self.curRowEntryField.delete(0, 'end')
-                    self.curRowEntryField.insert(0, "---")
-                    self.tab1.runTrue = 0
-                    if self.estopActive:
-                        self.almStatusLab.configure(
-                            text="Estop Button was Pressed", fg_color="red")
-                    elif self.posOutreach:
-                        self.almStatusLab.configure(
-                            text="Position Out of Reach", fg_color="red")
-                    else:
-                        self.almStatusLab.configure(
-                            text="PROGRAM STOPPED", fg_color="red")
-        t = threading.Thread(target=threadProg)
-        t.start()
+        # The executor runs the rows on its own thread; the view follows its events
+        self.activeSession.executor.start(curRow)
 
     def stepFwd(self):
+        session = self.activeSession
         self.estopActive = False
         self.posOutreach = False
+        if session.executor.running:
+            return
         self.almStatusLab.configure(text="SYSTEM READY", fg_color="green")
-        self.executeRow()
         selRow = self.progView.curselection()[0]
+        session.executor.seek(selRow)
+        session.executor.step()
         last = self.progView.index('end')
         for row in range(0, selRow):
             self.progView.itemconfig(
@@ -3635,23 +3742,19 @@ class ProgExec:
         for row in range(selRow + 1, last):
             self.progView.itemconfig(
                 row, {'fg': 'black'})
-        self.progView.selection_clear("1.0", "end")
-        selRow += 1
-        self.progView.select_set(selRow)
-        try:
-            selRow = self.progView.curselection()[0]
-            self.curRowEntryField.delete(0, 'end')
-            self.curRowEntryField.insert(0, selRow)
-        except:
-            self.curRowEntryField.delete(0, 'end')
-            self.curRowEntryField.insert(0, "---")
 
     def stepRev(self):
+        session = self.activeSession
         self.estopActive = False
         self.posOutreach = False
+        if session.executor.running:
+            return
         self.almStatusLab.configure(text="SYSTEM READY", fg_color="green")
-        self.executeRow()
         selRow = self.progView.curselection()[0]
+        session.executor.seek(selRow)
+        session.executor.step()
+        if session.executor.pc == selRow + 1:
+            session.executor.seek(selRow - 1)
         last = self.progView.index('end')
         for row in range(0, selRow):
             self.progView.itemconfig(
@@ -3660,35 +3763,135 @@ class ProgExec:
         for row in range(selRow + 1, last):
             self.progView.itemconfig(
                 row, {'fg': 'tomato2'})
-        self.progView.selection_clear("1.0", "end")
-        selRow -= 1
-        self.progView.select_set(selRow)
-        try:
-            selRow = self.progView.curselection()[0]
-            self.curRowEntryField.delete(0, 'end')
-            self.curRowEntryField.insert(0, selRow)
-        except:
-            self.curRowEntryField.delete(0, 'end')
-            self.curRowEntryField.insert(0, "---")
 
-    def stopProg(self):
-        self.tab1.runTrue = 0
+    def stopProg(self, session):
+        session.executor.stop()
+        if session.lookahead:
+            session.lookahead.flush()
+        if session.ioWorker:
+            session.ioWorker.interrupt()
+        self.almStatusLab.configure(text=self.stopStatus(), fg_color="red")
+
+    def stopStatus(self):
         if self.estopActive:
-            self.almStatusLab.configure(
-                text="Estop Button was Pressed", fg_color="red")
-        elif self.posOutreach:
-            self.almStatusLab.configure(
-                text="Position Out of Reach", fg_color="red")
+            return "Estop Button was Pressed"
+        if self.posOutreach:
+            return "Position Out of Reach"
+        return "PROGRAM STOPPED"
+
+    def followExecutor(self, event, *args):
+        # Called on the executor thread; Tk is only touched from pumpExecutorEvents
+        self.executorEvents.append((event, args))
+
+    def pumpExecutorEvents(self):
+        # Repaint from the main loop at executorRefresh, showing only the latest row
+        paintStart = time.perf_counter()
+        row, status = None, None
+        while self.executorEvents:
+            event, args = self.executorEvents.popleft()
+            if event == "program":
+                if args[0] is not self.shownProgram:
+                    self.showProgram(args[0])
+            elif event in ("row", "pc"):
+                row = args[0]
+            elif event == "started":
+                status = ("PROGRAM RUNNING", "green")
+            elif event == "error":
+                self.reportRowError(*args)
+            elif event == "stopped":
+                row = args[0]
+                status = (self.stopStatus(), "red")
+        if row is not None:
+            self.showCurrentRow(row)
+        if status:
+            self.almStatusLab.configure(text=status[0], fg_color=status[1])
+        self.showRegisters()
+        if self.activeSession.profiler and row is not None:
+            self.activeSession.profiler.addUi(time.perf_counter() - paintStart)
+        self.positionShown = self.nb.get() == "Main Controls"
+        self.root.after(self.executorRefresh, self.pumpExecutorEvents)
+
+    def reportRowError(self, row, error):
+        # The arm already dropped its streamed moves and IO waits (RobotSession.followExecutor)
+        message = f"Row {row + 1} Failed - {error}"
+        self.errorStatusLabel.configure(text=message, text_color="red", font=('Arial', 10, 'bold'))
+        Curtime = datetime.datetime.now().strftime("%B %d %Y - %I:%M%p")
+        self.ElogView.insert("end", f"{Curtime} - {message}")
+        pickle.dump(self.ElogView.get("1.0", "end"), open("ErrorLog", "wb"))
+
+    def registerField(self, reg_num, element):
+        if element is None:
+            return getattr(self, f"R{reg_num}EntryField")
+        return getattr(self, f"SP_{reg_num}_E{element}_EntryField")
+
+    def showRegisters(self):
+        # Refresh only the fields whose registers changed since the last repaint
+        session = self.activeSession
+        for reg_num, element in session.registers.takeChanged():
+            if element is None:
+                value = session.registers.get(reg_num)
+            else:
+                value = session.registers.getPosition(reg_num, element)
+            field = self.registerField(reg_num, element)
+            field.delete(0, 'end')
+            field.insert(0, str(value))
+
+    def storeRegisterField(self, reg_num, element, event=None):
+        field = self.registerField(reg_num, element)
+        try:
+            if element is None:
+                self.activeSession.registers.set(reg_num, int(field.get()))
+            else:
+                self.activeSession.registers.setPosition(reg_num, element, float(field.get()))
+        except ValueError:
+            self.errorStatusLabel.configure(text=f"Invalid Register Value: {field.get()}", text_color="red", font=('Arial', 10, 'bold'))
+
+    def showCurrentRow(self, row):
+        self.pageProgView(row + self.progViewPage)
+        self.progView.selection_clear(0, "end")
+        self.curRowEntryField.delete(0, 'end')
+        if 0 <= row < self.progView.size():
+            self.progView.select_set(row)
+            self.progView.see(row + 2)
+            self.curRowEntryField.insert(0, row)
         else:
-            self.almStatusLab.configure(text="PROGRAM STOPPED", fg_color="red")
+            self.curRowEntryField.insert(0, "---")
 
-    def executeRow(self):
-        selRow = self.progView.curselection()[0]
-        self.progView.see(selRow + 2)
-        command = self.progView.get(selRow).strip()
-        cmdType = command[:6]
+    def showCommand(self, session, command):
+        # Every arm's rows share the GUI's fields; only the arm selected there fills them
+        if session is self.activeSession:
+            self.cmdSentEntryField.delete(0, 'end')
+            self.cmdSentEntryField.insert(0, command)
+
+    def showResponse(self, session, response):
+        if session is self.activeSession:
+            self.manEntryField.delete(0, 'end')
+            self.manEntryField.insert(0, response)
+
+    def showError(self, session, message):
+        # An arm in the background keeps its error for selectSession to show
+        session.lastError = message
+        if session is self.activeSession:
+            self.errorStatusLabel.configure(text=message, text_color="red", font=('Arial', 10, 'bold'))
+
+    def showStatus(self, session, message, color):
+        if session is self.activeSession:
+            self.almStatusLab.configure(text=message, text_color=color, font=('Arial', 10, 'bold'))
+            self.almStatusLab2.configure(text=message, text_color=color, font=('Arial', 10, 'bold'))
+
+    def executeRow(self, session, selRow):
+        parseStart = time.perf_counter()
+        try:
+            instruction = session.program.at(selRow)
+            if session.profiler:
+                session.profiler.add("parse", time.perf_counter() - parseStart)
+        except ProgramCompileError as e:
+            self.showError(session, str(e))
+            self.stopProg(session)
+            return
+        command = instruction.text
 
-        # Dictionary mapping command types to methods
+        # Dictionary mapping command types to methods, each called with the arm running the row
         command_map = {
             "Call P": self.callProgram,
             "Run Gc": self.runGcodeProgram,
@@ -3704,14 +3907,14 @@ class ProgExec:
             "TifOn ": self.processInputOnJump,
             "TifOff": self.processInputOffJump,
             "Jump T": self.processJumpToRow,
-            "Out On": lambda cmd: self.processSetOutputOn(cmd, self.ser2),
-            "Out Of": lambda cmd: self.processSetOutputOff(cmd, self.ser2),
-            "ToutOn": lambda cmd: self.processSetOutputOn(cmd, self.ser),
-            "ToutOf": lambda cmd: self.processSetOutputOff(cmd, self.ser),
-            "Wait I": lambda cmd: self.processWaitInputOn(cmd, self.ser2),
-            "Wait O": lambda cmd: self.processWaitInputOff(cmd, self.ser2),
-            "TwaitI": lambda cmd: self.processWaitInputOn(cmd, self.ser),
-            "TwaitO": lambda cmd: self.processWaitInputOff(cmd, self.ser),
+            "Out On": lambda session, cmd: self.processSetOutputOn(session, cmd, session.ioWorker),
+            "Out Of": lambda session, cmd: self.processSetOutputOff(session, cmd, session.ioWorker),
+            "ToutOn": lambda session, cmd: self.processSetOutputOn(session, cmd, session.teensy),
+            "ToutOf": lambda session, cmd: self.processSetOutputOff(session, cmd, session.teensy),
+            "Wait I": lambda session, cmd: self.processWaitInputOn(session, cmd, session.ioWorker),
+            "Wait O": lambda session, cmd: self.processWaitInputOff(session, cmd, session.ioWorker),
+            "TwaitI": lambda session, cmd: self.processWaitInputOn(session, cmd, session.teensy),
+            "TwaitO": lambda session, cmd: self.processWaitInputOff(session, cmd, session.teensy),
             "Wait T": self.processWaitTime,
             "Regist": self.processSetRegister,
             "Positi": self.processSetPositionRegister,
@@ -3734,115 +3937,154 @@ class ProgExec:
         }
 
         # Call the appropriate command function if it exists in the map
-        command_func = command_map.get(cmdType)
+        command_func = command_map.get(instruction.kind)
         if command_func:
-            command_func(command)
+            command_func(session, command)
+
+    def buildMotionCommand(self, session, command, rzReference=None):
+        if command[:6] == "Move L":
+            return self.buildMoveL(session, command, rzReference)
+        builders = {
+            "Move J": self.buildMoveJ,
+            "Move R": self.buildMoveR,
+        }
+        return builders[command[:6]](session, command)
+
+    def sendMotionRow(self, session, command, formattedCommand):
+        # Pick up the reply for a row look-ahead already streamed, otherwise send it now
+        selRow = session.executor.pc
+        running = session.executor.running and session.lookahead is not None
+        future = session.lookahead.take(selRow, command) if running else None
+        if future is None:
+            future = session.teensy.submit(formattedCommand)
+
+        # Keep the controller fed with the motion rows that follow while this one runs
+        if running and session.executor.running:
+            session.lookahead.fill(selRow, session.program.textAt, partial(self.buildMotionCommand, session), formattedCommand)
+
+        # An error halts the program, and the rows streamed after it must not run
+        response = future.result()
+        if response.startswith('E') and session.lookahead:
+            session.executor.stop()
+            session.lookahead.flush()
+        return response
+
+    def showMovePosition(self, session, response):
+        # Error replies go to the status label, anything else must decode to a position
+        if response.startswith('E'):
+            self.showError(session, response)
+            return None
+        try:
+            sample = ReplyParser.parse(response)
+        except ReplyFormatError as e:
+            errorMsg = f"Failed to display position: {str(e)}"
+            self.showError(session, errorMsg)
+            return None
+        if session is not self.activeSession:
+            return sample
+
+        position_fields = [
+            self.PositionXField, self.PositionYField, self.PositionZField,
+            self.PositionRzField, self.PositionRyField, self.PositionRxField
+        ]
+        for field, value in zip(position_fields, sample.cartesian()):
+            field.delete(0, 'end')
+            field.insert(0, value)
+        return sample
 
-    def callProgram(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
-        lastRow = self.progView.curselection()[0]
-        lastProg = self.ProgEntryField.get()
+    def callProgram(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Extract the program number
         programIndex = command.find("Program -")
         progNum = command[programIndex + 10:].strip()
+        self.enterProgram(session, progNum)
 
-        self.ProgEntryField.delete(0, 'end')
-        self.ProgEntryField.insert(0, progNum)
-        self.callProg(progNum)
+    def enterProgram(self, session, name):
+        try:
+            program = self.programCache.get(name)
+        except OSError:
+            self.showError(session, f"Unable to Open Program {name}")
+            self.stopProg(session)
+            return
 
-        time.sleep(0.4)
-        self.progView.selection_clear("1.0", "end")
-        self.progView.select_set(0)
+        # Push the caller so Return can resume on the row after this one
+        session.executor.call(session.program, session.executor.pc)
+        self.activateProgram(session, program)
+        session.executor.jump(0)
 
-    def runGcodeProgram(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
-        lastRow = self.progView.curselection()[0]
-        lastProg = self.ProgEntryField.get()
+    def runGcodeProgram(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         programIndex = command.find("Program -")
         filename = command[programIndex + 10:].strip()
 
-        self.manEntryField.delete(0, 'end')
-        self.manEntryField.insert(0, filename)
-
-        self.GCplayProg(filename)
+        self.showResponse(session, filename)
 
-        time.sleep(0.4)
-        self.progView.selection_clear("1.0", "end")
-        self.progView.select_set(0)
-
-    def returnProgram(self):
-        if self.moveInProc:
-            self.moveInProc = 2
-        lastRow = lastRow
-        lastProg = lastProg
-
-        self.ProgEntryField.delete(0, 'end')
-        self.ProgEntryField.insert(0, lastProg)
-        self.callProg(lastProg)
+        # The controller answers PG once the file has played
+        self.GCplayProg(session, filename).result()
+        session.executor.jump(0)
 
-        time.sleep(0.4)
-        self.progView.selection_clear("1.0", "end")
-        self.progView.select_set(lastRow)
+    def returnProgram(self, session, command=None):
+        if session.moveInProc:
+            session.moveInProc = 2
+        frame = session.executor.ret()
+        if frame is None:
+            self.showError(session, "Return Without Call Program")
+            self.stopProg(session)
+            return
+        lastProg, lastRow = frame
+        self.activateProgram(session, lastProg)
+        session.executor.jump(lastRow + 1)
 
-    def testLimitSwitches(self):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def testLimitSwitches(self, session, command=None):
+        if session.moveInProc:
+            session.moveInProc = 2
         command = "TL\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, command)
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.05)
-        response = str(self.ser.readline().strip(), 'utf-8')
-        self.manEntryField.delete(0, 'end')
-        self.manEntryField.insert(0, response)
-
-    def setEncoders(self):
-        if self.moveInProc:
-            self.moveInProc = 2
+        self.showCommand(session, command)
+        response = session.teensy.send(command)
+        self.showResponse(session, response)
+
+    def setEncoders(self, session, command=None):
+        if session.moveInProc:
+            session.moveInProc = 2
         command = "SE\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, command)
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.05)
-        self.ser.read()
-
-    def readEncoders(self):
-        if self.moveInProc:
-            self.moveInProc = 2
+        self.showCommand(session, command)
+        self.sendSetup(session, command)
+
+    def sendSetup(self, session, command):
+        # Runs on the Tk thread, so a controller that never answers is reported, not waited on
+        try:
+            return session.teensy.send(command, self.setupTimeout)
+        except FutureTimeoutError:
+            message = f"No Reply To {command[:2]} Command - Check Controller Connection"
+            self.showError(session, message)
+            return None
+
+    def readEncoders(self, session, command=None):
+        if session.moveInProc:
+            session.moveInProc = 2
         command = "RE\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, command)
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.05)
-        response = str(self.ser.readline().strip(), 'utf-8')
-        self.manEntryField.delete(0, 'end')
-        self.manEntryField.insert(0, response)
-
-    def sendServoCommand(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
+        self.showCommand(session, command)
+        response = session.teensy.send(command)
+        self.showResponse(session, response)
+
+    def sendServoCommand(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
         servoIndex = command.find("number ")
         posIndex = command.find("position: ")
         servoNum = command[servoIndex + 7: posIndex - 4].strip()
         servoPos = command[posIndex + 10:].strip()
         command = f"SV{servoNum}P{servoPos}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, command)
-        self.ser2.write(command.encode())
-        self.ser2.flushInput()
-        time.sleep(0.1)
-        self.ser2.read()
+        self.showCommand(session, command)
+        session.ioWorker.submit(command)
 
-    def processIfInput(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processIfInput(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Parsing command
         args = ("# ", "= ", ": ")
@@ -3850,46 +4092,33 @@ class ProgExec:
             command[command.find(arg) + len(arg):].split()[0] for arg in args
         ]
 
-        # Send query command
+        # Query the input, a state read moments ago comes from the IO worker's cache
         query_cmd = f"JFX{input_num}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, query_cmd)
-        self.ser2.write(query_cmd.encode())
-        self.ser2.flushInput()
-        time.sleep(0.1)
+        self.showCommand(session, query_cmd)
 
-        # Read and evaluate serial response
-        response = str(self.ser2.readline().strip(), 'utf-8')
-        query = 1 if response == "T" else 0
-        if query == val_num:
+        query = 1 if session.ioWorker.input(int(input_num)) else 0
+        if query == int(val_num):
             if action == "Call":
-                self.tab1.lastRow = self.progView.curselection()[0]
-                self.tab1.lastProg = self.ProgEntryField.get()
                 prog_name = command[command.find("Prog") + 5:] + ".ar"
-                self.callProg(prog_name)
-
-                index = 0
-                self.progView.selection_clear("1.0", "end")
-                self.progView.select_set(index)
+                self.enterProgram(session, prog_name)
 
             elif action == "Jump":
                 tab_num = command[command.find("Tab") + 4:]
-                encoded_tab = ("Tab Number " + tab_num + "\r\n").encode('utf-8')
-                index = self.progView.get("1.0", "end").index(encoded_tab) - 1
-                self.progView.selection_clear("1.0", "end")
-                self.progView.select_set(index)
+                self.jumpToTab(session, tab_num)
 
-    def processReadCom(self, command):
+    def processReadCom(self, session, command):
         # Parsing command arguments
         args = ("# ", "Char: ", ": ")
         com_num, char_num = [
             command[command.find(arg) + len(arg):].split()[0] for arg in args
         ]
 
-        # Attempt to establish serial communication
+        # Read through the pooled connection, opened on first use
         try:
-            self.ser3 = serial.Serial(f"COM{com_num}", 115200, timeout=10)
-        except:
+            response = self.auxPorts.read(
+                f"COM{com_num}", int(char_num) if char_num.isdigit() else None, timeout=10
+            )
+        except (serial.SerialException, OSError):
             timestamp = datetime.datetime.now().strftime("%B %d %Y - %I:%M%p")
             error_message = f"{timestamp} - UNABLE TO ESTABLISH COMMUNICATIONS WITH SERIAL DEVICE"
             self.ElogView.insert("end", error_message)
@@ -3897,21 +4126,15 @@ class ProgExec:
             pickle.dump(error_log, open("ErrorLog", "wb"))
             return
 
-        # Read the serial response
-        response = (
-            str(self.ser3.read(int(char_num)).strip(), 'utf-8')
-            if char_num.isdigit()
-            else str(self.ser3.readline().strip(), 'utf-8')
-        )
-
         # Update entry fields with the response
-        for field in [self.com3outPortEntryField, self.manEntryField]:
-            field.delete(0, 'end')
-            field.insert(0, response)
+        if session is self.activeSession:
+            for field in [self.com3outPortEntryField, self.manEntryField]:
+                field.delete(0, 'end')
+                field.insert(0, response)
 
-    def processIfRegister(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processIfRegister(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Parse command to get input number, value number, and action
         args = ("# ", "= ", ": ")
@@ -3920,30 +4143,21 @@ class ProgExec:
         ]
 
         # Get register value
-        reg_value = int(eval(f"R{input_num}EntryField").get())
+        reg_value = session.registers.get(int(input_num))
 
         # Check if register value matches
-        if reg_value == val_num:
+        if reg_value == int(val_num):
             if action == "Call":
-                self.tab1.lastRow = self.progView.curselection()[0]
-                self.tab1.lastProg = self.ProgEntryField.get()
                 prog_name = command[command.find("Prog") + 5:] + ".ar"
-                self.callProg(prog_name)
-                
-                index = 0
-                self.progView.selection_clear("1.0", "end")
-                self.progView.select_set(index)
+                self.enterProgram(session, prog_name)
 
             elif action == "Jump":
                 tab_num = command[command.find("Tab") + 4:]
-                encoded_tab = ("Tab Number " + tab_num + "\r\n").encode('utf-8')
-                index = self.progView.get("1.0", "end").index(encoded_tab) - 1
-                self.progView.selection_clear("1.0", "end")
-                self.progView.select_set(index)
+                self.jumpToTab(session, tab_num)
 
-    def processIfCom(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processIfCom(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Parse command to get input number, value number, and action
         args = ("# ", "= ", ": ")
@@ -3951,32 +4165,22 @@ class ProgExec:
             command[command.find(arg) + len(arg):].split()[0] for arg in args
         ]
 
-        # Get current COM port value
-        cur_com_val = self.com3outPortEntryField.get()
+        # Last value read from that device, the output field if it has not been read through the pool
+        cur_com_val = self.auxPorts.lastResponse(f"COM{input_num}", self.com3outPortEntryField.get())
 
         # Check if COM port value matches
         if cur_com_val == val_num:
             if action == "Call":
-                self.tab1.lastRow = self.progView.curselection()[0]
-                self.tab1.lastProg = self.ProgEntryField.get()
                 prog_name = command[command.find("Prog") + 5:] + ".ar"
-                self.callProg(prog_name)
-                
-                index = 0
-                self.progView.selection_clear("1.0", "end")
-                self.progView.select_set(index)
+                self.enterProgram(session, prog_name)
                 
             elif action == "Jump":
                 tab_num = command[command.find("Tab") + 4:]
-                encoded_tab = ("Tab Number " + tab_num + "\r\n").encode('utf-8')
+                self.jumpToTab(session, tab_num)
 
-                index = self.progView.get("1.0", "end").index(encoded_tab) - 1
-                self.progView.selection_clear("1.0", "end")
-                self.progView.select_set(index)
-
-    def processInputOnJump(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processInputOnJump(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Parse command to get input number and tab number
         args = ("Input-", "Tab-", "")
@@ -3986,25 +4190,18 @@ class ProgExec:
 
         # Construct and send jump command
         jump_command = f"JFX{input_num}T{tab_num}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, jump_command)
-        self.ser.write(jump_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
+        self.showCommand(session, jump_command)
 
         # Read serial response
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = session.teensy.send(jump_command)
         
         # If response is "T", proceed to jump to the specified tab
         if response == "T":
-            encoded_tab = ("Tab Number " + tab_num + "\r\n").encode('utf-8')
-            index = self.progView.get("1.0", "end").index(encoded_tab) - 1
-            self.progView.selection_clear("1.0", "end")
-            self.progView.select_set(index)
+            self.jumpToTab(session, tab_num)
 
-    def processInputOffJump(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processInputOffJump(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Parse command to get input number and tab number
         args = ("Input-", "Tab-", "")
@@ -4014,25 +4211,18 @@ class ProgExec:
 
         # Construct and send jump command
         jump_command = f"JFX{input_num}T{tab_num}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, jump_command)
-        self.ser.write(jump_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
+        self.showCommand(session, jump_command)
 
         # Read serial response
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = session.teensy.send(jump_command)
         
         # If response is "F", proceed to jump to the specified tab
         if response == "F":
-            encoded_tab = ("Tab Number " + tab_num + "\r\n").encode('utf-8')
-            index = self.progView.get("1.0", "end").index(encoded_tab) - 1
-            self.progView.selection_clear("1.0", "end")
-            self.progView.select_set(index)
+            self.jumpToTab(session, tab_num)
 
-    def processJumpToRow(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processJumpToRow(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Extract tab number directly
         start_str = "Tab-"
@@ -4040,14 +4230,20 @@ class ProgExec:
         tab_num = command[start_idx:]
 
         # Locate and select the tab in progView
-        encoded_tab = ("Tab Number " + tab_num + "\r\n").encode('utf-8')
-        index = self.progView.get("1.0", "end").index(encoded_tab)
-        self.progView.selection_clear("1.0", "end")
-        self.progView.select_set(index)
+        self.jumpToTab(session, tab_num)
+
+    def jumpToTab(self, session, tab_num):
+        # Tab rows come from the label index kept with the compiled program
+        index = session.program.labelRow(tab_num)
+        if index is None:
+            self.showError(session, f"Tab Number {tab_num.strip()} Not Found")
+            self.stopProg(session)
+            return
+        session.executor.jump(index)
 
-    def processSetOutputOn(self, command, ser):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processSetOutputOn(self, session, command, link):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Extract output number directly
         start_str = "Out On = "
@@ -4056,16 +4252,12 @@ class ProgExec:
 
         # Send I/O command
         io_command = f"ONX{output_num}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, io_command)
-        self.ser.write(io_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.read()
+        self.showCommand(session, io_command)
+        link.submit(io_command)
 
-    def processSetOutputOff(self, command, ser):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processSetOutputOff(self, session, command, link):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Extract output number directly
         start_str = "Out Off = "
@@ -4074,16 +4266,12 @@ class ProgExec:
 
         # Send I/O command
         io_command = f"OFX{output_num}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, io_command)
-        self.ser.write(io_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.read()
+        self.showCommand(session, io_command)
+        link.submit(io_command)
 
-    def processWaitInputOn(self, command, ser):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processWaitInputOn(self, session, command, link):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Extract input number directly
         start_str = "Wait Input On = "
@@ -4092,16 +4280,12 @@ class ProgExec:
 
         # Send wait command
         wait_command = f"WIN{input_num}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, wait_command)
-        self.ser.write(wait_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.read()
+        self.showCommand(session, wait_command)
+        link.send(wait_command)
 
-    def processWaitInputOff(self, command, ser):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processWaitInputOff(self, session, command, link):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Extract input number directly
         start_str = "Wait Off Input = "
@@ -4110,16 +4294,12 @@ class ProgExec:
 
         # Send wait command
         wait_command = f"WON{input_num}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, wait_command)
-        self.ser.write(wait_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.read()
+        self.showCommand(session, wait_command)
+        link.send(wait_command)
 
-    def processWaitTime(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processWaitTime(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Extract wait time in seconds
         start_str = "Wait Time = "
@@ -4128,47 +4308,33 @@ class ProgExec:
 
         # Send wait command
         wait_command = f"WTS{time_seconds}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, wait_command)
-        self.ser.write(wait_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.read()
+        self.showCommand(session, wait_command)
+        session.teensy.send(wait_command)
 
-    def processSetRegister(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processSetRegister(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Extract register number
         start_str = "Register "
         end_str = " = "
         start_idx = command.find(start_str) + len(start_str)
         end_idx = command.find(end_str, start_idx)
-        reg_num = command[start_idx:end_idx]
-        reg_entry_field = f"R{reg_num}EntryField"
+        reg_num = int(command[start_idx:end_idx])
 
-        # Calculate register value
+        # Update the register in the bank, the field follows on the next repaint
         reg_eq_index = command.find(" = ")
         test_oper = command[reg_eq_index + 3:reg_eq_index + 5]
-        reg_current_val = int(eval(reg_entry_field).get())
-        
         if test_oper == "++":
-            reg_change_val = int(command[reg_eq_index + 5:])
-            reg_new_val = reg_current_val + reg_change_val
+            session.registers.add(reg_num, int(command[reg_eq_index + 5:]))
         elif test_oper == "--":
-            reg_change_val = int(command[reg_eq_index + 5:])
-            reg_new_val = reg_current_val - reg_change_val
+            session.registers.add(reg_num, -int(command[reg_eq_index + 5:]))
         else:
-            reg_new_val = int(command[reg_eq_index + 3:])
-
-        # Update entry field with the new register value
-        entry_field = eval(reg_entry_field)
-        entry_field.delete(0, 'end')
-        entry_field.insert(0, str(reg_new_val))
+            session.registers.set(reg_num, int(command[reg_eq_index + 3:]))
 
-    def processSetPositionRegister(self, command):
-        if self.moveInProc:
-            self.moveInProc = 2
+    def processSetPositionRegister(self, session, command):
+        if session.moveInProc:
+            session.moveInProc = 2
 
         # Extract position register number and element
         start_str = "Position Register "
@@ -4181,43 +4347,31 @@ class ProgExec:
         element_end_str = " = "
         element_start_idx = command.find(element_str) + len(element_str)
         element_end_idx = command.find(element_end_str, element_start_idx)
-        reg_element = command[element_start_idx:element_end_idx]
+        reg_element = int(command[element_start_idx:element_end_idx])
+        reg_num = int(reg_num)
 
-        reg_entry_field = f"SP_{reg_num}_E{reg_element}_EntryField"
-
-        # Calculate the new register value
+        # Update the position register element in the bank
         reg_eq_index = command.find(" = ")
         test_oper = command[reg_eq_index + 3:reg_eq_index + 5]
-        reg_current_val = float(eval(reg_entry_field).get())
-
         if test_oper == "++":
-            reg_change_val = float(command[reg_eq_index + 5:])
-            reg_new_val = reg_current_val + reg_change_val
+            session.registers.addPosition(reg_num, reg_element, float(command[reg_eq_index + 5:]))
         elif test_oper == "--":
-            reg_change_val = float(command[reg_eq_index + 5:])
-            reg_new_val = reg_current_val - reg_change_val
+            session.registers.addPosition(reg_num, reg_element, -float(command[reg_eq_index + 5:]))
         else:
-            reg_new_val = float(command[reg_eq_index + 3:])
+            session.registers.setPosition(reg_num, reg_element, float(command[reg_eq_index + 3:]))
 
-        # Update the entry field with the new position register value
-        entry_field = eval(reg_entry_field)
-        entry_field.delete(0, 'end')
-        entry_field.insert(0, str(reg_new_val))
-
-    def processCalibrate(self):
-        if self.moveInProc:
-            self.moveInProc = 2
-        self.calRobotAll()
+    def processCalibrate(self, session, command=None):
+        if session.moveInProc:
+            session.moveInProc = 2
+        self.calRobotAll(session)
         if self.calStat == 0:
-            self.stopProg()
+            self.stopProg(session)
 
-    def processToolS(self, command):
+    def processToolS(self, session, command):
         # Set move process state and system status
-        if self.moveInProc == 1:
-            self.moveInProc = 2
-        statusText = "SYSTEM READY"
-        self.almStatusLab.configure(text=statusText, text_color="green", font=('Arial', 10, 'bold'))
-        self.almStatusLab2.configure(text=statusText, text_color="green", font=('Arial', 10, 'bold'))
+        if session.moveInProc == 1:
+            session.moveInProc = 2
+        self.showStatus(session, "SYSTEM READY", "green")
 
         # Extract coordinates for Tool S
         xIndex = command.find(" X ")
@@ -4234,163 +4388,57 @@ class ProgExec:
         rxVal = command[rxIndex+4:]
 
         # Populate entry fields with extracted values
-        for field, value in zip(
-                [self.TFxEntryField, self.TFyEntryField, self.TFzEntryField, 
-                self.TFrzEntryField, self.TFryEntryField, self.TFrxEntryField],
-                [self.xVal, self.yVal, self.zVal, self.rzVal, self.ryVal, self.rxVal]):
-            field.delete(0, 'end')
-            field.insert(0, value)
+        if session is self.activeSession:
+            for field, value in zip(
+                    [self.TFxEntryField, self.TFyEntryField, self.TFzEntryField, 
+                    self.TFrzEntryField, self.TFryEntryField, self.TFrxEntryField],
+                    [self.xVal, self.yVal, self.zVal, self.rzVal, self.ryVal, self.rxVal]):
+                field.delete(0, 'end')
+                field.insert(0, value)
 
         # Format and send the command
         formattedCommand = f"TF A{xVal} B{yVal} C{zVal} D{rzVal} E{ryVal} F{rxVal}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, formattedCommand)
-        self.ser.write(formattedCommand.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.write(formattedCommand.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
+        self.showCommand(session, formattedCommand)
 
         # Read the response
-        response = str(self.ser.readline().strip(), 'utf-8')
-        if response.startswith('E'):
-            self.errorStatusLabel.configure(text=response, text_color="red", font=('Arial', 10, 'bold'))
-            print(f"Error: {response}")
-        else:
-            try:
-                position_fields = {
-                    "X": self.PositionXField, "Y": self.PositionYField, "Z": self.PositionZField,
-                    "Rz": self.PositionRzField, "Ry": self.PositionRyField, "Rx": self.PositionRxField
-                }
-                for key, field in position_fields.items():
-                    index = response.find(f"{key}")
-                    if index == -1:
-                        raise ValueError(f"Label '{key}' not found in response.")
-                    start = index + len(key)
-                    end = response.find(" ", start)
-                    value = response[start:end] if end != -1 else response[start:]
-
-                    field.delete(0, 'end')
-                    field.insert(0, value)
+        response = session.teensy.send(formattedCommand)
+        self.showMovePosition(session, response)
 
-            except Exception as e:
-                errorMsg = f"Failed to display position: {str(e)}"
-                self.errorStatusLabel.configure(text=errorMsg, text_color="red", font=('Arial', 10, 'bold'))
-                print(f"Error: {errorMsg}")
+    def processMoveJ(self, session, command):
+        if session.moveInProc == 0:
+            session.moveInProc = 1
 
-    def processMoveJ(self, command):
-        if self.moveInProc == 0:
-            self.moveInProc = 1
+        # Format and send command
+        formattedCommand = self.buildMoveJ(session, command)
+        self.showCommand(session, formattedCommand)
+        response = self.sendMotionRow(session, command, formattedCommand)
 
-        # Extract coordinates and settings specific to Move J
-        xIndex = command.find(" X ")
-        yIndex = command.find(" Y ")
-        zIndex = command.find(" Z ")
-        rzIndex = command.find(" Rz ")
-        ryIndex = command.find(" Ry ")
-        rxIndex = command.find(" Rx ")
-        J7Index = command.find(" J7 ")
-        J8Index = command.find(" J8 ")
-        J9Index = command.find(" J9 ")
-        SpeedIndex = command.find(" S")
-        ACCspdIndex = command.find(" Ac ")
-        DECspdIndex = command.find(" Dc ")
-        ACCrampIndex = command.find(" Rm ")
-        WristConfIndex = command.find(" $")
+        # Read and handle response
+        self.showMovePosition(session, response)
 
-        xVal = command[xIndex+3:yIndex]
-        yVal = command[yIndex+3:zIndex]
-        zVal = command[zIndex+3:rzIndex]
-        rzVal = command[rzIndex+4:ryIndex]
-        ryVal = command[ryIndex+4:rxIndex]
-        rxVal = command[rxIndex+4:J7Index]
-        J7Val = command[J7Index+4:J8Index]
-        J8Val = command[J8Index+4:J9Index]
-        J9Val = command[J9Index+4:SpeedIndex]
-        speedPrefix = command[SpeedIndex+1:SpeedIndex+3]
-        speed = command[SpeedIndex+4:ACCspdIndex]
-        ACCspd = command[ACCspdIndex+4:DECspdIndex]
-        DECspd = command[DECspdIndex+4:ACCrampIndex]
-        ACCramp = command[ACCrampIndex+4:WristConfIndex]
-        WC = command[WristConfIndex+3:]
+    def buildMoveJ(self, session, command):
+        # Targets, speed and wrist configuration come pre-parsed from the compiled program
+        move = session.program.lookup(command)
+        xVal, yVal, zVal, rzVal, ryVal, rxVal, J7Val, J8Val, J9Val = move.targets
         LoopMode = (str(self.J1OpenLoopStat.get()) + str(self.J2OpenLoopStat.get()) +
                     str(self.J3OpenLoopStat.get()) + str(self.J4OpenLoopStat.get()) +
                     str(self.J5OpenLoopStat.get()) + str(self.J6OpenLoopStat.get()))
 
-        # Format and send command
-        formattedCommand = (f"MJ X{xVal} Y{yVal} Z{zVal} Rz{rzVal} Ry{ryVal} Rx{rxVal} "
-                            f"J7{J7Val} J8{J8Val} J9{J9Val} {speedPrefix}{speed} "
-                            f"Ac{ACCspd} Dc{DECspd} Rm{ACCramp} W{WC} Lm{LoopMode}\n")
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, formattedCommand)
-        self.ser.write(formattedCommand.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.write(formattedCommand.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-
-        # Read and handle response
-        response = str(self.ser.readline().strip(), 'utf-8')
-        if response.startswith('E'):
-            self.errorStatusLabel.configure(text=response, text_color="red", font=('Arial', 10, 'bold'))
-            print(f"Error: {response}")
-        else:
-            try:
-                def extract_value(response, label):
-                    index = response.find(f"{label}")
-                    if index == -1:
-                        raise ValueError(f"Label '{label}' not found in response.")
-                    start = index + len(label)
-                    end = response.find(" ", start)
-                    return response[start:end] if end != -1 else response[start:]
-
-                position_values = {
-                    "X": extract_value(response, "X"),
-                    "Y": extract_value(response, "Y"),
-                    "Z": extract_value(response, "Z"),
-                    "Rz": extract_value(response, "Rz"),
-                    "Ry": extract_value(response, "Ry"),
-                    "Rx": extract_value(response, "Rx"),
-                }
-
-                for key, field in zip(
-                        ["X", "Y", "Z", "Rz", "Ry", "Rx"],
-                        [self.PositionXField, self.PositionYField, self.PositionZField, 
-                        self.PositionRzField, self.PositionRyField, self.PositionRxField]):
-                    field.delete(0, 'end')
-                    field.insert(0, position_values[key])
-
-            except Exception as e:
-                errorMsg = f"Failed to display position: {str(e)}"
-                self.errorStatusLabel.configure(text=errorMsg, text_color="red", font=('Arial', 10, 'bold'))
-                print(f"Error: {errorMsg}")
+        return (f"MJ X{xVal} Y{yVal} Z{zVal} Rz{rzVal} Ry{ryVal} Rx{rxVal} "
+                f"J7{J7Val} J8{J8Val} J9{J9Val} {move.speedType}{move.speed} "
+                f"Ac{move.acc} Dc{move.dec} Rm{move.ramp} W{move.wrist} Lm{LoopMode}\n")
 
-    def processOffJ(self, command):
-        if self.moveInProc == 0:
-            self.moveInProc = 1
+    def processOffJ(self, session, command):
+        if session.moveInProc == 0:
+            session.moveInProc = 1
 
         # Extract SP and command data for Off J
         SPnewIndex = command.find("[ PR: ")
         SPendIndex = command.find(" ] [")
         SP = command[SPnewIndex + 6:SPendIndex]
 
-        # Helper function to retrieve offsets
-        def get_offset(fieldName):
-            field = getattr(fieldName, None)
-            if field:
-                return field.get()
-            else:
-                raise ValueError(f"Field '{fieldName}' does not exist.")
-
-        # Get current offsets for Off J
-        cx = get_offset(f"SP_{SP}_E1_EntryField")
-        cy = get_offset(f"SP_{SP}_E2_EntryField")
-        cz = get_offset(f"SP_{SP}_E3_EntryField")
-        crz = get_offset(f"SP_{SP}_E4_EntryField")
-        cry = get_offset(f"SP_{SP}_E5_EntryField")
-        crx = get_offset(f"SP_{SP}_E6_EntryField")
+        # Get current offsets for Off J from the position register
+        cx, cy, cz, crz, cry, crx = session.registers.position(int(SP))
 
         # Extract movement data
         def extract_move_j_data(command):
@@ -4445,56 +4493,17 @@ class ProgExec:
         formattedCommand = (f"MJ X{xVal} Y{yVal} Z{zVal} Rz{rzVal} Ry{ryVal} Rx{rxVal} "
                             f"J7{J7Val} J8{J8Val} J9{J9Val} {speedPrefix}{speed} "
                             f"Ac{ACCspd} Dc{DECspd} Rm{ACCramp} W{WC} Lm{LoopMode}\n")
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, formattedCommand)
-        self.ser.write(formattedCommand.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.write(formattedCommand.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
+        self.showCommand(session, formattedCommand)
 
         # Read and handle response
-        response = str(self.ser.readline().strip(), 'utf-8')
-        if response.startswith('E'):
-            self.errorStatusLabel.configure(text=response, text_color="red", font=('Arial', 10, 'bold'))
-            print(f"Error: {response}")
-        else:
-            try:
-                def extract_value(response, label):
-                    index = response.find(f"{label}")
-                    if index == -1:
-                        raise ValueError(f"Label '{label}' not found in response.")
-                    start = index + len(label)
-                    end = response.find(" ", start)
-                    return response[start:end] if end != -1 else response[start:]
-
-                position_values = {
-                    "X": extract_value(response, "X"),
-                    "Y": extract_value(response, "Y"),
-                    "Z": extract_value(response, "Z"),
-                    "Rz": extract_value(response, "Rz"),
-                    "Ry": extract_value(response, "Ry"),
-                    "Rx": extract_value(response, "Rx"),
-                }
-
-                for key, field in zip(
-                        ["X", "Y", "Z", "Rz", "Ry", "Rx"],
-                        [self.PositionXField, self.PositionYField, self.PositionZField, 
-                        self.PositionRzField, self.PositionRyField, self.PositionRxField]):
-                    field.delete(0, 'end')
-                    field.insert(0, position_values[key])
-
-            except Exception as e:
-                errorMsg = f"Failed to display position: {str(e)}"
-                self.errorStatusLabel.configure(text=errorMsg, text_color="red", font=('Arial', 10, 'bold'))
-                print(f"Error: {errorMsg}")
+        response = session.teensy.send(formattedCommand)
+        self.showMovePosition(session, response)
 
-    def handleMoveVCommand(self, command):
+    def handleMoveVCommand(self, session, command):
 
         # Ensure movement is in progress
-        if self.moveInProc == 0:
-            self.moveInProc = 1
+        if session.moveInProc == 0:
+            session.moveInProc = 1
 
         # Extract SP and index positions in the command string
         SPnewIndex = command.find("[ PR: ")
@@ -4506,18 +4515,9 @@ class ProgExec:
         DECspdIndex, ACCrampIndex = command.find(" Dc "), command.find(" Rm ")
         WristConfIndex = command.find(" $")
 
-        # Define an internal helper to retrieve the offset
-        def get_offset(field_name):
-            field = getattr(field_name, None)
-            if field:
-                return field.get()
-            else:
-                raise ValueError(f"Field '{field_name}' does not exist.")
-
         # Extract parameters and offsets
         SP = command[SPnewIndex + 6:SPendIndex]
-        cx, cy, cz = get_offset(f"SP_{SP}_E1_EntryField"), get_offset(f"SP_{SP}_E2_EntryField"), get_offset(f"SP_{SP}_E3_EntryField")
-        crz, cry, crx = get_offset(f"SP_{SP}_E4_EntryField"), get_offset(f"SP_{SP}_E5_EntryField"), get_offset(f"SP_{SP}_E6_EntryField")
+        cx, cy, cz, crz, cry, crx = session.registers.position(int(SP))
 
         xVal = str(float(cx) + float(self.VisRetXrobEntryField.get()))
         yVal = str(float(cy) + float(self.VisRetYrobEntryField.get()))
@@ -4540,46 +4540,17 @@ class ProgExec:
         )
 
         # Send command and handle response
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, formatted_command)
-        self.ser.write(formatted_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
+        self.showCommand(session, formatted_command)
 
         # Read and handle response
-        response = str(self.ser.readline().strip(), 'utf-8')
-        if response.startswith('E'):
-            error_msg = f"Error: {response}"
-            print(error_msg)
-            self.errorStatusLabel.configure(text=response, text_color="red", font=('Arial', 10, 'bold'))
-        else:
-            try:
-                def extract_value(response, label):
-                    index = response.find(f"{label}")
-                    if index == -1:
-                        raise ValueError(f"Label '{label}' not found in response.")
-                    start = index + len(label)
-                    end = response.find(" ", start)
-                    return response[start:end] if end != -1 else response[start:]
-
-                position_fields = {
-                    "X": self.PositionXField, "Y": self.PositionYField, "Z": self.PositionZField,
-                    "Rz": self.PositionRzField, "Ry": self.PositionRyField, "Rx": self.PositionRxField
-                }
-                for label, field in position_fields.items():
-                    field.delete(0, 'end')
-                    field.insert(0, extract_value(response, label))
-
-            except Exception as e:
-                error_msg = f"Failed to display position: {str(e)}"
-                print(error_msg)
-                self.errorStatusLabel.configure(text=error_msg, text_color="red", font=('Arial', 10, 'bold'))
+        response = session.teensy.send(formatted_command)
+        self.showMovePosition(session, response)
 
-    def handleMovePCommand(self, command):
+    def handleMovePCommand(self, session, command):
 
         # Begin processing MoveP command
-        if self.moveInProc == 0:
-            self.moveInProc = 1
+        if session.moveInProc == 0:
+            session.moveInProc = 1
 
         # Parse command components
         SPnewIndex = command.find("[ PR: ")
@@ -4594,12 +4565,7 @@ class ProgExec:
         WristConfIndex = command.find(" $")
 
         SP = str(command[SPnewIndex + 6:SPendIndex])
-        cx = eval(f"SP_{SP}_E1_EntryField").get()
-        cy = eval(f"SP_{SP}_E2_EntryField").get()
-        cz = eval(f"SP_{SP}_E3_EntryField").get()
-        crz = eval(f"SP_{SP}_E4_EntryField").get()
-        cry = eval(f"SP_{SP}_E5_EntryField").get()
-        crx = eval(f"SP_{SP}_E6_EntryField").get()
+        cx, cy, cz, crz, cry, crx = session.registers.position(int(SP))
 
         xVal = str(float(cx))
         yVal = str(float(cy))
@@ -4626,49 +4592,19 @@ class ProgExec:
         final_command = f"MJX{xVal}Y{yVal}Z{zVal}Rz{rzVal}Ry{ryVal}Rx{rxVal}J7{J7Val}J8{J8Val}J9{J9Val}{speedPrefix}{Speed}Ac{ACCspd}Dc{DECspd}Rm{ACCramp}W{WC}Lm{LoopMode}\n"
         
         # Send the command to the device
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, final_command)
-        self.ser.write(final_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
+        self.showCommand(session, final_command)
         
         # Read the response
-        response = str(self.ser.readline().strip(), 'utf-8')
-        
-        # Check for errors in the response
-        if response.startswith('E'):
-            print(f"Error: {response}")
-            self.errorStatusLabel.configure(text=response, text_color="red", font=('Arial', 10, 'bold'))  # Display error in UI
-            return
-
-        # Process and display position data if no errors
-        position_fields = {
-            "X": self.PositionXField, "Y": self.PositionYField, "Z": self.PositionZField,
-            "Rz": self.PositionRzField, "Ry": self.PositionRyField, "Rx": self.PositionRxField
-        }
+        response = session.teensy.send(final_command)
         
-        try:
-            for key, field in position_fields.items():
-                # Extract value for each position key and update the respective UI field
-                index = response.find(f"{key}")
-                if index == -1:
-                    raise ValueError(f"Label '{key}' not found in response.")
-                start = index + len(key)
-                end = response.find(" ", start)
-                value = response[start:end] if end != -1 else response[start:]
-                field.delete(0, 'end')
-                field.insert(0, value)
-                
-        except Exception as e:
-            errorMsg = f"Failed to display position: {str(e)}"
-            print(f"Error: {errorMsg}")
-            self.errorStatusLabel.configure(text=errorMsg, text_color="red", font=('Arial', 10, 'bold'))
+        # Handle response
+        self.showMovePosition(session, response)
 
-    def handleOffsPRCommand(self, command):
+    def handleOffsPRCommand(self, session, command):
         
         # Set move process state
-        if self.moveInProc == 0:
-            self.moveInProc = 1
+        if session.moveInProc == 0:
+            session.moveInProc = 1
 
         # Extract position and configuration data from the command
         SPnewIndex = command.find("[ PR: ")
@@ -4688,12 +4624,9 @@ class ProgExec:
         SP = str(command[SPnewIndex + 6:SPendIndex])
         SP2 = str(command[SP2newIndex + 7:SP2endIndex])
 
-        xVal = str(float(eval(f"SP_{SP}_E1_EntryField").get()) + float(eval(f"SP_{SP2}_E1_EntryField").get()))
-        yVal = str(float(eval(f"SP_{SP}_E2_EntryField").get()) + float(eval(f"SP_{SP2}_E2_EntryField").get()))
-        zVal = str(float(eval(f"SP_{SP}_E3_EntryField").get()) + float(eval(f"SP_{SP2}_E3_EntryField").get()))
-        rzVal = str(float(eval(f"SP_{SP}_E4_EntryField").get()) + float(eval(f"SP_{SP2}_E4_EntryField").get()))
-        ryVal = str(float(eval(f"SP_{SP}_E5_EntryField").get()) + float(eval(f"SP_{SP2}_E5_EntryField").get()))
-        rxVal = str(float(eval(f"SP_{SP}_E6_EntryField").get()) + float(eval(f"SP_{SP2}_E6_EntryField").get()))
+        xVal, yVal, zVal, rzVal, ryVal, rxVal = (
+            str(value) for value in session.registers.position(int(SP)) + session.registers.position(int(SP2))
+        )
 
         # Extract joint and configuration parameters
         J7Val = command[J7Index + 4:J8Index]
@@ -4713,248 +4646,84 @@ class ProgExec:
         full_command = f"MJX{xVal}Y{yVal}Z{zVal}Rz{rzVal}Ry{ryVal}Rx{rxVal}J7{J7Val}J8{J8Val}J9{J9Val}{speedPrefix}{Speed}Ac{ACCspd}Dc{DECspd}Rm{ACCramp}W{WC}Lm{LoopMode}\n"
 
         # Send command
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, full_command)
-        self.ser.write(full_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
+        self.showCommand(session, full_command)
 
         # Read the response
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = session.teensy.send(full_command)
 
-        # Error handling
-        if response.startswith('E'):
-            print(f"Error: {response}")
-            self.errorStatusLabel.configure(text=response, text_color="red", font=('Arial', 10, 'bold'))
-            return
+        # Handle response
+        self.showMovePosition(session, response)
 
-        # Update position fields if no error
-        position_fields = {
-            "X": self.PositionXField, "Y": self.PositionYField, "Z": self.PositionZField,
-            "Rz": self.PositionRzField, "Ry": self.PositionRyField, "Rx": self.PositionRxField
-        }
-        
-        try:
-            for key, field in position_fields.items():
-                # Extract value for each position key
-                index = response.find(f"{key}")
-                if index == -1:
-                    raise ValueError(f"Label '{key}' not found in response.")
-                start = index + len(key)
-                end = response.find(" ", start)
-                value = response[start:end] if end != -1 else response[start:]
-
-                # Update field with extracted value
-                field.delete(0, 'end')
-                field.insert(0, value)
+    def handleMoveL(self, session, command):
+        # Check and start move if not already in process
+        if session.moveInProc == 0:
+            session.moveInProc = 1
 
-        except Exception as e:
-            errorMsg = f"Failed to display position: {str(e)}"
-            print(f"Error: {errorMsg}")
-            self.errorStatusLabel.configure(text=errorMsg, text_color="red", font=('Arial', 10, 'bold'))
+        # Send the command and handle response
+        full_command = self.buildMoveL(session, command)
+        self.showCommand(session, full_command)
+        response = self.sendMotionRow(session, command, full_command)
 
-    def handleMoveL(self, command):
-        # Check and start move if not already in process
-        if self.moveInProc == 0:
-            self.moveInProc = 1
+        # Handle the response
+        self.showMovePosition(session, response)
 
-        # Extract move values from command
-        def extractMoveSegment(start, end):
-            return command[start:end].strip()
+    def buildMoveL(self, session, command, rzReference=None):
+        # Targets, speed and wrist configuration come pre-parsed from the compiled program
+        move = session.program.lookup(command)
+        xVal, yVal, zVal, rzVal, ryVal, rxVal, J7Val, J8Val, J9Val = move.targets
 
-        xIndex = command.find(" X ")
-        yIndex = command.find(" Y ")
-        zIndex = command.find(" Z ")
-        rzIndex = command.find(" Rz ")
-        ryIndex = command.find(" Ry ")
-        rxIndex = command.find(" Rx ")
-        J7Index = command.find(" J7 ")
-        J8Index = command.find(" J8 ")
-        J9Index = command.find(" J9 ")
-        SpeedIndex = command.find(" S")
-        ACCspdIndex = command.find(" Ac ")
-        DECspdIndex = command.find(" Dc ")
-        ACCrampIndex = command.find(" Rm ")
-        RoundingIndex = command.find(" Rnd ")
-        WristConfIndex = command.find(" $")
-
-        xVal = extractMoveSegment(xIndex + 3, yIndex)
-        yVal = extractMoveSegment(yIndex + 3, zIndex)
-        zVal = extractMoveSegment(zIndex + 3, rzIndex)
-        rzVal = extractMoveSegment(rzIndex + 4, ryIndex)
-        ryVal = extractMoveSegment(ryIndex + 4, rxIndex)
-        rxVal = extractMoveSegment(rxIndex + 4, J7Index)
-        J7Val = extractMoveSegment(J7Index + 4, J8Index)
-        J8Val = extractMoveSegment(J8Index + 4, J9Index)
-        J9Val = extractMoveSegment(J9Index + 4, SpeedIndex)
-        Speed = extractMoveSegment(SpeedIndex + 4, ACCspdIndex)
-        ACCspd = extractMoveSegment(ACCspdIndex + 4, DECspdIndex)
-        DECspd = extractMoveSegment(DECspdIndex + 4, ACCrampIndex)
-        ACCramp = extractMoveSegment(ACCrampIndex + 4, RoundingIndex)
-        Rounding = extractMoveSegment(RoundingIndex + 5, WristConfIndex)
-        WC = command[WristConfIndex + 3:].strip()
-
-        # Adjust rzVal if necessary
-        if np.sign(float(rzVal)) != np.sign(float(self.RzcurPos)):
-            rzVal = str(float(rzVal) * -1)
+        # Adjust rzVal to the sign of the Rz the arm starts from; rows built ahead of
+        # time pass the previous row's target since RzcurPos has not caught up yet
+        if rzReference is None:
+            rzReference = float(self.RzcurPos)
+        if np.sign(rzVal) != np.sign(rzReference):
+            rzVal = rzVal * -1
 
         # Retrieve loop mode and disable wrist rotation flag
-        LoopMode = ''.join(str(getattr(f'J{i}OpenLoopStat.get()')) for i in range(1, 7))
+        LoopMode = ''.join(str(getattr(self, f'J{i}OpenLoopStat').get()) for i in range(1, 7))
         DisWrist = str(self.DisableWristRot.get())
 
-        # Construct and send the command
-        full_command = (
+        # Construct the command
+        return (
             f"MLX{xVal}Y{yVal}Z{zVal}Rz{rzVal}Ry{ryVal}Rx{rxVal}J7{J7Val}J8{J8Val}J9{J9Val}"
-            f"S{Speed}Ac{ACCspd}Dc{DECspd}Rm{ACCramp}Rnd{Rounding}W{WC}Lm{LoopMode}Q{DisWrist}\n"
+            f"S{move.speed}Ac{move.acc}Dc{move.dec}Rm{move.ramp}Rnd{move.rounding}W{move.wrist}Lm{LoopMode}Q{DisWrist}\n"
         )
-        
-        # Send the command and handle response
-        start = time.time()
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, full_command)
-
-        self.ser.write(full_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        response = str(self.ser.readline().strip(), 'utf-8')
-
-        # Optional timing display
-        end = time.time()
-        # manEntryField.delete(0, 'end')
-        # manEntryField.insert(0, end - start)
-
-        # Handle the response
-        if response.startswith('E'):
-            print(f"Error: {response}")
-            self.errorStatusLabel.configure(text=response, text_color="red", font=('Arial', 10, 'bold'))
-        else:
-            def extractValue(response, label):
-                index = response.find(f"{label}")
-                if index == -1:
-                    raise ValueError(f"Label '{label}' not found in response.")
-                start = index + len(label)
-                end = response.find(" ", start)
-                return response[start:end] if end != -1 else response[start:]
-
-            try:
-                self.PositionXField.delete(0, 'end')
-                self.PositionXField.insert(0, extractValue(response, "X"))
-                self.PositionYField.delete(0, 'end')
-                self.PositionYField.insert(0, extractValue(response, "Y"))
-                self.PositionZField.delete(0, 'end')
-                self.PositionZField.insert(0, extractValue(response, "Z"))
-                self.PositionRzField.delete(0, 'end')
-                self.PositionRzField.insert(0, extractValue(response, "Rz"))
-                self.PositionRyField.delete(0, 'end')
-                self.PositionRyField.insert(0, extractValue(response, "Ry"))
-                self.PositionRxField.delete(0, 'end')
-                self.PositionRxField.insert(0, extractValue(response, "Rx"))
-            except Exception as e:
-                print(f"Failed to display position: {str(e)}")
-                self.errorStatusLabel.configure(text=f"Display Error: {str(e)}", text_color="red", font=('Arial', 10, 'bold'))
 
-    def handleMoveR(self, command):
+    def handleMoveR(self, session, command):
         # Start move if not already in process
-        if self.moveInProc == 0:
-            self.moveInProc = 1
+        if session.moveInProc == 0:
+            session.moveInProc = 1
 
-        # Extract move values from command
-        def extractMoveSegment(start, end):
-            return command[start:end].strip()
+        # Send the command and handle response
+        full_command = self.buildMoveR(session, command)
+        self.showCommand(session, full_command)
+        response = self.sendMotionRow(session, command, full_command)
 
-        J1Index = command.find(" J1 ")
-        J2Index = command.find(" J2 ")
-        J3Index = command.find(" J3 ")
-        J4Index = command.find(" J4 ")
-        J5Index = command.find(" J5 ")
-        J6Index = command.find(" J6 ")
-        J7Index = command.find(" J7 ")
-        J8Index = command.find(" J8 ")
-        J9Index = command.find(" J9 ")
-        SpeedIndex = command.find(" S")
-        ACCspdIndex = command.find(" Ac ")
-        DECspdIndex = command.find(" Dc ")
-        ACCrampIndex = command.find(" Rm ")
-        WristConfIndex = command.find(" $")
+        # Handle response
+        self.showMovePosition(session, response)
 
-        J1Val = extractMoveSegment(J1Index + 4, J2Index)
-        J2Val = extractMoveSegment(J2Index + 4, J3Index)
-        J3Val = extractMoveSegment(J3Index + 4, J4Index)
-        J4Val = extractMoveSegment(J4Index + 4, J5Index)
-        J5Val = extractMoveSegment(J5Index + 4, J6Index)
-        J6Val = extractMoveSegment(J6Index + 4, J7Index)
-        J7Val = extractMoveSegment(J7Index + 4, J8Index)
-        J8Val = extractMoveSegment(J8Index + 4, J9Index)
-        J9Val = extractMoveSegment(J9Index + 4, SpeedIndex)
-        Speed = extractMoveSegment(SpeedIndex + 4, ACCspdIndex)
-        ACCspd = extractMoveSegment(ACCspdIndex + 4, DECspdIndex)
-        DECspd = extractMoveSegment(DECspdIndex + 4, ACCrampIndex)
-        ACCramp = extractMoveSegment(ACCrampIndex + 4, WristConfIndex)
-        WC = command[WristConfIndex + 3:].strip()
+    def buildMoveR(self, session, command):
+        # Targets, speed and wrist configuration come pre-parsed from the compiled program
+        move = session.program.lookup(command)
+        J1Val, J2Val, J3Val, J4Val, J5Val, J6Val, J7Val, J8Val, J9Val = move.targets
 
         # Retrieve loop mode
-        LoopMode = ''.join(str(getattr(f'J{i}OpenLoopStat.get()')) for i in range(1, 7))
+        LoopMode = ''.join(str(getattr(self, f'J{i}OpenLoopStat').get()) for i in range(1, 7))
 
         # Construct command
-        full_command = (
+        return (
             f"RJ A{J1Val}B{J2Val}C{J3Val}D{J4Val}E{J5Val}F{J6Val}J7{J7Val}J8{J8Val}J9{J9Val}"
-            f"S{Speed}Ac{ACCspd}Dc{DECspd}Rm{ACCramp}W{WC}Lm{LoopMode}\n"
+            f"S{move.speed}Ac{move.acc}Dc{move.dec}Rm{move.ramp}W{move.wrist}Lm{LoopMode}\n"
         )
 
-        # Send command and handle response
-        start = time.time()
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, full_command)
-
-        self.ser.write(full_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        response = str(self.ser.readline().strip(), 'utf-8')
-
-        # Optional timing display
-        end = time.time()
-        # manEntryField.delete(0, 'end')
-        # manEntryField.insert(0, end - start)
-
-        # Handle response
-        if response.startswith('E'):
-            print(f"Error: {response}")
-            self.errorStatusLabel.configure(text=response, text_color="red", font=('Arial', 10, 'bold'))
-        else:
-            def extractValue(response, label):
-                index = response.find(f"{label}")
-                if index == -1:
-                    raise ValueError(f"Label '{label}' not found in response.")
-                start = index + len(label)
-                end = response.find(" ", start)
-                return response[start:end] if end != -1 else response[start:]
-
-            try:
-                self.PositionXField.delete(0, 'end')
-                self.PositionXField.insert(0, extractValue(response, "X"))
-                self.PositionYField.delete(0, 'end')
-                self.PositionYField.insert(0, extractValue(response, "Y"))
-                self.PositionZField.delete(0, 'end')
-                self.PositionZField.insert(0, extractValue(response, "Z"))
-                self.PositionRzField.delete(0, 'end')
-                self.PositionRzField.insert(0, extractValue(response, "Rz"))
-                self.PositionRyField.delete(0, 'end')
-                self.PositionRyField.insert(0, extractValue(response, "Ry"))
-                self.PositionRxField.delete(0, 'end')
-                self.PositionRxField.insert(0, extractValue(response, "Rx"))
-            except Exception as e:
-                print(f"Failed to display position: {str(e)}")
-                self.errorStatusLabel.configure(text=f"Display Error: {str(e)}", text_color="red", font=('Arial', 10, 'bold'))
-
-    def handleMoveA(self, command):
+    def handleMoveA(self, session, command):
         # Start move if not already in process
-        if self.moveInProc == 0:
-            self.moveInProc = 1
+        if session.moveInProc == 0:
+            session.moveInProc = 1
 
         # Check command validity
         if command.startswith("Move A End"):
-            self.almStatusLab.configure(text="Move A must start with a Mid followed by End", text_color="red", font=('Arial', 10, 'bold'))
-            self.almStatusLab2.configure(text="Move A must start with a Mid followed by End", text_color="red", font=('Arial', 10, 'bold'))
+            self.showStatus(session, "Move A must start with a Mid followed by End", "red")
             return
 
         # Extract move values from command
@@ -4993,27 +4762,10 @@ class ProgExec:
         Rounding = extractMoveSegment(RoundingIndex + 5, WristConfIndex)
         WC = command[WristConfIndex + 3:].strip()
 
-        # Retrieve end position values
-        curRow = self.progView.curselection()[0]
-        selRow = curRow
-        last = self.progView.index('end')
-
-        # Set color for selected rows
-        for row in range(0, selRow):
-            self.progView.itemconfig(row, {'fg': 'dodger blue'})
-        self.progView.itemconfig(selRow, {'fg': 'blue2'})
-        for row in range(selRow + 1, last):
-            self.progView.itemconfig(row, {'fg': 'black'})
-
-        self.progView.selection_clear("1.0", "end")
-        selRow += 1
-        self.progView.select_set(selRow)
-        curRow += 1
-        selRow = self.progView.curselection()[0]
-        self.progView.see(selRow + 2)
-
-        data = list(map(int, self.progView.curselection()))
-        end_command = self.progView.get(data[0]).decode()
+        # Retrieve end position values from the next row, which this move consumes
+        curRow = session.executor.pc + 1
+        end_command = session.program.textAt(curRow)
+        session.executor.jump(curRow + 1)
 
         Xend, Yend, Zend = end_command[:3]
 
@@ -5028,13 +4780,9 @@ class ProgExec:
 
         # Send command and handle response
         start = time.time()
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, full_command)
+        self.showCommand(session, full_command)
 
-        self.ser.write(full_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = session.teensy.send(full_command)
 
         # Optional timing display
         end = time.time()
@@ -5042,45 +4790,17 @@ class ProgExec:
         # manEntryField.insert(0, end - start)
 
         # Handle response
-        if response.startswith('E'):
-            print(f"Error: {response}")
-            self.errorStatusLabel.configure(text=response, text_color="red", font=('Arial', 10, 'bold'))
-        else:
-            def extractValue(response, label):
-                index = response.find(f"{label}")
-                if index == -1:
-                    raise ValueError(f"Label '{label}' not found in response.")
-                start = index + len(label)
-                end = response.find(" ", start)
-                return response[start:end] if end != -1 else response[start:]
-
-            try:
-                self.PositionXField.delete(0, 'end')
-                self.PositionXField.insert(0, extractValue(response, "X"))
-                self.PositionYField.delete(0, 'end')
-                self.PositionYField.insert(0, extractValue(response, "Y"))
-                self.PositionZField.delete(0, 'end')
-                self.PositionZField.insert(0, extractValue(response, "Z"))
-                self.PositionRzField.delete(0, 'end')
-                self.PositionRzField.insert(0, extractValue(response, "Rz"))
-                self.PositionRyField.delete(0, 'end')
-                self.PositionRyField.insert(0, extractValue(response, "Ry"))
-                self.PositionRxField.delete(0, 'end')
-                self.PositionRxField.insert(0, extractValue(response, "Rx"))
-            except Exception as e:
-                print(f"Failed to display position: {str(e)}")
-                self.errorStatusLabel.configure(text=f"Display Error: {str(e)}", text_color="red", font=('Arial', 10, 'bold'))
+        self.showMovePosition(session, response)
 
-    def handleMoveC(self, command):
-        if self.moveInProc == 0:
-            self.moveInProc = 1
+    def handleMoveC(self, session, command):
+        if session.moveInProc == 0:
+            session.moveInProc = 1
 
         # Check command format
         subCmd = command[:10]
         if subCmd in ["Move C Sta", "Move C Pla"]:
             message = "Move C must start with a Center followed by Start & Plane"
-            self.almStatusLab.configure(text=message, text_color="red", font=('Arial', 10, 'bold'))
-            self.almStatusLab2.configure(text=message, text_color="red", font=('Arial', 10, 'bold'))
+            self.showStatus(session, message, "red")
             return
 
         # Inline extractMoveCValues logic to extract command values
@@ -5111,23 +4831,12 @@ class ProgExec:
             values[key] for key in ["X", "Y", "Z", "Rz", "Ry", "Rx", "Tr", "S", "Acc", "Dec", "Rm", "$"]
         )
 
-        # Inline getMidPosition logic to get mid position
-        curRow = self.progView.curselection()[0]
-
-        # Inline highlightRow logic for mid position
-        last = self.progView.index('end')
-        for r in range(last):
-            color = 'dodger blue' if r < curRow else 'black'
-            self.progView.itemconfig(r, {'fg': color})
-        self.progView.itemconfig(curRow, {'fg': 'blue2'})
-        self.progView.selection_clear(0, 'end')
-        self.progView.select_set(curRow)
-        self.progView.see(curRow + 2)
+        # Mid and end positions are the next two rows, which this move consumes
+        curRow = session.executor.pc
 
         # Move to next row for mid position
         curRow += 1
-        self.progView.select_set(curRow)
-        command = self.progView.get(curRow).decode()
+        command = session.program.textAt(curRow)
 
         # Inline extractPositionValues logic for mid position
         xIndex = command.find(" X ")
@@ -5140,8 +4849,8 @@ class ProgExec:
 
         # Inline getEndPosition logic to get end position
         curRow += 1
-        self.progView.select_set(curRow)
-        command = self.progView.get(curRow).decode()
+        command = session.program.textAt(curRow)
+        session.executor.jump(curRow + 1)
 
         # Inline extractPositionValues logic for end position
         xIndex = command.find(" X ")
@@ -5154,110 +4863,102 @@ class ProgExec:
 
         # Inline sendMJCommand logic
         mj_command = f"MJX{Xmid}Y{Ymid}Z{Zmid}Rz{rzVal}Ry{ryVal}Rx{rxVal}Tr{trVal}S{Speed}Ac{ACCspd}Dc{DECspd}Rm{ACCramp}W{WC}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, mj_command)
-        self.ser.write(mj_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.readline().strip()
+        self.showCommand(session, mj_command)
+        session.teensy.send(mj_command)
 
         # Inline sendMCCommand logic
         mc_command = f"MC Cx{xVal}Cy{yVal}Cz{zVal}Rz{rzVal}Ry{ryVal}Rx{rxVal}Bx{Xmid}By{Ymid}Bz{Zmid}Px{Xend}Py{Yend}Pz{Zend}Tr{trVal}S{Speed}Ac{ACCspd}Dc{DECspd}Rm{ACCramp}W{WC}\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, mc_command)
-        self.ser.write(mc_command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.readline().strip()
+        self.showCommand(session, mc_command)
+        session.teensy.send(mc_command)
 
-    def startSpline(self):
+    def startSpline(self, session, command=None):
         # Set spline active and update moveInProc status
         self.splineActive = "1"
-        if self.moveInProc == 1:
-            self.moveInProc = 2
+        if session.moveInProc == 1:
+            session.moveInProc = 2
+
+        # While running, a block of only Move L rows goes to the controller in one stream
+        if session.executor.running:
+            block = SplineUpload.collect(session.program, session.executor.pc)
+            if block:
+                self.uploadSpline(session, *block)
+                return
 
         # Define and send command
         command = "SL\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, command)
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        
-        # Delay and return the response
-        time.sleep(0.1)
-        return str(self.ser.readline().strip(), 'utf-8')
+        self.showCommand(session, command)
+        return session.teensy.send(command)
+
+    def uploadSpline(self, session, rows, endRow):
+        # Each point flips Rz against the point before it, as the arm will be there by then
+        commands = []
+        rzReference = None
+        for row in rows:
+            commands.append(self.buildMoveL(session, session.program.textAt(row), rzReference))
+            rzReference = MotionLookahead.targetRz(commands[-1])
+        upload = SplineUpload(session.teensy, self.armModel(), timeout=self.setupTimeout)
+        unreachable = upload.check(commands)
+        if unreachable:
+            index, reason = unreachable
+            message = f"Spline Row {rows[index] + 1} Out Of Reach - {reason}"
+            self.showError(session, message)
+            self.stopProg(session)
+            return
+        if upload.warnings:
+            index, reason = upload.warnings[0]
+            message = f"Spline Row {rows[index] + 1} Not Verified - {reason}"
+            self.errorStatusLabel.configure(text=message, text_color="orange", font=('Arial', 10, 'bold'))
 
-    def endSpline(self):
+        self.showCommand(session, f"SL + {len(commands)} ML + SS")
+        try:
+            response = upload.send(commands, lambda: session.executor.running)
+        except FutureTimeoutError:
+            self.splineActive = "0"
+            message = "No Reply To Spline Move - Check Controller Connection"
+            self.showError(session, message)
+            self.stopProg(session)
+            return
+        self.splineActive = "0"
+
+        # An error halts the program instead of carrying on past End Spline
+        if response.startswith('E'):
+            self.stopProg(session)
+        else:
+            # The Move L rows and End Spline ran as part of the block
+            session.executor.jump(endRow + 1)
+        self.showMovePosition(session, response)
+
+    def endSpline(self, session, command=None):
         # Set spline inactive and handle queue stop condition
         self.splineActive = "0"
         if self.stopQueue == "1":
             self.stopQueue = "0"
             stop()
 
-        if self.moveInProc == 1:
-            self.moveInProc = 2
+        if session.moveInProc == 1:
+            session.moveInProc = 2
 
         # Define and send command
         command = "SS\n"
-        self.cmdSentEntryField.delete(0, 'end')
-        self.cmdSentEntryField.insert(0, command)
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
+        self.showCommand(session, command)
         
         # Read and process response
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = session.teensy.send(command)
         
-        # Check for error in response and handle accordingly
-        if response[:1] == 'E':
-            print(f"Error: {response}")  # Log the error
-            self.errorStatusLabel.configure(text=response, text_color="red", font=('Arial', 10, 'bold'))
-        else:
-            def extractValue(response, label):
-                index = response.find(f"{label}")
-                if index == -1:
-                    raise ValueError(f"Label '{label}' not found in response.")
-                start = index + len(label)
-                end = response.find(" ", start)
-                return response[start:end] if end != -1 else response[start:]
-
-            try:
-                xVal = extractValue(response, "X")
-                yVal = extractValue(response, "Y")
-                zVal = extractValue(response, "Z")
-                rzVal = extractValue(response, "Rz")
-                ryVal = extractValue(response, "Ry")
-                rxVal = extractValue(response, "Rx")
-
-                self.PositionXField.delete(0, 'end')
-                self.PositionXField.insert(0, xVal)
-                self.PositionYField.delete(0, 'end')
-                self.PositionYField.insert(0, yVal)
-                self.PositionZField.delete(0, 'end')
-                self.PositionZField.insert(0, zVal)
-                self.PositionRzField.delete(0, 'end')
-                self.PositionRzField.insert(0, rzVal)
-                self.PositionRyField.delete(0, 'end')
-                self.PositionRyField.insert(0, ryVal)
-                self.PositionRxField.delete(0, 'end')
-                self.PositionRxField.insert(0, rxVal)
-
-            except Exception as e:
-                errorMsg = f"Failed to display position: {str(e)}"
-                print(f"Error: {errorMsg}")  # Log the error
-                self.errorStatusLabel.configure(text=errorMsg, text_color="red", font=('Arial', 10, 'bold'))
+        # Handle response
+        self.showMovePosition(session, response)
 
-    def cameraOn(self):
-        if self.moveInProc == 1:
-            self.moveInProc = 2
+    def cameraOn(self, session, command=None):
+        if session.moveInProc == 1:
+            session.moveInProc = 2
         self.start_vid()
 
-    def cameraOff(self):
-        if self.moveInProc == 1:
-            self.moveInProc = 2
+    def cameraOff(self, session, command=None):
+        if session.moveInProc == 1:
+            session.moveInProc = 2
         self.stop_vid()
 
-    def visionFind(self, command):
+    def visionFind(self, session, command):
         # Extract necessary values from the command
         templateIndex = command.find("Vis Find - ")
         bgColorIndex = command.find(" - BGcolor ")
@@ -5281,20 +4982,16 @@ class ProgExec:
 
         # Handle pass/fail outcomes
         if status == "pass":
-            tabNum = f"Tab Number {command[passIndex + 6:failIndex]}\r\n".encode('utf-8')
-            index = self.progView.get("1.0", "end").index(tabNum)
-            self.progView.selection_clear(0, 'end')
-            self.progView.select_set(index)
+            self.jumpToTab(session, command[passIndex + 6:failIndex])
 
         elif status == "fail":
-            tabNum = f"Tab Number {command[failIndex + 6:]}\r\n".encode('utf-8')
-            index = self.progView.get("1.0", "end").index(tabNum)
-            self.progView.selection_clear(0, 'end')
-            self.progView.select_set(index)
+            self.jumpToTab(session, command[failIndex + 6:])
 
 
 class JogButton:
     def xbox(self):
+        # Like the jog buttons, the controller jogs whichever arm the GUI has selected
+
         def update_status(label_text, text_color="orange", font=('Arial', 10, 'bold')):
             self.almStatusLab.configure(text=label_text, text_color=text_color, font=font)
             self.almStatusLab2.configure(text=label_text, text_color=text_color, font=font)
@@ -5423,10 +5120,7 @@ class JogButton:
         def handle_gripper(grip_state):
             outputNum = self.DO1offEntryField.get() if grip_state == 0 else self.DO1onEntryField.get()
             command = ("OFX" if grip_state == 0 else "ONX") + outputNum + "\n"
-            self.ser2.write(command.encode())
-            self.ser2.flushInput()
-            time.sleep(0.1)
-            self.ser2.read()
+            self.activeSession.ioWorker.submit(command)
 
         def threadxbox():
             toggle_xbox()
@@ -5516,12 +5210,9 @@ class JogButton:
         # Update the command entry field and send the command
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(.1)
         
         # Read and process response
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = self.activeSession.teensy.send(command)
         if response.startswith('E'):
             self.ErrorHandler(response)
         else:
@@ -5575,14 +5266,11 @@ class JogButton:
 
         # Construct and send command
         command = f"LJV{value}{speedPrefix}{Speed}Ac{ACCspd}Dc{DECspd}Rm{ACCramp}W{self.WC}Lm{LoopMode}\n"
-        self.ser.write(command.encode())
         
         # Update command sent field and read response
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.read()
+        self.activeSession.teensy.send(command)
 
     def LiveCarJog(self, value):
         # Update status labels
@@ -5612,14 +5300,11 @@ class JogButton:
 
         # Construct and send command
         command = f"LCV{value}{speedPrefix}{Speed}Ac{ACCspd}Dc{DECspd}Rm{ACCramp}W{self.WC}Lm{LoopMode}\n"
-        self.ser.write(command.encode())
         
         # Update command sent field and read response
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.read()
+        self.activeSession.teensy.send(command)
 
     def LiveToolJog(self, value):
         # Update status labels
@@ -5649,24 +5334,18 @@ class JogButton:
 
         # Construct and send command
         command = f"LTV{value}{speedPrefix}{Speed}Ac{ACCspd}Dc{DECspd}Rm{ACCramp}W{self.WC}Lm{LoopMode}\n"
-        self.ser.write(command.encode())
         
         # Update command sent field and read response
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.read()
+        self.activeSession.teensy.send(command)
 
     def StopJog(self):
         command = "S\n"
         if int(self.IncJogStat.get()) == 0:
-            self.ser.write(command.encode())
-            self.ser.flushInput()
-            time.sleep(0.1)
             
             # Read and handle response
-            response = self.ser.readline().decode('utf-8').strip()
+            response = self.activeSession.teensy.send(command)
             if response.startswith('E'):
                 self.ErrorHandler(response)
             else:
@@ -5708,14 +5387,11 @@ class JogButton:
                 f"Ac{ACCspd}Dc{DECspd}Rm{ACCramp}W{self.WC}Lm{LoopMode}\n"
 
         # Send command to serial
-        self.ser.write(command.encode())
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.flushInput()
-        time.sleep(.1)
 
         # Process response
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = self.activeSession.teensy.send(command)
         if response.startswith('E'):
             self.ErrorHandler(response)
         else:
@@ -5730,6 +5406,8 @@ class JogButton:
     def J9jogPos(self, value): self.jog_joint_command(9, value, "pos")
 
     def jog_neg_with_command(self, axis, value):
+        self.refreshPose()
+
         # Get speed prefix based on speed option
         speedtype = self.speedOption.get()
         speedPrefix = ""
@@ -5776,12 +5454,9 @@ class JogButton:
         )
 
         # Send command and handle response
-        self.ser.write(command.encode())
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.flushInput()
-        time.sleep(0.1)
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = self.activeSession.teensy.send(command)
         if response.startswith('E'):
             self.ErrorHandler(response)
         else:
@@ -5796,6 +5471,8 @@ class JogButton:
     def RzjogNeg(self, value): self.jog_neg_with_command('Rz', value)
 
     def jog_pos_with_command(self, axis, value):
+        self.refreshPose()
+
         # Get speed prefix based on speed option
         speedtype = self.speedOption.get()
         speedPrefix = ""
@@ -5842,12 +5519,9 @@ class JogButton:
         )
 
         # Send command and handle response
-        self.ser.write(command.encode())
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.flushInput()
-        time.sleep(0.1)
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = self.activeSession.teensy.send(command)
         if response.startswith('E'):
             self.ErrorHandler(response)
         else:
@@ -5902,12 +5576,9 @@ class JogButton:
         )
 
         # Send the command and handle response
-        self.ser.write(command.encode())
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.flushInput()
-        time.sleep(0.1)
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = self.activeSession.teensy.send(command)
         if response.startswith('E'):
             self.ErrorHandler(response)
         else:
@@ -5962,12 +5633,9 @@ class JogButton:
         )
 
         # Send the command and handle response
-        self.ser.write(command.encode())
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.flushInput()
-        time.sleep(0.1)
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = self.activeSession.teensy.send(command)
         if response.startswith('E'):
             self.ErrorHandler(response)
         else:
@@ -5988,7 +5656,7 @@ class TeachFunc:
             try:
                 sel_row = self.progView.curselection()[0] + 1
             except:
-                last = self.progView.index('end')
+                last = len(self.activeSession.program.instructions)
                 sel_row = last
                 self.progView.select_set(sel_row)
             return sel_row
@@ -6003,15 +5671,9 @@ class TeachFunc:
             return ""
 
         def insert_to_view_and_save(self, new_position, sel_row):
-            self.progView.insert(sel_row, bytes(new_position + '\n', 'utf-8'))
+            self.insertProgRow(sel_row, new_position)
             self.progView.selection_clear(0, 'end')
             self.progView.select_set(sel_row)
-            items = self.progView.get(0, 'end')
-            file_path = path.relpath(self.ProgEntryField.get())
-            with open(file_path, 'w', encoding='utf-8') as f:
-                for item in items:
-                    f.write(str(item.strip(), encoding='utf-8'))
-                    f.write('\n')
 
         # Main function code starts here
 
@@ -6066,7 +5728,7 @@ class TeachFunc:
                 f"Position Register {PR} Element 1 = {self.XcurPos}"
             ]
             for element in elements:
-                self.progView.insert(sel_row, bytes(element + '\n', 'utf-8'))
+                self.insertProgRow(sel_row, element)
                 sel_row += 1
             insert_to_view_and_save("", sel_row)
     
@@ -6076,27 +5738,46 @@ class TeachFunc:
             selRow = self.progView.curselection()[0]
             self.progView.select_set(selRow - 1)
         except IndexError:
-            selRow = self.progView.index('end')
+            selRow = len(self.activeSession.program.instructions)
             self.progView.select_set(selRow)
 
         self.teachInsertBelSelected()
 
 
 class ProgramFunc:
+    def reportProgramErrors(self, program):
+        # Rows that failed to compile are logged once, when their program is first shown
+        errors, program.errors = program.errors, []
+        if errors:
+            Curtime = datetime.datetime.now().strftime("%B %d %Y - %I:%M%p")
+            for error in errors:
+                self.ElogView.insert("end", f"{Curtime} - {error}")
+            pickle.dump(self.ElogView.get("1.0", "end"), open("ErrorLog", "wb"))
+            message = f"{len(errors)} Program Row(s) Could Not Be Parsed - See Log"
+            self.almStatusLab.configure(text=message, text_color="red", font=('Arial', 10, 'bold'))
+            self.almStatusLab2.configure(text=message, text_color="red", font=('Arial', 10, 'bold'))
+
+    def insertProgRow(self, row, text):
+        # All row edits go through here so the compiled program, tab index and file stay in step
+        self.pageProgView(row)
+        self.progView.insert(row, bytes(text + '\n', 'utf-8'))
+        self.activeSession.program.insertRow(row, text)
+        self.programJournal.record(self.activeSession.program.path, "insert", row, text)
+
+    def deleteProgRow(self, row):
+        self.pageProgView(row + 1)
+        self.progView.delete(row)
+        self.activeSession.program.deleteRow(row)
+        self.programJournal.record(self.activeSession.program.path, "delete", row)
+
     def deleteitem(self):
         try:
             selRow = self.progView.curselection()[0]
 
-            self.progView.delete(selRow)
+            self.deleteProgRow(selRow)
             self.progView.selection_clear("1.0", "end")
 
             self.progView.select_set(min(selRow, self.progView.index('end') - 1))
-
-            items = self.progView.get("1.0", "end")
-            file_path = path.relpath(self.ProgEntryField.get())
-            with open(file_path, 'w', encoding='utf-8') as f:
-                for item in items:
-                    f.write(str(item.strip(), encoding='utf-8') + '\n')
         except IndexError:
             pass
 
@@ -6110,7 +5791,7 @@ class ProgramFunc:
             self.tab1.prog_view.select_set(sel_row)
         
         # Insert the item and clear previous selections
-        self.tab1.prog_view.insert(sel_row, bytes(self.man_entry_field.get() + '\n', 'utf-8'))
+        self.insertProgRow(sel_row, self.man_entry_field.get())
         self.tab1.prog_view.selection_clear("1.0", "end")
         self.tab1.prog_view.select_set(sel_row)
         
@@ -6120,13 +5801,6 @@ class ProgramFunc:
         
         # Set item color (in CTk, you may need to manage text color in other ways)
         self.tab1.prog_view.itemconfig(sel_row, {'foreground': 'darkgreen'})
-        
-        # Write updated list to file
-        items = self.tab1.prog_view.get("1.0", "end")
-        file_path = os.path.relpath(self.prog_entry_field.get())
-        with open(file_path, 'w', encoding='utf-8') as file:
-            for item in items:
-                file.write(item.decode('utf-8').strip() + '\n')
 
     def manReplItem(self):
         # Get the selected row
@@ -6136,8 +5810,8 @@ class ProgramFunc:
             return
         
         # Delete and replace the item at selected row
-        self.tab1.prog_view.delete(sel_row)
-        self.tab1.prog_view.insert(sel_row, bytes(self.man_entry_field.get() + '\n', 'utf-8'))
+        self.deleteProgRow(sel_row)
+        self.insertProgRow(sel_row, self.man_entry_field.get())
         
         # Update selection and clear previous selections
         self.tab1.prog_view.selection_clear("1.0", "end")
@@ -6145,13 +5819,6 @@ class ProgramFunc:
         
         # Update item color (CTk might need alternative styling if not directly supported)
         self.tab1.prog_view.itemconfig(sel_row, {'foreground': 'darkgreen'})
-        
-        # Write updated list to file
-        items = self.tab1.prog_view.get("1.0", "end")
-        file_path = os.path.relpath(self.prog_entry_field.get())
-        with open(file_path, 'w', encoding='utf-8') as file:
-            for item in items:
-                file.write(item.decode('utf-8').strip() + '\n')
 
     def waitTime(self):
         try:
@@ -6164,16 +5831,9 @@ class ProgramFunc:
         new_time = f"Wait Time = {seconds}"
         
         # Insert new item in the list
-        self.tab1.prog_view.insert(sel_row, bytes(new_time + '\n', 'utf-8'))
+        self.insertProgRow(sel_row, new_time)
         self.tab1.prog_view.selection_clear("1.0", "end")
         self.tab1.prog_view.select_set(sel_row)
-        
-        # Write the updated list to the file
-        items = self.tab1.prog_view.get("1.0", "end")
-        file_path = os.path.relpath(self.prog_entry_field.get())
-        with open(file_path, 'w', encoding='utf-8') as file:
-            for item in items:
-                file.write(item.decode('utf-8').strip() + '\n')
 
     def waitInputOn(self):
         try:
@@ -6186,16 +5846,9 @@ class ProgramFunc:
         new_input = f"Wait Input On = {input_value}"
         
         # Insert new item in the list
-        self.tab1.prog_view.insert(sel_row, bytes(new_input + '\n', 'utf-8'))
+        self.insertProgRow(sel_row, new_input)
         self.tab1.prog_view.selection_clear("1.0", "end")
         self.tab1.prog_view.select_set(sel_row)
-        
-        # Write the updated list to the file
-        items = self.tab1.prog_view.get("1.0", "end")
-        file_path = os.path.relpath(self.prog_entry_field.get())
-        with open(file_path, 'w', encoding='utf-8') as file:
-            for item in items:
-                file.write(item.decode('utf-8').strip() + '\n')
 
     def waitInputOff(self):
         try:
@@ -6208,16 +5861,9 @@ class ProgramFunc:
         new_input = f"Wait Off Input = {input_value}"
         
         # Insert new item in the list
-        self.tab1.prog_view.insert(sel_row, bytes(new_input + '\n', 'utf-8'))
+        self.insertProgRow(sel_row, new_input)
         self.tab1.prog_view.selection_clear("1.0", "end")
         self.tab1.prog_view.select_set(sel_row)
-        
-        # Write the updated list to the file
-        items = self.tab1.prog_view.get("1.0", "end")
-        file_path = os.path.relpath(self.prog_entry_field.get())
-        with open(file_path, 'w', encoding='utf-8') as file:
-            for item in items:
-                file.write(item.decode('utf-8').strip() + '\n')
 
     def setOutputOn(self):
         try:
@@ -6230,16 +5876,9 @@ class ProgramFunc:
         new_output = f"Out On = {output_value}"
         
         # Insert new item in the list
-        self.tab1.prog_view.insert(sel_row, bytes(new_output + '\n', 'utf-8'))
+        self.insertProgRow(sel_row, new_output)
         self.tab1.prog_view.selection_clear("1.0", "end")
         self.tab1.prog_view.select_set(sel_row)
-        
-        # Write the updated list to the file
-        items = self.tab1.prog_view.get("1.0", "end")
-        file_path = os.path.relpath(self.prog_entry_field.get())
-        with open(file_path, 'w', encoding='utf-8') as file:
-            for item in items:
-                file.write(item.decode('utf-8').strip() + '\n')
 
     def setOutputOff(self):
         try:
@@ -6252,16 +5891,9 @@ class ProgramFunc:
         new_output = f"Out Off = {output_value}"
         
         # Insert new item in the list
-        self.tab1.prog_view.insert(sel_row, bytes(new_output + '\n', 'utf-8'))
+        self.insertProgRow(sel_row, new_output)
         self.tab1.prog_view.selection_clear("1.0", "end")
         self.tab1.prog_view.select_set(sel_row)
-        
-        # Write the updated list to the file
-        items = self.tab1.prog_view.get("1.0", "end")
-        file_path = os.path.relpath(self.prog_entry_field.get())
-        with open(file_path, 'w', encoding='utf-8') as file:
-            for item in items:
-                file.write(item.decode('utf-8').strip() + '\n')
 
     def tabNumber(self):
         try:
@@ -6274,16 +5906,9 @@ class ProgramFunc:
         tab_insert = f"Tab Number {tab_num}"
         
         # Insert new item in the list
-        self.tab1.prog_view.insert(sel_row, bytes(tab_insert + '\n', 'utf-8'))
+        self.insertProgRow(sel_row, tab_insert)
         self.tab1.prog_view.selection_clear("1.0", "end")
         self.tab1.prog_view.select_set(sel_row)
-        
-        # Write the updated list to the file
-        items = self.tab1.prog_view.get("1.0", "end")
-        file_path = os.path.relpath(self.prog_entry_field.get())
-        with open(file_path, 'w', encoding='utf-8') as file:
-            for item in items:
-                file.write(item.decode('utf-8').strip() + '\n')
 
     def jumpTab(self):
         try:
@@ -6296,57 +5921,35 @@ class ProgramFunc:
         tab_jump_text = f"Jump Tab-{tab_num}"
         
         # Insert new item in the list
-        self.tab1.prog_view.insert(sel_row, bytes(tab_jump_text + '\n', 'utf-8'))
+        self.insertProgRow(sel_row, tab_jump_text)
         self.tab1.prog_view.selection_clear("1.0", "end")
         self.tab1.prog_view.select_set(sel_row)
-        
-        # Write the updated list to the file
-        items = self.tab1.prog_view.get("1.0", "end")
-        file_path = os.path.relpath(self.prog_entry_field.get())
-        with open(file_path, 'w', encoding='utf-8') as file:
-            for item in items:
-                file.write(item.decode('utf-8').strip() + '\n')
 
     def cameraOn(self):
         try:
             selRow = self.progView.curselection()[0] + 1
         except IndexError:
-            selRow = self.progView.size()
+            selRow = len(self.activeSession.program.instructions)
         
         # Insert "Cam On" text into the list
         value = "Cam On"
-        self.progView.insert(selRow, bytes(value + '\n', 'utf-8'))
+        self.insertProgRow(selRow, value)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
-        
-        # Write the updated list to the file
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.decode('utf-8').strip() + '\n')
 
     def cameraOff(self):
         try:
             selRow = self.progView.curselection()[0]
             selRow += 1
         except IndexError:
-            last = self.progView.size() - 1
+            last = len(self.activeSession.program.instructions) - 1
             selRow = last
             self.progView.select_set(selRow)
         
         value = "Cam Off"
-        self.progView.insert(selRow, bytes(value + '\n', 'utf-8'))
+        self.insertProgRow(selRow, value)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
-        
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.strip().decode('utf-8'))
-                f.write('\n')
 
     def IfCMDInsert(self):
         localErrorFlag = False
@@ -6354,7 +5957,7 @@ class ProgramFunc:
             selRow = self.progView.curselection()[0]
             selRow += 1
         except IndexError:
-            last = self.progView.size() - 1
+            last = len(self.activeSession.program.instructions) - 1
             selRow = last
             self.progView.select_set(selRow)
 
@@ -6402,24 +6005,16 @@ class ProgramFunc:
             value = f"{prefix} Jump to Tab {destVal}"
         
         if not localErrorFlag:
-            self.progView.insert(selRow, bytes(value + '\n', 'utf-8'))
+            self.insertProgRow(selRow, value)
             self.progView.selection_clear("1.0", "end")
             self.progView.select_set(selRow)
-            
-            items = self.progView.get("1.0", "end")
-            file_path = os.path.relpath(self.ProgEntryField.get())
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                for item in items:
-                    f.write(item.strip().decode('utf-8'))
-                    f.write('\n')
 
     def ReadAuxCom(self):
         try:
             selRow = self.progView.curselection()[0]
             selRow += 1
         except IndexError:
-            last = self.progView.size() - 1
+            last = len(self.activeSession.program.instructions) - 1
             selRow = last
             self.progView.select_set(selRow)
 
@@ -6427,25 +6022,16 @@ class ProgramFunc:
         comChar = self.auxCharEntryField.get()
         servoins = f"Read COM # {comNum} Char: {comChar}"
         
-        self.progView.insert(selRow, bytes(servoins + '\n', 'utf-8'))
+        self.insertProgRow(selRow, servoins)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
-        
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.strip().decode('utf-8'))
-                f.write('\n')
 
     def TestAuxCom(self):
         try:
             port = f"COM{self.com3PortEntryField.get()}"
-            baud = 115200
-            self.ser3 = serial.Serial(port, baud, timeout=5)
-            self.ser3.flushInput()
-        except serial.SerialException:
+            numChar = int(self.com3charPortEntryField.get())
+            response = self.auxPorts.read(port, numChar, timeout=5, flush=True)
+        except (serial.SerialException, OSError):
             Curtime = datetime.datetime.now().strftime("%B %d %Y - %I:%M%p")
             error_message = f"{Curtime} - UNABLE TO ESTABLISH COMMUNICATIONS WITH SERIAL DEVICE"
             self.ElogView.insert("end", error_message)
@@ -6454,12 +6040,9 @@ class ProgramFunc:
             with open("ErrorLog", "wb") as f:
                 pickle.dump(value, f)
             return
-
-        numChar = int(self.com3charPortEntryField.get())
-        response = self.ser3.read(numChar).strip().decode('utf-8')
         
         # Update output field
-        self.com3outPortEntryField.delete("1.0", "end")
+        self.com3outPortEntryField.delete(0, "end")
         self.com3outPortEntryField.insert(0, response)
 
     def Servo(self):
@@ -6467,7 +6050,7 @@ class ProgramFunc:
             selRow = self.progView.curselection()[0]
             selRow += 1
         except IndexError:
-            last = self.progView.size() - 1
+            last = len(self.activeSession.program.instructions) - 1
             selRow = last
             self.progView.select_set(selRow)
 
@@ -6475,17 +6058,9 @@ class ProgramFunc:
         servoPos = self.servoPosEntryField.get()
         servoins = f"Servo number {servoNum} to position: {servoPos}"
         
-        self.progView.insert(selRow, bytes(servoins + '\n', 'utf-8'))
+        self.insertProgRow(selRow, servoins)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
-        
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.strip().decode('utf-8'))
-                f.write('\n')
 
     def loadProg(self):
         # Determine the folder based on whether the app is frozen (e.g., compiled with PyInstaller) or running as a script
@@ -6494,42 +6069,75 @@ class ProgramFunc:
         else:
             folder = os.path.dirname(os.path.realpath(__file__))
 
-        filetypes = (('Robot Program', '*.ar'), ("All Files", "*.*"))
+        filetypes = (('Robot Program', '*.ar'), ('Binary Robot Program', '*.arb'), ("All Files", "*.*"))
         filename = fd.askopenfilename(title='Open File', initialdir=folder, filetypes=filetypes)
         
         if filename:
-            name = os.path.basename(filename)
-            self.ProgEntryField.delete("1.0", "end")
-            self.ProgEntryField.insert(0, name)
-            
-            self.progView.delete("1.0", "end")
-            
-            with open(filename, "rb") as Prog:
-                time.sleep(0.1)  # Optional sleep
-                for item in Prog:
-                    self.progView.insert("end", item)
-            
+            self.callProg(filename)
             self.progView.pack()
-            self.scrollbar.configure(command=self.progView.yview)
             self.savePosData()
 
     def callProg(self, name):
-        # Update the program entry field with the provided name
+        # Programs come from the cache, compiled once per file version
+        self.activateProgram(self.activeSession, self.programCache.get(name))
+
+    def armModel(self):
+        # Arm model from the kinematics tab, starting at the current joint angles
+        model = ArmModel()
+        model.setKinematics(
+            tool=[float(field.get()) for field in (
+                self.TFxEntryField, self.TFyEntryField, self.TFzEntryField,
+                self.TFrzEntryField, self.TFryEntryField, self.TFrxEntryField)],
+            posLimits=[float(getattr(self, f"J{i}PosLimEntryField").get()) for i in range(1, 7)],
+            negLimits=[float(getattr(self, f"J{i}NegLimEntryField").get()) for i in range(1, 7)],
+            dh=[[float(getattr(self, f"J{i}{name}EntryField").get()) for i in range(1, 7)] for name in ("Θ", "α", "d", "a")],
+        )
+        model.joints[:9] = [float(value) for value in (
+            self.J1AngCur, self.J2AngCur, self.J3AngCur, self.J4AngCur, self.J5AngCur, self.J6AngCur,
+            self.J7PosCur, self.J8PosCur, self.J9PosCur)]
+        return model
+
+    def estimateCycleTime(self):
+        estimate = CycleTimeEstimator(self.armModel(), self.programCache).estimate(self.activeSession.program)
+
+        self.almStatusLab.configure(text=f"PREDICTED CYCLE TIME {estimate.summary().upper()}", text_color="orange" if estimate.assumptions else "green", font=('Arial', 10, 'bold'))
+        window = ctk.CTkToplevel(self.root)
+        window.title(f"Cycle Time - {os.path.basename(self.activeSession.program.path)}")
+        report = ctk.CTkTextbox(window, width=700, height=500, font=("Courier", 11))
+        report.pack(fill="both", expand=True)
+        report.insert("end", estimate.report())
+        report.configure(state="disabled")
+
+    def activateProgram(self, session, program):
+        # progView catches up from the executor's "program" event on the main loop
+        session.program = program
+        session.executor.switch(program)
+
+    def showProgram(self, program):
+        self.shownProgram = program
         self.ProgEntryField.delete(0, 'end')
-        self.ProgEntryField.insert(0, name)
-        
-        # Clear the current content in progView
+        self.ProgEntryField.insert(0, program.path)
+
         self.progView.delete(0, 'end')
-        
-        # Open the file in text mode and insert each line into progView
-        with open(name, "r") as Prog:
-            time.sleep(0.1)  # Optional delay
-            for item in Prog:
-                self.progView.insert('end', item.rstrip('\n'))
-        
-        # Configure scrollbar for the text widget
+        self.pageProgView(self.progViewPage)
+        self.reportProgramErrors(program)
+
+        # Configure scrollbar for the text widget, paging rows in near the bottom
         self.scrollbar.configure(command=self.progView.yview)
-        self.progView.configure(yscrollcommand=self.scrollbar.set)
+        self.progView.configure(yscrollcommand=self.progViewScrolled)
+
+    def pageProgView(self, rows):
+        # progView holds the first rows of the shown program, extended as they are needed
+        program = self.shownProgram
+        if program is None:
+            return
+        for row in range(self.progView.size(), min(rows, len(program.instructions))):
+            self.progView.insert('end', program.textAt(row))
+
+    def progViewScrolled(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9:
+            self.pageProgView(self.progView.size() + self.progViewPage)
 
     def CreateProg(self):
         # Prompt user for a new program name using CustomTkinter's simpledialog equivalent
@@ -6542,23 +6150,8 @@ class ProgramFunc:
         # Create a new file and write initial content
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write("##BEGINNING OF PROGRAM##\n")
-        
-        # Update the program entry field with the new file path
-        self.ProgEntryField.delete(0, 'end')
-        self.ProgEntryField.insert(0, file_path)
-        
-        # Clear the current content in progView and load the newly created file
-        self.progView.delete(0, 'end')
-        
-        with open(file_path, "r") as Prog:
-            time.sleep(0.1)  # Optional delay
-            for item in Prog:
-                self.progView.insert('end', item.rstrip('\n'))
-        
-        # Configure scrollbar for the text widget
-        self.scrollbar.configure(command=self.progView.yview)
-        self.progView.configure(yscrollcommand=self.scrollbar.set)
-        
+
+        self.callProg(file_path)
         self.savePosData()
 
     def insertCallProg(self):
@@ -6566,7 +6159,7 @@ class ProgramFunc:
             selRow = self.progView.curselection()[0]
             selRow += 1
         except IndexError:
-            last = self.progView.size() - 1
+            last = len(self.activeSession.program.instructions) - 1
             selRow = last
             self.progView.select_set(selRow)
 
@@ -6578,25 +6171,16 @@ class ProgramFunc:
             changeProg += ".ar"
         
         # Insert the call program instruction
-        self.progView.insert(selRow, bytes(changeProg + '\n', 'utf-8'))
+        self.insertProgRow(selRow, changeProg)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
 
-        # Retrieve all items and save to file
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.strip().decode('utf-8'))
-                f.write('\n')
-
     def insertGCprog(self):
         try:
             selRow = self.progView.curselection()[0]
             selRow += 1
         except IndexError:
-            last = self.progView.size() - 1
+            last = len(self.activeSession.program.instructions) - 1
             selRow = last
             self.progView.select_set(selRow)
 
@@ -6604,72 +6188,39 @@ class ProgramFunc:
         GCProg = f"Run Gcode Program - {newProg}"
         
         # Insert the Gcode program instruction
-        self.progView.insert(selRow, bytes(GCProg + '\n', 'utf-8'))
+        self.insertProgRow(selRow, GCProg)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
 
-        # Retrieve all items and save to file
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.strip().decode('utf-8'))
-                f.write('\n')
-
     def insertReturn(self):
         try:
             selRow = self.progView.curselection()[0]
             selRow += 1
         except IndexError:
-            last = self.progView.size() - 1
+            last = len(self.activeSession.program.instructions) - 1
             selRow = last
             self.progView.select_set(selRow)
 
         value = "Return"
         
         # Insert the return instruction
-        self.progView.insert(selRow, bytes(value + '\n', 'utf-8'))
+        self.insertProgRow(selRow, value)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
 
-        # Retrieve all items and save to file
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.strip().decode('utf-8'))
-                f.write('\n')
-
     def openText(self):
         # Get the file path from the program entry field
         file_path = os.path.relpath(self.ProgEntryField.get())
         
         if os.path.exists(file_path):
+            self.programJournal.flush(file_path)
             os.startfile(file_path)
         else:
             print(f"File not found: {file_path}")
 
     def reloadProg(self):
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        # Update the program entry field with the reloaded file path
-        self.ProgEntryField.delete(0, 'end')
-        self.ProgEntryField.insert(0, file_path)
-        
-        # Clear the current content in progView and load the file
-        self.progView.delete(0, 'end')
-        
-        with open(file_path, "r") as Prog:
-            time.sleep(0.1)
-            for item in Prog:
-                self.progView.insert('end', item.rstrip('\n'))
-        
-        # Configure scrollbar for the text widget
-        self.scrollbar.configure(command=self.progView.yview)
-        self.progView.configure(yscrollcommand=self.scrollbar.set)
-        
+        # Unchanged files come straight from the cache, edited ones are compiled again
+        self.callProg(os.path.relpath(self.ProgEntryField.get()))
         self.savePosData()
 
     def insertvisFind(self):        
@@ -6677,7 +6228,7 @@ class ProgramFunc:
             selRow = self.progView.curselection()[0]
             selRow += 1
         except IndexError:
-            selRow = self.progView.size() - 1
+            selRow = len(self.activeSession.program.instructions) - 1
             self.progView.select_set(selRow)
 
         # Get template and background color settings
@@ -6694,25 +6245,16 @@ class ProgramFunc:
         value = f"Vis Find - {template} - BGcolor {BGcolor} Score {score} Pass {passTab} Fail {failTab}"
         
         # Insert the command and update selection
-        self.progView.insert(selRow, bytes(value + '\n', 'utf-8'))
+        self.insertProgRow(selRow, value)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
-        
-        # Save all items to file
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.strip().decode('utf-8'))
-                f.write('\n')
 
     def IfRegjumpTab(self):
         try:
             selRow = self.progView.curselection()[0]
             selRow += 1
         except IndexError:
-            selRow = self.progView.size() - 1
+            selRow = len(self.activeSession.program.instructions) - 1
             self.progView.select_set(selRow)
         
         # Get the register number, comparison value, and target tab
@@ -6724,25 +6266,16 @@ class ProgramFunc:
         tabjmp = f"If Register {regNum} = {regEqNum} Jump to Tab {tabNum}"
         
         # Insert command into progView
-        self.progView.insert(selRow, bytes(tabjmp + '\n', 'utf-8'))
+        self.insertProgRow(selRow, tabjmp)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
-        
-        # Save all items in progView to file
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.strip().decode('utf-8'))
-                f.write('\n')
 
     def insertRegister(self):
         try:
             selRow = self.progView.curselection()[0]
             selRow += 1
         except IndexError:
-            selRow = self.progView.size() - 1
+            selRow = len(self.activeSession.program.instructions) - 1
             self.progView.select_set(selRow)
         
         # Get register number and command
@@ -6753,25 +6286,16 @@ class ProgramFunc:
         regIns = f"Register {regNum} = {regCmd}"
         
         # Insert command into progView
-        self.progView.insert(selRow, bytes(regIns + '\n', 'utf-8'))
+        self.insertProgRow(selRow, regIns)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
-        
-        # Save all items in progView to file
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.strip().decode('utf-8'))
-                f.write('\n')
 
     def storPos(self):
         try:
             selRow = self.progView.curselection()[0]
             selRow += 1
         except IndexError:
-            selRow = self.progView.size() - 1
+            selRow = len(self.activeSession.program.instructions) - 1
             self.progView.select_set(selRow)
         
         # Retrieve values from entry fields
@@ -6783,42 +6307,24 @@ class ProgramFunc:
         regIns = f"Position Register {regNum} Element {regElmnt} = {regCmd}"
         
         # Insert the command into progView
-        self.progView.insert(selRow, bytes(regIns + '\n', 'utf-8'))
+        self.insertProgRow(selRow, regIns)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
-        
-        # Save all items in progView to file
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.strip().decode('utf-8'))
-                f.write('\n')
 
     def insCalibrate(self):
         try:
             selRow = self.progView.curselection()[0] + 1
         except IndexError:
-            selRow = self.progView.size() - 1
+            selRow = len(self.activeSession.program.instructions) - 1
             self.progView.select_set(selRow)
         
         # Define the calibration command
         insCal = "Calibrate Robot"
         
         # Insert the command into progView
-        self.progView.insert(selRow, bytes(insCal + '\n', 'utf-8'))
+        self.insertProgRow(selRow, insCal)
         self.progView.selection_clear("1.0", "end")
         self.progView.select_set(selRow)
-        
-        # Save all items in progView to file
-        items = self.progView.get("1.0", "end")
-        file_path = os.path.relpath(self.ProgEntryField.get())
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(item.strip().decode('utf-8'))
-                f.write('\n')
 
     def progViewselect(self, event):
         try:
@@ -6847,10 +6353,7 @@ class ProgramFunc:
         self.savePosData()
         servoPos = position_field.get()
         command = f"SV{servo_number}P{servoPos}\n"
-        self.ser2.write(command.encode())
-        self.ser2.flushInput()
-        time.sleep(0.1)
-        self.ser2.read()
+        self.activeSession.ioWorker.submit(command)
 
     # Refactored servo control functions
     def Servo0on(self): self.control_servo(0, self.servo0onEntryField)
@@ -6865,10 +6368,7 @@ class ProgramFunc:
     def control_output(self, action, output_field):
         outputNum = output_field.get()
         command = f"{action}X{outputNum}\n"
-        self.ser2.write(command.encode())
-        self.ser2.flushInput()
-        time.sleep(0.1)
-        self.ser2.read()
+        self.activeSession.ioWorker.submit(command)
 
     # Refactored digital output control functions
     def DO1on(self): self.control_output("ON", self.DO1onEntryField)
@@ -6887,11 +6387,9 @@ class ProgramFunc:
     def TestString(self):
         # Construct command and send it
         command = "TM" + self.testSendEntryField.get() + "\n"
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        
+
         # Read and display the response
-        echo = self.ser.readline()
+        echo = self.activeSession.teensy.send(command)
         self.testRecEntryField.delete(0, 'end')
         self.testRecEntryField.insert(0, echo)
 
@@ -6917,7 +6415,7 @@ class Calibration:
     def __init__(self):
         self.progexec = ProgExec()
 
-    def calRobotAll(self):
+    def calRobotAll(self, session):
         def create_calibration_command(stage_values, offsets):
             command = "LL" + "".join(
                 f"{chr(65 + i)}{val}" for i, val in enumerate(stage_values + offsets)
@@ -6925,20 +6423,19 @@ class Calibration:
             return command
 
         def send_command(command):
-            self.ser.write(command.encode())
-            self.cmdSentEntryField.delete(0, 'end')
-            self.cmdSentEntryField.insert(0, command)
-            self.ser.flushInput()
-            return str(self.ser.readline().strip(), 'utf-8')
+            self.showCommand(session, command)
+            return session.teensy.send(command)
 
         def handle_response(response, stage):
             success = response.startswith('A')
-            self.displayPosition(response) if success else self.ErrorHandler(response)
             message = f"Auto Calibration Stage {stage} {'Successful' if success else 'Failed - See Log'}"
-            text_color = "green" if success else "red"
-            font = ('Arial', 10, 'bold')
-            self.almStatusLab.configure(text=message, text_color=text_color, font=font)
-            self.almStatusLab2.configure(text=message, text_color=text_color, font=font)
+            # Run as a program row, the arm may not be the one the GUI shows
+            if session is not self.activeSession:
+                if not success:
+                    session.lastError = message
+                return message
+            self.displayPosition(response) if success else self.ErrorHandler(response)
+            self.showStatus(session, message, "green" if success else "red")
             return message
 
         def update_log(message):
@@ -6976,11 +6473,9 @@ class Calibration:
     def calibrate_joint(self, joint_id, joint_command):
         command = f"LL{joint_command}" + "J" + str(self.J1calOff) + "K" + str(self.J2calOff) + "L" + str(self.J3calOff) + "M" + str(
             self.J4calOff) + "N" + str(self.J5calOff) + "O" + str(self.J6calOff) + "P" + str(self.J7calOff) + "Q" + str(self.J8calOff) + "R" + str(self.J9calOff) + "\n"
-        self.ser.write(command.encode())
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.flushInput()
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = self.activeSession.teensy.send(command)
         self.cmdRecEntryField.delete(0, 'end')
         self.cmdRecEntryField.insert(0, response)
         
@@ -7017,10 +6512,7 @@ class Calibration:
 
     def correctPos(self):
         def send_command(command):
-            self.ser.write(command.encode())
-            self.ser.flushInput()
-            time.sleep(0.1)
-            return str(self.ser.readline().strip(), 'utf-8')
+            return self.activeSession.teensy.send(command)
 
         command = "CP\n"
         response = send_command(command)
@@ -7028,15 +6520,23 @@ class Calibration:
 
     def requestPos(self):
         def send_command(command):
-            self.ser.write(command.encode())
-            self.ser.flushInput()
-            time.sleep(0.1)
-            return str(self.ser.readline().strip(), 'utf-8')
+            return self.activeSession.teensy.send(command)
 
         command = "RP\n"
         response = send_command(command)
         self.displayPosition(response)
 
+    def refreshPose(self):
+        # Pick up the newest pose from telemetry without an RP round trip
+        latest = self.activeSession.telemetry.latest()
+        if latest is None:
+            return
+        _, sample = latest
+        (self.J1AngCur, self.J2AngCur, self.J3AngCur, self.J4AngCur, self.J5AngCur, self.J6AngCur,
+         self.J7PosCur, self.J8PosCur, self.J9PosCur) = sample.joints()
+        (self.XcurPos, self.YcurPos, self.ZcurPos,
+         self.RzcurPos, self.RycurPos, self.RxcurPos) = sample.cartesian()
+
     def updateParams(self):
         def get_entry_fields():
             params = {
@@ -7112,12 +6612,7 @@ class Calibration:
         configure_limits(params)
         command = construct_command(params)
 
-        self.ser.write(command.encode())
-        self.ser.flush()
-        time.sleep(0.1)
-        self.ser.flushInput()
-        time.sleep(0.1)
-        response = self.ser.read_all()
+        self.sendSetup(self.activeSession, command)
 
     def calExtAxis(self):
         def configure_axis(index, pos_limit, neg_limit_label, pos_limit_label, jog_slider, update_command):
@@ -7152,16 +6647,11 @@ class Calibration:
         )
 
         # Send command
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        response = self.ser.read()
+        self.sendSetup(self.activeSession, command)
 
     def zero_axis(self, axis_number, axis_name):
         command = f"Z{axis_number}\n"
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
+        future = self.activeSession.teensy.submit(command)
         status_text = f"{axis_name} Calibration Forced to Zero"
         self.almStatusLab.configure(text=status_text, text_color="orange", font=('Arial', 10, 'bold'))
         self.almStatusLab2.configure(text=status_text, text_color="orange", font=('Arial', 10, 'bold'))
@@ -7170,7 +6660,7 @@ class Calibration:
         self.ElogView.insert("end", f"{curtime} - {message}")
         value = self.ElogView.get("1.0", "end")
         pickle.dump(value, open("ErrorLog", "wb"))
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = future.result()
         self.displayPosition(response)
 
     # Main functions calling the helper function with specific parameters
@@ -7187,10 +6677,7 @@ class Calibration:
         command = "SP" + "".join(f"{key}{value}" for key, value in current_positions.items()) + "\n"
         
         # Send the command
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        response = self.ser.read()
+        self.activeSession.teensy.send(command)
 
     def CalZeroPos(self):
         # Record the current time for logging
@@ -7198,10 +6685,7 @@ class Calibration:
 
         # Send zero calibration command
         command = "SPA0B0C0D0E90F0\n"
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.read()
+        self.activeSession.teensy.send(command)
 
         # Request updated position and update status labels
         self.requestPos()
@@ -7221,10 +6705,7 @@ class Calibration:
 
         # Send rest position calibration command
         command = "SPA0B0C-89D0E0F0\n"
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        self.ser.read()
+        self.activeSession.teensy.send(command)
 
         # Request updated position and update status labels
         self.requestPos()
@@ -7244,26 +6725,31 @@ class Calibration:
         self.cmdRecEntryField.insert(0, response)
 
         # Parse angles and positions
-        joint_indices = {key: response.find(key) for key in "ABCDEFGHIJKLMNORPQR"}
+        try:
+            sample = ReplyParser.parse(response)
+        except ReplyFormatError as e:
+            errorMsg = f"Failed to display position: {str(e)}"
+            self.errorStatusLabel.configure(text=errorMsg, text_color="red", font=('Arial', 10, 'bold'))
+            return
         parsed_data = {
-            "J1AngCur": response[joint_indices["A"] + 1 : joint_indices["B"]].strip(),
-            "J2AngCur": response[joint_indices["B"] + 1 : joint_indices["C"]].strip(),
-            "J3AngCur": response[joint_indices["C"] + 1 : joint_indices["D"]].strip(),
-            "J4AngCur": response[joint_indices["D"] + 1 : joint_indices["E"]].strip(),
-            "J5AngCur": response[joint_indices["E"] + 1 : joint_indices["F"]].strip(),
-            "J6AngCur": response[joint_indices["F"] + 1 : joint_indices["G"]].strip(),
-            "XcurPos": response[joint_indices["G"] + 1 : joint_indices["H"]].strip(),
-            "YcurPos": response[joint_indices["H"] + 1 : joint_indices["I"]].strip(),
-            "ZcurPos": response[joint_indices["I"] + 1 : joint_indices["J"]].strip(),
-            "RzcurPos": response[joint_indices["J"] + 1 : joint_indices["K"]].strip(),
-            "RycurPos": response[joint_indices["K"] + 1 : joint_indices["L"]].strip(),
-            "RxcurPos": response[joint_indices["L"] + 1 : joint_indices["M"]].strip(),
-            "SpeedVioation": response[joint_indices["M"] + 1 : joint_indices["N"]].strip(),
-            "Debug": response[joint_indices["N"] + 1 : joint_indices["O"]].strip(),
-            "Flag": response[joint_indices["O"] + 1 : joint_indices["P"]].strip(),
-            "J7PosCur": float(response[joint_indices["P"] + 1 : joint_indices["Q"]].strip()),
-            "J8PosCur": float(response[joint_indices["Q"] + 1 : joint_indices["R"]].strip()),
-            "J9PosCur": float(response[joint_indices["R"] + 1 :].strip())
+            "J1AngCur": sample.j1,
+            "J2AngCur": sample.j2,
+            "J3AngCur": sample.j3,
+            "J4AngCur": sample.j4,
+            "J5AngCur": sample.j5,
+            "J6AngCur": sample.j6,
+            "XcurPos": sample.x,
+            "YcurPos": sample.y,
+            "ZcurPos": sample.z,
+            "RzcurPos": sample.rz,
+            "RycurPos": sample.ry,
+            "RxcurPos": sample.rx,
+            "SpeedVioation": sample.speedViolation,
+            "Debug": sample.debug,
+            "Flag": sample.flag,
+            "J7PosCur": sample.j7,
+            "J8PosCur": sample.j8,
+            "J9PosCur": sample.j9
         }
 
         # Assign parsed data
@@ -7271,7 +6757,7 @@ class Calibration:
             setattr(self, key, value)
 
         # Determine wrist configuration
-        WC = "F" if float(parsed_data["J5AngCur"]) > 0 else "N"
+        WC = "F" if sample.j5 > 0 else "N"
 
         # Update GUI elements
         entry_fields = [
@@ -7496,7 +6982,6 @@ class Calibration:
 
         try:
             self.updateParams()
-            time.sleep(0.1)
             self.calExtAxis()
         except:
             print("No serial connection with Teensy board")
@@ -7504,228 +6989,222 @@ class Calibration:
         self.savePosData()
 
     def savePosData(self):
-        # Clear the calibration list and insert values sequentially
+        # Clear the calibration list and insert values sequentially, one per line in
+        # the order the loader reads them back
         self.calibration.delete("1.0", "end")
-        
+
+        def add(value):
+            self.calibration.insert("end", f"{value}\n")
+
         # Joint Angles
-        self.calibration.insert("end", self.J1AngCur)
-        self.calibration.insert("end", self.J2AngCur)
-        self.calibration.insert("end", self.J3AngCur)
-        self.calibration.insert("end", self.J4AngCur)
-        self.calibration.insert("end", self.J5AngCur)
-        self.calibration.insert("end", self.J6AngCur)
+        add(self.J1AngCur)
+        add(self.J2AngCur)
+        add(self.J3AngCur)
+        add(self.J4AngCur)
+        add(self.J5AngCur)
+        add(self.J6AngCur)
 
         # Current Positions (X, Y, Z, Rz, Ry, Rx)
-        self.calibration.insert("end", self.XcurPos)
-        self.calibration.insert("end", self.YcurPos)
-        self.calibration.insert("end", self.ZcurPos)
-        self.calibration.insert("end", self.RzcurPos)
-        self.calibration.insert("end", self.RycurPos)
-        self.calibration.insert("end", self.RxcurPos)
+        add(self.XcurPos)
+        add(self.YcurPos)
+        add(self.ZcurPos)
+        add(self.RzcurPos)
+        add(self.RycurPos)
+        add(self.RxcurPos)
 
         # Ports and Program Entry Fields
-        self.calibration.insert("end", self.comPortEntryField.get())
-        self.calibration.insert("end", self.ProgEntryField.get())
-        self.calibration.insert("end", self.servo0onEntryField.get())
-        self.calibration.insert("end", self.servo0offEntryField.get())
-        self.calibration.insert("end", self.servo1onEntryField.get())
-        self.calibration.insert("end", self.servo1offEntryField.get())
-        self.calibration.insert("end", self.DO1onEntryField.get())
-        self.calibration.insert("end", self.DO1offEntryField.get())
-        self.calibration.insert("end", self.DO2onEntryField.get())
-        self.calibration.insert("end", self.DO2offEntryField.get())
+        add(self.comPortEntryField.get())
+        add(self.ProgEntryField.get())
+        add(self.servo0onEntryField.get())
+        add(self.servo0offEntryField.get())
+        add(self.servo1onEntryField.get())
+        add(self.servo1offEntryField.get())
+        add(self.DO1onEntryField.get())
+        add(self.DO1offEntryField.get())
+        add(self.DO2onEntryField.get())
+        add(self.DO2offEntryField.get())
 
         # Transform Fields (TFx to TFrz)
-        self.calibration.insert("end", self.TFxEntryField.get())
-        self.calibration.insert("end", self.TFyEntryField.get())
-        self.calibration.insert("end", self.TFzEntryField.get())
-        self.calibration.insert("end", self.TFrxEntryField.get())
-        self.calibration.insert("end", self.TFryEntryField.get())
-        self.calibration.insert("end", self.TFrzEntryField.get())
+        add(self.TFxEntryField.get())
+        add(self.TFyEntryField.get())
+        add(self.TFzEntryField.get())
+        add(self.TFrxEntryField.get())
+        add(self.TFryEntryField.get())
+        add(self.TFrzEntryField.get())
 
         # Joint 7 to 9 Calibration Fields
-        self.calibration.insert("end", self.J7curAngEntryField.get())
-        self.calibration.insert("end", self.J8curAngEntryField.get())
-        self.calibration.insert("end", self.J9curAngEntryField.get())
+        add(self.J7curAngEntryField.get())
+        add(self.J8curAngEntryField.get())
+        add(self.J9curAngEntryField.get())
 
         # Visual Calibration Fields
-        self.calibration.insert("end", "VisFileLocEntryField")  # Placeholder
-        self.calibration.insert("end", self.visoptions.get())
-        self.calibration.insert("end", "VisPicOxPEntryField")
-        self.calibration.insert("end", "VisPicOxMEntryField")
-        self.calibration.insert("end", "VisPicOyPEntryField")
-        self.calibration.insert("end", "VisPicOyMEntryField")
-        self.calibration.insert("end", "VisPicXPEntryField")
-        self.calibration.insert("end", "VisPicXMEntryField")
-        self.calibration.insert("end", "VisPicYPEntryField")
-        self.calibration.insert("end", "VisPicYMEntryField")
+        add("VisFileLocEntryField")  # Placeholder
+        add(self.visoptions.get())
+        add("VisPicOxPEntryField")
+        add("VisPicOxMEntryField")
+        add("VisPicOyPEntryField")
+        add("VisPicOyMEntryField")
+        add("VisPicXPEntryField")
+        add("VisPicXMEntryField")
+        add("VisPicYPEntryField")
+        add("VisPicYMEntryField")
 
         # Calibration Offsets (J1 to J6)
-        self.calibration.insert("end", self.J1calOffEntryField.get())
-        self.calibration.insert("end", self.J2calOffEntryField.get())
-        self.calibration.insert("end", self.J3calOffEntryField.get())
-        self.calibration.insert("end", self.J4calOffEntryField.get())
-        self.calibration.insert("end", self.J5calOffEntryField.get())
-        self.calibration.insert("end", self.J6calOffEntryField.get())
+        add(self.J1calOffEntryField.get())
+        add(self.J2calOffEntryField.get())
+        add(self.J3calOffEntryField.get())
+        add(self.J4calOffEntryField.get())
+        add(self.J5calOffEntryField.get())
+        add(self.J6calOffEntryField.get())
 
         # Open Loop Values (J1 to J6)
-        self.calibration.insert("end", self.J1OpenLoopVal)
-        self.calibration.insert("end", self.J2OpenLoopVal)
-        self.calibration.insert("end", self.J3OpenLoopVal)
-        self.calibration.insert("end", self.J4OpenLoopVal)
-        self.calibration.insert("end", self.J5OpenLoopVal)
-        self.calibration.insert("end", self.J6OpenLoopVal)
+        add(self.J1OpenLoopVal)
+        add(self.J2OpenLoopVal)
+        add(self.J3OpenLoopVal)
+        add(self.J4OpenLoopVal)
+        add(self.J5OpenLoopVal)
+        add(self.J6OpenLoopVal)
 
         # Additional Configuration Fields
-        self.calibration.insert("end", self.com2PortEntryField.get())
-        self.calibration.insert("end", self.curTheme)
-        self.calibration.insert("end", self.J1CalStatVal)
-        self.calibration.insert("end", self.J2CalStatVal)
-        self.calibration.insert("end", self.J3CalStatVal)
-        self.calibration.insert("end", self.J4CalStatVal)
-        self.calibration.insert("end", self.J5CalStatVal)
-        self.calibration.insert("end", self.J6CalStatVal)
+        add(self.com2PortEntryField.get())
+        add(self.curTheme)
+        add(self.J1CalStatVal)
+        add(self.J2CalStatVal)
+        add(self.J3CalStatVal)
+        add(self.J4CalStatVal)
+        add(self.J5CalStatVal)
+        add(self.J6CalStatVal)
 
         # Joint 7 Calibration Parameters
-        self.calibration.insert("end", self.J7PosLim)
-        self.calibration.insert("end", self.J7rotation)
-        self.calibration.insert("end", self.J7steps)
-        self.calibration.insert("end", self.J7StepCur)
+        add(self.J7PosLim)
+        add(self.J7rotation)
+        add(self.J7steps)
+        add(self.J7StepCur)
 
         # Joint Calibration Status Values (2nd Set)
-        self.calibration.insert("end", self.J1CalStatVal2)
-        self.calibration.insert("end", self.J2CalStatVal2)
-        self.calibration.insert("end", self.J3CalStatVal2)
-        self.calibration.insert("end", self.J4CalStatVal2)
-        self.calibration.insert("end", self.J5CalStatVal2)
-        self.calibration.insert("end", self.J6CalStatVal2)
+        add(self.J1CalStatVal2)
+        add(self.J2CalStatVal2)
+        add(self.J3CalStatVal2)
+        add(self.J4CalStatVal2)
+        add(self.J5CalStatVal2)
+        add(self.J6CalStatVal2)
 
         # Visual Settings
-        self.calibration.insert("end", self.VisBrightSlide.get())
-        self.calibration.insert("end", self.VisContrastSlide.get())
-        self.calibration.insert("end", self.VisBacColorEntryField.get())
-        self.calibration.insert("end", self.VisScoreEntryField.get())
-        self.calibration.insert("end", self.VisX1PixEntryField.get())
-        self.calibration.insert("end", self.VisY1PixEntryField.get())
-        self.calibration.insert("end", self.VisX2PixEntryField.get())
-        self.calibration.insert("end", self.VisY2PixEntryField.get())
-        self.calibration.insert("end", self.VisX1RobEntryField.get())
-        self.calibration.insert("end", self.VisY1RobEntryField.get())
-        self.calibration.insert("end", self.VisX2RobEntryField.get())
-        self.calibration.insert("end", self.VisY2RobEntryField.get())
-        self.calibration.insert("end", self.VisZoomSlide.get())
+        add(self.VisBrightSlide.get())
+        add(self.VisContrastSlide.get())
+        add(self.VisBacColorEntryField.get())
+        add(self.VisScoreEntryField.get())
+        add(self.VisX1PixEntryField.get())
+        add(self.VisY1PixEntryField.get())
+        add(self.VisX2PixEntryField.get())
+        add(self.VisY2PixEntryField.get())
+        add(self.VisX1RobEntryField.get())
+        add(self.VisY1RobEntryField.get())
+        add(self.VisX2RobEntryField.get())
+        add(self.VisY2RobEntryField.get())
+        add(self.VisZoomSlide.get())
 
         # Other Options
-        self.calibration.insert("end", self.pick180.get())
-        self.calibration.insert("end", self.pickClosest.get())
-        self.calibration.insert("end", self.visoptions.get())
-        self.calibration.insert("end", self.fullRot.get())
-        self.calibration.insert("end", self.autoBG.get())
+        add(self.pick180.get())
+        add(self.pickClosest.get())
+        add(self.visoptions.get())
+        add(self.fullRot.get())
+        add(self.autoBG.get())
 
         # Miscellaneous Parameters
-        self.calibration.insert("end", self.mX1)
-        self.calibration.insert("end", self.mY1)
-        self.calibration.insert("end", self.mX2)
-        self.calibration.insert("end", self.mY2)
+        add(self.mX1)
+        add(self.mY1)
+        add(self.mX2)
+        add(self.mY2)
 
         # Joint 8 and 9 Parameters
-        self.calibration.insert("end", self.J8length)
-        self.calibration.insert("end", self.J8rotation)
-        self.calibration.insert("end", self.J8steps)
-        self.calibration.insert("end", self.J9length)
-        self.calibration.insert("end", self.J9rotation)
-        self.calibration.insert("end", self.J9steps)
+        add(self.J8length)
+        add(self.J8rotation)
+        add(self.J8steps)
+        add(self.J9length)
+        add(self.J9rotation)
+        add(self.J9steps)
 
         # Joint Calibration Offsets (J7 to J9)
-        self.calibration.insert("end", self.J7calOffEntryField.get())
-        self.calibration.insert("end", self.J8calOffEntryField.get())
-        self.calibration.insert("end", self.J9calOffEntryField.get())
+        add(self.J7calOffEntryField.get())
+        add(self.J8calOffEntryField.get())
+        add(self.J9calOffEntryField.get())
 
         # General Calibration Settings (GC_ST)
-        self.calibration.insert("end", self.GC_ST_E1_EntryField.get())
-        self.calibration.insert("end", self.GC_ST_E2_EntryField.get())
-        self.calibration.insert("end", self.GC_ST_E3_EntryField.get())
-        self.calibration.insert("end", self.GC_ST_E4_EntryField.get())
-        self.calibration.insert("end", self.GC_ST_E5_EntryField.get())
-        self.calibration.insert("end", self.GC_ST_E6_EntryField.get())
-        self.calibration.insert("end", self.GC_SToff_E1_EntryField.get())
-        self.calibration.insert("end", self.GC_SToff_E2_EntryField.get())
-        self.calibration.insert("end", self.GC_SToff_E3_EntryField.get())
-        self.calibration.insert("end", self.GC_SToff_E4_EntryField.get())
-        self.calibration.insert("end", self.GC_SToff_E5_EntryField.get())
-        self.calibration.insert("end", self.GC_SToff_E6_EntryField.get())
+        add(self.GC_ST_E1_EntryField.get())
+        add(self.GC_ST_E2_EntryField.get())
+        add(self.GC_ST_E3_EntryField.get())
+        add(self.GC_ST_E4_EntryField.get())
+        add(self.GC_ST_E5_EntryField.get())
+        add(self.GC_ST_E6_EntryField.get())
+        add(self.GC_SToff_E1_EntryField.get())
+        add(self.GC_SToff_E2_EntryField.get())
+        add(self.GC_SToff_E3_EntryField.get())
+        add(self.GC_SToff_E4_EntryField.get())
+        add(self.GC_SToff_E5_EntryField.get())
+        add(self.GC_SToff_E6_EntryField.get())
 
         # Wrist Rotation Disable
-        self.calibration.insert("end", self.DisableWristRotVal)
+        add(self.DisableWristRotVal)
 
         # Motor Direction Fields (J1 to J9)
-        self.calibration.insert("end", self.J1MotDirEntryField.get())
-        self.calibration.insert("end", self.J2MotDirEntryField.get())
-        self.calibration.insert("end", self.J3MotDirEntryField.get())
-        self.calibration.insert("end", self.J4MotDirEntryField.get())
-        self.calibration.insert("end", self.J5MotDirEntryField.get())
-        self.calibration.insert("end", self.J6MotDirEntryField.get())
-        self.calibration.insert("end", self.J7MotDirEntryField.get())
-        self.calibration.insert("end", self.J8MotDirEntryField.get())
-        self.calibration.insert("end", self.J9MotDirEntryField.get())
+        add(self.J1MotDirEntryField.get())
+        add(self.J2MotDirEntryField.get())
+        add(self.J3MotDirEntryField.get())
+        add(self.J4MotDirEntryField.get())
+        add(self.J5MotDirEntryField.get())
+        add(self.J6MotDirEntryField.get())
+        add(self.J7MotDirEntryField.get())
+        add(self.J8MotDirEntryField.get())
+        add(self.J9MotDirEntryField.get())
 
         # Calibration Direction Fields (J1 to J9)
-        self.calibration.insert("end", self.J1CalDirEntryField.get())
-        self.calibration.insert("end", self.J2CalDirEntryField.get())
-        self.calibration.insert("end", self.J3CalDirEntryField.get())
-        self.calibration.insert("end", self.J4CalDirEntryField.get())
-        self.calibration.insert("end", self.J5CalDirEntryField.get())
-        self.calibration.insert("end", self.J6CalDirEntryField.get())
-        self.calibration.insert("end", self.J7CalDirEntryField.get())
-        self.calibration.insert("end", self.J8CalDirEntryField.get())
-        self.calibration.insert("end", self.J9CalDirEntryField.get())
-
-        # Position Limits Fields (J1 to J9)
-        self.calibration.insert("end", self.J1PosLimEntryField.get())
-        self.calibration.insert("end", self.J1NegLimEntryField.get())
-        self.calibration.insert("end", self.J2PosLimEntryField.get())
-        self.calibration.insert("end", self.J2NegLimEntryField.get())
-        self.calibration.insert("end", self.J3PosLimEntryField.get())
-        self.calibration.insert("end", self.J3NegLimEntryField.get())
-        self.calibration.insert("end", self.J4PosLimEntryField.get())
-        self.calibration.insert("end", self.J4NegLimEntryField.get())
-        self.calibration.insert("end", self.J5PosLimEntryField.get())
-        self.calibration.insert("end", self.J5NegLimEntryField.get())
-        self.calibration.insert("end", self.J6PosLimEntryField.get())
-        self.calibration.insert("end", self.J6NegLimEntryField.get())
-        self.calibration.insert("end", self.J7PosLimEntryField.get())
-        self.calibration.insert("end", self.J7NegLimEntryField.get())
-        self.calibration.insert("end", self.J8PosLimEntryField.get())
-        self.calibration.insert("end", self.J8NegLimEntryField.get())
-        self.calibration.insert("end", self.J9PosLimEntryField.get())
-        self.calibration.insert("end", self.J9NegLimEntryField.get())
-
-        # Encoder Settings (J1 to J9)
-        self.calibration.insert("end", self.J1EncCPREntryField.get())
-        self.calibration.insert("end", self.J2EncCPREntryField.get())
-        self.calibration.insert("end", self.J3EncCPREntryField.get())
-        self.calibration.insert("end", self.J4EncCPREntryField.get())
-        self.calibration.insert("end", self.J5EncCPREntryField.get())
-        self.calibration.insert("end", self.J6EncCPREntryField.get())
-
-        # Drive Modes (J1 to J6)
-        self.calibration.insert("end", self.J1DriveMSEntryField.get())
-        self.calibration.insert("end", self.J2DriveMSEntryField.get())
-        self.calibration.insert("end", self.J3DriveMSEntryField.get())
-        self.calibration.insert("end", self.J4DriveMSEntryField.get())
-        self.calibration.insert("end", self.J5DriveMSEntryField.get())
-        self.calibration.insert("end", self.J6DriveMSEntryField.get())
-
-        # Step Degrees (J1 to J6)
-        self.calibration.insert("end", self.J1StepDegEntryField.get())
-        self.calibration.insert("end", self.J2StepDegEntryField.get())
-        self.calibration.insert("end", self.J3StepDegEntryField.get())
-        self.calibration.insert("end", self.J4StepDegEntryField.get())
-        self.calibration.insert("end", self.J5StepDegEntryField.get())
-        self.calibration.insert("end", self.J6StepDegEntryField.get())
-        
+        add(self.J1CalDirEntryField.get())
+        add(self.J2CalDirEntryField.get())
+        add(self.J3CalDirEntryField.get())
+        add(self.J4CalDirEntryField.get())
+        add(self.J5CalDirEntryField.get())
+        add(self.J6CalDirEntryField.get())
+        add(self.J7CalDirEntryField.get())
+        add(self.J8CalDirEntryField.get())
+        add(self.J9CalDirEntryField.get())
+
+        # Position Limits Fields (J1 to J6)
+        add(self.J1PosLimEntryField.get())
+        add(self.J1NegLimEntryField.get())
+        add(self.J2PosLimEntryField.get())
+        add(self.J2NegLimEntryField.get())
+        add(self.J3PosLimEntryField.get())
+        add(self.J3NegLimEntryField.get())
+        add(self.J4PosLimEntryField.get())
+        add(self.J4NegLimEntryField.get())
+        add(self.J5PosLimEntryField.get())
+        add(self.J5NegLimEntryField.get())
+        add(self.J6PosLimEntryField.get())
+        add(self.J6NegLimEntryField.get())
+
+        # Step Degrees, Drive Modes and Encoder Settings (J1 to J6)
+        for field in ("StepDeg", "DriveMS", "EncCPR"):
+            for joint in range(1, 7):
+                add(getattr(self, f"J{joint}{field}EntryField").get())
+
+        # DH Parameters (J1 to J6)
+        for param in ("Θ", "α", "d", "a"):
+            for joint in range(1, 7):
+                add(getattr(self, f"J{joint}{param}EntryField").get())
+
+        # G-code wait and J7 to J9 calibration status
+        add(self.GC_ST_WC_EntryField.get())
+        for suffix in ("", "2"):
+            for joint in (7, 8, 9):
+                add(getattr(self, f"J{joint}CalStatVal{suffix}"))
+
+        # Negotiated baud rates (Teensy, IO board), appended after the fields above
+        add(self.activeSession.comBaud)
+        add(self.activeSession.com2Baud)
+
         # Serialize and save the data
-        value = self.calibration.get("1.0", "end")
+        value = self.calibration.get("1.0", "end").splitlines()
         pickle.dump(value, open("ARbot.cal", "wb"))
 
     def checkSpeedVals(self):
@@ -7906,8 +7385,8 @@ class Vision:
         update_entry(self.VisRZfindEntryField, 0)
         update_entry(self.VisXpixfindEntryField, x)
         update_entry(self.VisYpixfindEntryField, y)
-        update_entry(self.SP_1_E1_EntryField, self.Xpos)
-        update_entry(self.SP_1_E2_EntryField, self.Ypos)
+        self.activeSession.registers.setPosition(1, 1, self.Xpos)
+        self.activeSession.registers.setPosition(1, 2, self.Ypos)
 
     def roborealm175(self):
         self.visfail = 1
@@ -7958,10 +7437,11 @@ class Vision:
         update_entry(self.VisRZfindEntryField, 0)
         update_entry(self.VisXpixfindEntryField, x)
         update_entry(self.VisYpixfindEntryField, y)
-        update_entry(self.SP_1_E1_EntryField, self.Xpos)
-        update_entry(self.SP_1_E2_EntryField, self.Ypos)
+        self.activeSession.registers.setPosition(1, 1, self.Xpos)
+        self.activeSession.registers.setPosition(1, 2, self.Ypos)
 
     def xyr(self):
+        session = self.activeSession
         self.visfail = 1
 
         # Update a label with specified text and style.
@@ -8014,9 +7494,9 @@ class Vision:
         update_entry(self.VisRZfindEntryField, r)
         update_entry(self.VisXpixfindEntryField, x)
         update_entry(self.VisYpixfindEntryField, y)
-        update_entry(self.SP_1_E1_EntryField, self.Xpos)
-        update_entry(self.SP_1_E2_EntryField, self.Ypos)
-        update_entry(self.SP_1_E3_EntryField, r)
+        session.registers.setPosition(1, 1, self.Xpos)
+        session.registers.setPosition(1, 2, self.Ypos)
+        session.registers.setPosition(1, 3, r)
 
     def viscalc(self):
         # Retrieve and convert an entry field's value to float.
@@ -8613,10 +8093,7 @@ class GCODE:
         # Send and handle command
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
-        response = self.ser.readline().strip().decode('utf-8')
+        response = self.activeSession.teensy.send(command)
 
         if response.startswith("E"):
             self.ErrorHandler(response)
@@ -8626,7 +8103,7 @@ class GCODE:
     def GCstepFwd(self):
         # Update GCode status
         self.GCalmStatusLab.configure(text="GCODE READY", text_color="green", font=('Arial', 10, 'bold'))
-        self.GCexecuteRow()
+        self.GCexecuteRow(self.activeSession)
 
         # Get the currently selected row and total rows
         selected_row = self.gcodeView.curselection()[0]
@@ -8665,12 +8142,9 @@ class GCODE:
         command = f"DGFn{full_filename}\n"
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
 
         # Process response
-        response = self.ser.readline().strip().decode('utf-8')
+        response = self.activeSession.teensy.send(command)
         if response.startswith('E'):
             self.ErrorHandler(response)
             return
@@ -8689,12 +8163,9 @@ class GCODE:
         command = "RG\n"
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(0.1)
 
         # Receive and process the response
-        response = self.ser.readline().strip().decode('utf-8')
+        response = self.activeSession.teensy.send(command)
         if response.startswith('E'):
             self.ErrorHandler(response)
             return
@@ -8722,20 +8193,22 @@ class GCODE:
         # If filename exists, update status and run the file
         self.GCalmStatusLab.configure(text=f"Running G-code File: {filename}", text_color="green", font=('Arial', 10, 'bold'))
 
-    def GCplayProg(self, Filename):
-        self.GCalmStatusLab.configure(text="GCODE FILE RUNNING", fg_color="green")
-
-        def GCthreadPlay():
-            Fn = Filename + ".txt"
-            command = "PG" + "Fn" + Fn + "\n"
-            self.cmdSentEntryField.delete(0, 'end')
-            self.cmdSentEntryField.insert(0, command)
+    def GCplayProg(self, session, Filename):
+        # The file plays on session's arm; the GUI follows it only while that arm is selected
+        if session is self.activeSession:
+            self.GCalmStatusLab.configure(text="GCODE FILE RUNNING", fg_color="green")
 
-            self.ser.write(command.encode())
-            self.ser.flushInput()
-            time.sleep(.1)
+        Fn = Filename + ".txt"
+        command = "PG" + "Fn" + Fn + "\n"
+        self.showCommand(session, command)
+        future = session.teensy.submit(command)
 
-            response = str(self.ser.readline().strip(), 'utf-8')
+        def GCthreadPlay():
+            response = future.result()
+            if session is not self.activeSession:
+                if response[:1] == 'E':
+                    session.lastError = response
+                return
             if response[:1] == 'E':
                 self.ErrorHandler(response)
             else:
@@ -8751,6 +8224,7 @@ class GCODE:
         # Start the process in a separate thread
         GCplay = threading.Thread(target=GCthreadPlay)
         GCplay.start()
+        return future
 
     def GCconvertProg(self):
         if self.GcodeProgEntryField.get() == "":
@@ -8760,15 +8234,15 @@ class GCODE:
             messagebox.showwarning("warning", "Please Enter a Filename")
             return
 
+        # The conversion thread keeps sending to the arm selected now
+        session = self.activeSession
+
         # Prepare command and update UI fields
         Filename = self.GcodeFilenameField.get() + ".txt"
         command = "DG" + "Fn" + Filename + "\n"
         self.cmdSentEntryField.delete(0, 'end')
         self.cmdSentEntryField.insert(0, command)
-        self.ser.write(command.encode())
-        self.ser.flushInput()
-        time.sleep(.1)
-        response = str(self.ser.readline().strip(), 'utf-8')
+        response = session.teensy.send(command)
         last = self.gcodeView.index('end')
         for row in range(0, last):
             self.gcodeView.itemconfig(row, {'fg': 'black'})
@@ -8797,11 +8271,8 @@ class GCODE:
                 self.GCalmStatusLab.configure(
                     text="GCODE CONVERSION RUNNING", text_color="green", font=('Arial', 10, 'bold'))
 
-                self.GCrowinproc = 1
-                self.GCexecuteRow()
-
-                while self.GCrowinproc == 1:
-                    time.sleep(.1)
+                # Returns as soon as the controller has answered the row
+                self.GCexecuteRow(session)
 
                 try:
                     GCselRow = self.gcodeView.curselection()[0]
@@ -8822,6 +8293,7 @@ class GCODE:
         GCt.start()
 
     def GCstopProg(self):
+        session = self.activeSession
         self.tab7.GCrunTrue = 0
         self.GCalmStatusLab.configure(text="GCODE CONVERSION STOPPED", text_color="red", font=('Arial', 10, 'bold'))
 
@@ -8831,22 +8303,21 @@ class GCODE:
                 self.GCstopQueue = "0"
                 stop()
 
-            if self.moveInProc == 1:
-                self.moveInProc = 2
+            if session.moveInProc == 1:
+                session.moveInProc = 2
 
             command = "SS\n"
             self.cmdSentEntryField.delete(0, 'end')
             self.cmdSentEntryField.insert(0, command)
-            self.ser.write(command.encode())
-            self.ser.flushInput()
-            response = str(self.ser.readline().strip(), 'utf-8')
+            response = session.teensy.send(command)
 
             if response[:1] == 'E':
                 self.ErrorHandler(response)
             else:
                 self.displayPosition(response)
 
-    def GCexecuteRow(self):
+    def GCexecuteRow(self, session):
+        # session is the arm the conversion was started on; the position fields show only the selected arm
         def parse_coordinate(command, axis, default_val):
             if axis in command:
                 value = command[command.find(axis) + 1:]
@@ -8895,18 +8366,14 @@ class GCODE:
                     for i in range(4, 7)
                 ]
                 command = create_gcode_command(xVal, yVal, zVal, rzVal, ryVal, rxVal, str(self.J7PosCur), "25")
-                self.cmdSentEntryField.delete(0, 'end')
-                self.cmdSentEntryField.insert(0, command)
-                self.ser.write(command.encode())
-                self.ser.flushInput()
-                time.sleep(.1)
-                response = str(self.ser.readline().strip(), 'utf-8')
+                self.showCommand(session, command)
+                response = session.teensy.send(command)
                 if response.startswith('E'):
                     self.ErrorHandler(response)
                     self.GCstopProg()
                     self.tab7.GCrunTrue = 0
                     self.GCalmStatusLab.configure(text="UNABLE TO WRITE TO SD CARD", text_color="red", font=('Arial', 10, 'bold'))
-                else:
+                elif session is self.activeSession:
                     self.displayPosition(response)
 
             elif subCmd in {"0", "1"}:
@@ -8923,22 +8390,2664 @@ class GCODE:
                 speed = self.gcodeSpeed if subCmd == "1" else self.speedEntryField.get()
                 command = create_gcode_command(xVal, yVal, zVal, rzVal, ryVal, rxVal, J7Val, speed)
                 self.prevxVal, self.prevyVal, self.prevzVal = xVal, yVal, zVal
-                self.cmdSentEntryField.delete(0, 'end')
-                self.cmdSentEntryField.insert(0, command)
-                self.ser.write(command.encode())
-                self.ser.flushInput()
-                time.sleep(.05)
-                response = str(self.ser.readline().strip(), 'utf-8')
+                self.showCommand(session, command)
+                response = session.teensy.send(command)
                 if response.startswith('E'):
                     self.ErrorHandler(response)
                     self.tab7.GCrunTrue = 0
                     self.GCalmStatusLab.configure(text="UNABLE TO WRITE TO SD CARD", text_color="red", font=('Arial', 10, 'bold'))
-                else:
+                elif session is self.activeSession:
                     self.displayPosition(response)
 
-        self.GCrowinproc = 0
+
+class SerialTransport:
+    # Owns a serial port: one reader thread frames newline terminated replies and
+    # hands each one to the oldest outstanding command future, in send order.
+    #
+    # Sequenced links tag each command "@<seq>" (4 hex digits). The controller
+    # answers "!<seq>" as soon as it reads the command and "@<seq><reply>" when it is
+    # done. It reads a command only once the one before it is done, so the ack timer
+    # of a command starts when it reaches the head of the queue, not when it was
+    # written: one left unacked ackTimeout after that is resent, at most maxRetries
+    # times. The controller skips sequence numbers it has already executed and only
+    # repeats the ack/reply, and the host drops replies for sequences it has settled.
+    pollInterval = 0.05
+    ackTimeout = 0.5
+    maxRetries = 3
+
+    def __init__(self, ser, name, framing=None, sequenced=False):
+        self.ser = ser
+        self.name = name
+        self.framing = framing
+        self.sequenced = sequenced
+        self.sequence = 0
+        self.inflight = collections.OrderedDict()
+        self.pending = collections.deque()
+        self.listeners = []
+        self.streams = {}
+        self.taps = []
+        self.timers = []
+        self.writeLock = threading.RLock()
+        self.running = True
+
+        self.ser.timeout = self.pollInterval
+        self.ser.reset_input_buffer()
+
+        self.reader = threading.Thread(target=self.readLoop, name=f"{name} reader", daemon=True)
+        self.reader.start()
+
+    def submit(self, command):
+        # Queue a command and return a future that resolves with its reply
+        return self.submitBatch([command])[0]
+
+    def submitBatch(self, commands):
+        # Queue several commands with a single write, futures in command order
+        futures = [Future() for _ in commands]
+        with self.writeLock:
+            now = time.monotonic()
+            for future in futures:
+                future.sentAt = now
+                future.ackedAt = None
+            if not self.running:
+                for future in futures:
+                    future.set_exception(serial.SerialException(f"{self.name} link is closed"))
+                return futures
+            chunks = []
+            for command, future in zip(commands, futures):
+                if self.sequenced:
+                    self.sequence = (self.sequence + 1) % 0x10000
+                    data = f"@{self.sequence:04X}".encode() + self.encode(command)
+                    self.inflight[self.sequence] = [future, data, now, 0, False]
+                else:
+                    data = self.encode(command)
+                    self.pending.append(future)
+                chunks.append(data)
+            self.ser.write(b"".join(chunks))
+        return futures
+
+    def send(self, command, timeout=None):
+        # Send a command and block until the controller replies
+        return self.submit(command).result(timeout)
+
+    def submitIdle(self, command):
+        # Submit only if no command is waiting for a reply, checked under the write
+        # lock so nothing can be queued in between; None if the link was busy
+        with self.writeLock:
+            if self.busy():
+                return None
+            return self.submit(command)
+
+    def write(self, command):
+        # Send a command that the controller does not answer
+        with self.writeLock:
+            self.ser.write(self.encode(command))
+
+    def busy(self):
+        return bool(self.pending or self.inflight)
+
+    def encode(self, command):
+        if self.framing:
+            return self.framing.encode(command)
+        return command.encode()
+
+    @staticmethod
+    def probe(ser, command, timeout=0.5):
+        # Raw request/reply used during connection setup, before a reader thread owns the port
+        ser.reset_input_buffer()
+        ser.write(command.encode())
+        deadline = time.monotonic() + timeout
+        line = b""
+        while time.monotonic() < deadline and not line.endswith(b"\n"):
+            line += ser.readline()
+        return str(line.strip(), 'utf-8', errors='replace')
+
+    @staticmethod
+    def negotiateSequencing(ser):
+        try:
+            return SerialTransport.probe(ser, "SQ\n") == "SQ1"
+        except (serial.SerialException, OSError):
+            return False
+
+    def subscribe(self, callback, prefix=None):
+        # Receive lines that arrive while no command is waiting for a reply. Lines
+        # starting with prefix are streamed frames and never count as a reply.
+        if prefix:
+            self.streams[prefix] = callback
+        else:
+            self.listeners.append(callback)
+
+    def tap(self, callback):
+        # See every reply as it is matched to its command
+        self.taps.append(callback)
+
+    def timing(self, callback):
+        # Called with each completed future, stamped with sentAt, ackedAt (sequenced
+        # links only) and repliedAt in time.monotonic() seconds
+        self.timers.append(callback)
+
+    def complete(self, future, reply):
+        for callback in self.taps:
+            callback(reply)
+        if self.timers:
+            future.repliedAt = time.monotonic()
+            for callback in self.timers:
+                callback(future)
+        if not future.cancelled():
+            future.set_result(reply)
+
+    def readLoop(self):
+        buffer = bytearray()
+        while self.running:
+            try:
+                chunk = self.ser.read(self.ser.in_waiting or 1)
+            except (serial.SerialException, OSError) as e:
+                self.failPending(e)
+                break
+            if self.inflight:
+                self.retransmit()
+            if not chunk:
+                continue
+
+            buffer.extend(chunk)
+            newline = buffer.find(b"\n")
+            while newline != -1:
+                line = bytes(buffer[:newline])
+                del buffer[:newline + 1]
+                self.dispatch(str(line.strip(), 'utf-8', errors='replace'))
+                newline = buffer.find(b"\n")
+
+    def dispatch(self, response):
+        stream = self.streams.get(response[:2])
+        if stream is not None:
+            stream(response[2:])
+            return
+        if self.sequenced and response[:1] in ("!", "@"):
+            self.settle(response)
+            return
+        with self.writeLock:
+            future = self.pending.popleft() if self.pending else None
+        if future is not None:
+            self.complete(future, response)
+            return
+        for callback in self.listeners:
+            callback(response)
+
+    def settle(self, response):
+        try:
+            sequence = int(response[1:5], 16)
+        except ValueError:
+            for callback in self.listeners:
+                callback(response)
+            return
+        with self.writeLock:
+            entry = self.inflight.get(sequence)
+            if entry is None:
+                # Ack or reply for a command already settled, i.e. a retransmit duplicate
+                return
+            if response[0] == "!":
+                entry[4] = True
+                entry[0].ackedAt = time.monotonic()
+                return
+            del self.inflight[sequence]
+            # The next command only now reaches the head of the controller's queue
+            if self.inflight:
+                head = next(iter(self.inflight.values()))
+                head[2] = max(head[2], time.monotonic())
+        self.complete(entry[0], response[5:].strip())
+
+    def retransmit(self):
+        # Only the head is being read by the controller; the rest are queued behind it
+        now = time.monotonic()
+        with self.writeLock:
+            sequence, entry = next(iter(self.inflight.items()), (None, None))
+            if entry is None or entry[4] or now - entry[2] < self.ackTimeout:
+                return
+            if entry[3] < self.maxRetries:
+                self.ser.write(entry[1])
+                entry[2] = now
+                entry[3] += 1
+                return
+            del self.inflight[sequence]
+            if self.inflight:
+                next(iter(self.inflight.values()))[2] = now
+        if not entry[0].done():
+            entry[0].set_exception(serial.SerialTimeoutException(
+                f"{self.name} did not acknowledge command after {self.maxRetries} retries"
+            ))
+
+    def failPending(self, error):
+        with self.writeLock:
+            self.running = False
+            pending, self.pending = self.pending, collections.deque()
+            inflight, self.inflight = self.inflight, collections.OrderedDict()
+        for future in list(pending) + [entry[0] for entry in inflight.values()]:
+            if not future.done():
+                future.set_exception(error)
+
+    def close(self):
+        self.failPending(serial.SerialException(f"{self.name} link is closed"))
+        if self.reader is not threading.current_thread():
+            self.reader.join(timeout=1)
+        self.ser.close()
+
+
+
+class MotionLookahead:
+    # Streams the Move J / Move L / Move R rows that follow the executing row so the
+    # controller can start each move as soon as the previous one finishes. Look-ahead
+    # stops at the first row of any other type, so rows whose outcome depends on the
+    # current one (If Input, Wait I, Vis Find, jumps, calls) are never sent early.
+    #
+    # On stop, error or a row the queue does not expect, flushCommand tells the
+    # controller to drop the motion commands buffered after the executing row's
+    # move, i.e. the ones sent by look-ahead. Each is answered "EQ" in order, then the
+    # flush itself replies "FQ". The executing row's move (the one in progress, or
+    # the first buffered if none has started yet) still runs and replies.
+    motionTypes = ("Move J", "Move L", "Move R")
+    flushCommand = "FQ\n"
+    rzField = re.compile(r"Rz(-?[0-9.]+(?:[eE][-+]?[0-9]+)?)")
+
+    def __init__(self, transport, depth=3):
+        self.transport = transport
+        self.depth = depth
+        self.queued = collections.deque()
+        self.lock = threading.Lock()
+
+    def fill(self, row, getRow, build, previous):
+        # previous is the command sent for row. Move L flips Rz to the sign of the Rz
+        # the preceding move ends at, so it is built from that target rather than the
+        # pose reported now; a Move L after a Move R (joint target) is not sent early.
+        with self.lock:
+            if self.queued:
+                nextRow, previous = self.queued[-1][0] + 1, self.queued[-1][3]
+            else:
+                nextRow = row + 1
+            while len(self.queued) < self.depth:
+                command = getRow(nextRow)
+                if not command or command[:6] not in self.motionTypes:
+                    break
+                rz = self.targetRz(previous)
+                if command[:6] == "Move L" and rz is None:
+                    break
+                formatted = build(command, rz)
+                self.queued.append((nextRow, command, self.transport.submit(formatted), formatted))
+                previous = formatted
+                nextRow += 1
+
+    @classmethod
+    def targetRz(cls, formatted):
+        match = cls.rzField.search(formatted)
+        return float(match.group(1)) if match else None
+
+    def take(self, row, command):
+        # Return the reply future for row if it is the next one already on the wire.
+        # Anything else queued is flushed from the controller before row is sent.
+        with self.lock:
+            if self.queued and self.queued[0][0] == row and self.queued[0][1] == command:
+                return self.queued.popleft()[2]
+        self.flush()
+        return None
+
+    def flush(self):
+        # Drop queued rows on stop or error and have the controller discard them too.
+        # Their "EQ" replies are still consumed by the transport so later commands stay
+        # matched to the right response. Returns the flush future, or None if idle.
+        with self.lock:
+            queued, self.queued = self.queued, collections.deque()
+            if not queued:
+                return None
+            flushed = self.transport.submit(self.flushCommand)
+        for row, command, future, formatted in queued:
+            future.cancel()
+        return flushed
+
+
+
+class BinaryFraming:
+    # Compact framing for motion commands, negotiated at connect time. Each frame is
+    #   sync 0xA5 | opcode u8 | payload length u16 | CRC-16/CCITT u16 | payload
+    # where the payload is a fixed little-endian layout of packed floats. Commands
+    # without an opcode are still sent as ASCII lines, which the controller tells
+    # apart from frames by the sync byte.
+    sync = 0xA5
+    version = "1"
+    header = struct.Struct("<BBHH")
+    motion = struct.Struct("<14fccBB")
+
+    # ASCII prefix -> (opcode, field labels in the order the command builders emit them)
+    opcodes = {
+        "MJ": (1, ("X", "Y", "Z", "Rz", "Ry", "Rx", "J7", "J8", "J9", "S", "Ac", "Dc", "Rm", "W", "Lm")),
+        "ML": (2, ("X", "Y", "Z", "Rz", "Ry", "Rx", "J7", "J8", "J9", "S", "Ac", "Dc", "Rm", "Rnd", "W", "Lm", "Q")),
+        "RJ": (3, ("A", "B", "C", "D", "E", "F", "J7", "J8", "J9", "S", "Ac", "Dc", "Rm", "W", "Lm")),
+        "WC": (4, ("X", "Y", "Z", "Rz", "Ry", "Rx", "J7", "J8", "J9", "S", "Ac", "Dc", "Rm", "Rnd", "W", "Lm", "Fn")),
+    }
+    targets = ("X", "Y", "Z", "Rz", "Ry", "Rx", "A", "B", "C", "D", "E", "F", "J7", "J8", "J9")
+
+    @classmethod
+    def negotiate(cls, ser):
+        # Controllers that understand frames answer BF with their frame version
+        try:
+            reply = SerialTransport.probe(ser, "BF\n")
+        except (serial.SerialException, OSError):
+            return None
+        ser.reset_input_buffer()
+        return cls() if reply == "BF" + cls.version else None
+
+    def encode(self, command):
+        spec = self.opcodes.get(command[:2])
+        if spec is None:
+            return command.encode()
+        opcode, labels = spec
+        try:
+            fields = self.splitFields(command, labels)
+            payload = self.packMotion(fields) + fields.get("Fn", "").encode()
+        except (ValueError, struct.error):
+            # Anything the fixed layout cannot carry goes out unchanged
+            return command.encode()
+        crc = binascii.crc_hqx(struct.pack("<BH", opcode, len(payload)) + payload, 0xFFFF)
+        return self.header.pack(self.sync, opcode, len(payload), crc) + payload
+
+    @staticmethod
+    def splitFields(command, labels):
+        # Walk the labels in order, each value runs up to the next label
+        body = command.strip()
+        indices = []
+        pos = 2
+        for label in labels:
+            index = body.find(label, pos)
+            if index == -1:
+                raise ValueError(f"Label '{label}' not found in command.")
+            indices.append(index)
+            pos = index + len(label)
+        ends = indices[1:] + [len(body)]
+        return {
+            label: body[index + len(label):end].strip()
+            for label, index, end in zip(labels, indices, ends)
+        }
+
+    def packMotion(self, fields):
+        values = [float(fields[label]) for label in self.targets if label in fields]
+
+        # Move J keeps its speed type letter in front of the value (Sp, Ss, Sm)
+        speed = fields["S"]
+        speedType = speed[:1] if speed[:1].isalpha() else "p"
+        speed = speed[1:] if speed[:1].isalpha() else speed
+
+        values += [float(speed)] + [float(fields.get(label) or 0) for label in ("Ac", "Dc", "Rm", "Rnd")]
+        loopMode = int(fields["Lm"][::-1] or "0", 2)
+        flags = int(fields.get("Q") or 0)
+        return self.motion.pack(*values, speedType.encode(), fields["W"][:1].encode(), loopMode, flags)
+
+
+
+class BaudNegotiation:
+    # Boards always come up at their safe rate. The host asks which rates the
+    # firmware supports ("BR" -> "BR9600,115200,..."), requests the highest one both
+    # sides share ("BS<rate>" -> "BS<rate>"), switches its own port and confirms the
+    # link with a second "BR". Firmware that does not answer BR keeps the safe rate.
+    # The rate saved from the last session is requested first when both sides have it.
+    rates = (2000000, 1000000, 921600, 460800, 230400, 115200, 57600, 19200, 9600)
+    attempts = 3
+
+    @classmethod
+    def connect(cls, port, safeBaud, savedBaud="", opener=serial.Serial):
+        # Always open at the safe rate the board boots at; the rate that worked last
+        # time is only tried first during negotiation
+        try:
+            savedBaud = int(savedBaud)
+        except (TypeError, ValueError):
+            savedBaud = 0
+        ser = opener(port, safeBaud, timeout=SerialTransport.pollInterval)
+        return ser, cls.negotiate(ser, safeBaud, savedBaud)
+
+    @classmethod
+    def negotiate(cls, ser, safeBaud, preferred=0):
+        supported = cls.supported(ser)
+        candidates = [rate for rate in cls.rates if rate in supported and rate > safeBaud]
+        if preferred in candidates:
+            candidates.remove(preferred)
+            candidates.insert(0, preferred)
+        for baud in candidates:
+            if SerialTransport.probe(ser, f"BS{baud}\n") != f"BS{baud}":
+                continue
+            ser.baudrate = baud
+            if cls.confirm(ser):
+                return baud
+            # No answer at the new rate, the firmware drops back to its safe rate on its own
+            ser.baudrate = safeBaud
+            time.sleep(0.1)
+        return safeBaud
+
+    @classmethod
+    def supported(cls, ser):
+        reply = SerialTransport.probe(ser, "BR\n")
+        if not reply.startswith("BR"):
+            return set()
+        return {int(rate) for rate in reply[2:].split(",") if rate.strip().isdigit()}
+
+    @classmethod
+    def confirm(cls, ser):
+        # A rate counts as stable once it carries a few clean round trips
+        for _ in range(cls.attempts):
+            if not SerialTransport.probe(ser, "BR\n").startswith("BR"):
+                return False
+        return True
+
+
+
+class AuxSerialPool:
+    # Shared handles for auxiliary serial devices (Read COM, If COM, Test Aux COM).
+    # Ports stay open between reads, are reopened once if a read fails and are
+    # closed by a reaper thread after sitting idle. The pool lock only guards the
+    # tables; a blocking read holds just its own port's lock.
+    idleTimeout = 30.0
+
+    def __init__(self, idleTimeout=None):
+        if idleTimeout is not None:
+            self.idleTimeout = idleTimeout
+        self.lock = threading.RLock()
+        self.ports = {}
+        self.portLocks = {}
+        self.responses = {}
+        self.reaper = None
+
+    def acquire(self, port, baud=115200, timeout=10):
+        key = (port, baud, timeout)
+        with self.lock:
+            entry = self.ports.get(key)
+            if entry is None or not entry[0].is_open:
+                entry = [serial.Serial(port, baud, timeout=timeout), time.monotonic()]
+                self.ports[key] = entry
+                self.startReaper()
+            entry[1] = time.monotonic()
+            return entry[0]
+
+    def portLock(self, port):
+        with self.lock:
+            return self.portLocks.setdefault(port, threading.Lock())
+
+    def read(self, port, numChar=None, baud=115200, timeout=10, flush=False):
+        # One reconnect per read, a device unplugged and replugged comes back on its own
+        with self.portLock(port):
+            for attempt in range(2):
+                ser = self.acquire(port, baud, timeout)
+                try:
+                    if flush:
+                        ser.reset_input_buffer()
+                    data = ser.read(numChar) if numChar else ser.readline()
+                    break
+                except (serial.SerialException, OSError):
+                    self.release(port, baud, timeout)
+                    if attempt:
+                        raise
+            response = str(data.strip(), 'utf-8', errors='replace')
+            with self.lock:
+                self.responses[port] = response
+                entry = self.ports.get((port, baud, timeout))
+                if entry:
+                    entry[1] = time.monotonic()
+            return response
+
+    def lastResponse(self, port, default=""):
+        return self.responses.get(port, default)
+
+    def release(self, port, baud=115200, timeout=10):
+        with self.lock:
+            entry = self.ports.pop((port, baud, timeout), None)
+        if entry:
+            try:
+                entry[0].close()
+            except (serial.SerialException, OSError):
+                pass
+
+    def closeIdle(self):
+        now = time.monotonic()
+        with self.lock:
+            idle = [key for key, (ser, lastUsed) in self.ports.items() if now - lastUsed > self.idleTimeout]
+        for key in idle:
+            # A port in the middle of a read is not idle
+            portLock = self.portLock(key[0])
+            if portLock.acquire(blocking=False):
+                try:
+                    self.release(*key)
+                finally:
+                    portLock.release()
+
+    def closeAll(self):
+        with self.lock:
+            keys = list(self.ports)
+        for key in keys:
+            self.release(*key)
+
+    def startReaper(self):
+        if self.reaper and self.reaper.is_alive():
+            return
+
+        def reap():
+            while True:
+                time.sleep(self.idleTimeout / 2)
+                self.closeIdle()
+                with self.lock:
+                    if not self.ports:
+                        self.reaper = None
+                        return
+
+        self.reaper = threading.Thread(target=reap, daemon=True)
+        self.reaper.start()
+
+
+
+class ReplyFormatError(ValueError):
+    pass
+
+
+class PositionSample:
+    # One decoded position reply. Joint angles and positions are floats, the
+    # status fields stay text as the controller sent them.
+    __slots__ = (
+        "j1", "j2", "j3", "j4", "j5", "j6", "x", "y", "z", "rz", "ry", "rx",
+        "speedViolation", "debug", "flag", "j7", "j8", "j9",
+    )
+
+    textFields = ("speedViolation", "debug", "flag")
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name, "" if name in self.textFields else 0.0))
+
+    def joints(self):
+        return (self.j1, self.j2, self.j3, self.j4, self.j5, self.j6, self.j7, self.j8, self.j9)
+
+    def cartesian(self):
+        return (self.x, self.y, self.z, self.rz, self.ry, self.rx)
+
+
+class ReplyParser:
+    # Controller position replies come in two shapes:
+    #   full     A<j1>B<j2>C<j3>D<j4>E<j5>F<j6>G<x>H<y>I<z>J<rz>K<ry>L<rx>M<speed>N<debug>O<flag>P<j7>Q<j8>R<j9>
+    #   short    ... X<x> Y<y> Z<z> Rz<rz> Ry<ry> Rx<rx> ...
+    # Both are matched by one compiled pattern each, in a single pass over the reply.
+    number = r"\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*"
+    text = r"(.*?)"
+    fullFields = (
+        ("A", "j1", number), ("B", "j2", number), ("C", "j3", number), ("D", "j4", number),
+        ("E", "j5", number), ("F", "j6", number), ("G", "x", number), ("H", "y", number),
+        ("I", "z", number), ("J", "rz", number), ("K", "ry", number), ("L", "rx", number),
+        ("M", "speedViolation", text), ("N", "debug", text), ("O", "flag", text),
+        ("P", "j7", number), ("Q", "j8", number), ("R", "j9", number),
+    )
+    fullPattern = re.compile("".join(label + group for label, _, group in fullFields) + "$", re.S)
+    shortFields = ("x", "y", "z", "rz", "ry", "rx")
+    shortPattern = re.compile("X" + number + "Y" + number + "Z" + number + "Rz" + number + "Ry" + number + "Rx" + number)
+
+    @classmethod
+    def parse(cls, response):
+        response = response.strip()
+        match = cls.fullPattern.match(response)
+        if match:
+            values = {}
+            for (_, name, group), value in zip(cls.fullFields, match.groups()):
+                values[name] = float(value) if group is cls.number else value.strip()
+            return PositionSample(**values)
+
+        match = cls.shortPattern.search(response)
+        if match:
+            return PositionSample(**dict(zip(cls.shortFields, map(float, match.groups()))))
+
+        if not response:
+            raise ReplyFormatError("Empty reply from controller.")
+        raise ReplyFormatError(f"Unrecognized position reply: '{response[:60]}'")
+
+
+
+class PositionTelemetry:
+    # Timestamped history of controller poses in a fixed-size numpy ring buffer.
+    # Only the transport reader thread writes; readers take latest() which is a
+    # single reference swap, so neither side takes a lock.
+    columns = (
+        "time", "j1", "j2", "j3", "j4", "j5", "j6", "j7", "j8", "j9",
+        "x", "y", "z", "rz", "ry", "rx", "speedViolation", "flag",
+    )
+
+    def __init__(self, capacity=2048):
+        self.capacity = capacity
+        self.samples = np.zeros((capacity, len(self.columns)))
+        self.count = 0
+        self.last = None
+        self.transport = None
+        self.poller = None
+        self.polling = False
+
+    # Stream prefix; "TM" is already the controller's test command echo
+    prefix = "PS"
+    # Share of the link the RP poller may take, from the measured RP reply time
+    pollShare = 0.25
+    replyTimeout = 2.0
+
+    @classmethod
+    def negotiate(cls, ser, interval):
+        # Firmware that streams poses acknowledges "PS<ms>" and then sends "PS<pose>" lines
+        ms = int(interval * 1000)
+        try:
+            return SerialTransport.probe(ser, f"{cls.prefix}{ms}\n") == f"{cls.prefix}{ms}"
+        except (serial.SerialException, OSError):
+            return False
+
+    def attach(self, transport, interval=0.1, streaming=False, wanted=lambda: True):
+        # Without streaming, poses are polled only while wanted() says someone looks at them
+        self.detach()
+        self.transport = transport
+        if streaming:
+            transport.subscribe(self.record, prefix=self.prefix)
+        transport.tap(self.record)
+        if not streaming:
+            self.startPolling(interval, wanted)
+
+    def detach(self):
+        self.polling = False
+        if self.poller and self.poller is not threading.current_thread():
+            self.poller.join(timeout=1)
+        self.poller = None
+        self.transport = None
+
+    def startPolling(self, interval, wanted):
+        # Older firmware does not stream, so ask for the pose while no command is
+        # waiting. The period stretches with the measured RP reply time (about 135 ms
+        # at 9600 baud) so a user command rarely has to queue behind a poll.
+        def poll():
+            period = interval
+            while self.polling:
+                transport = self.transport
+                if transport is None or not transport.running:
+                    break
+                future = transport.submitIdle("RP\n") if wanted() else None
+                if future is not None:
+                    sent = time.monotonic()
+                    try:
+                        future.result(self.replyTimeout)
+                    except FutureTimeoutError:
+                        pass
+                    except (serial.SerialException, OSError):
+                        break
+                    period = max(interval, (time.monotonic() - sent) / self.pollShare)
+                time.sleep(period)
+
+        self.polling = True
+        self.poller = threading.Thread(target=poll, name="telemetry poller", daemon=True)
+        self.poller.start()
+
+    def record(self, response):
+        # Replies that are not poses (Done, errors, acknowledgements) are skipped
+        try:
+            sample = ReplyParser.parse(response)
+        except ReplyFormatError:
+            return None
+        self.store(sample)
+        return sample
+
+    def store(self, sample, timestamp=None):
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        row = self.samples[self.count % self.capacity]
+        row[0] = timestamp
+        row[1:10] = sample.joints()
+        row[10:16] = sample.cartesian()
+        row[16] = 1.0 if str(sample.speedViolation) == "1" else 0.0
+        row[17] = 1.0 if sample.flag else 0.0
+        self.last = (timestamp, sample)
+        self.count += 1
+
+    def latest(self):
+        # (monotonic timestamp, PositionSample) of the newest pose, or None
+        return self.last
+
+    def history(self, count=None):
+        # Copy of the stored rows, oldest first
+        stored = min(self.count, self.capacity)
+        count = stored if count is None else min(count, stored)
+        end = self.count % self.capacity
+        rows = np.roll(self.samples, -end, axis=0) if self.count >= self.capacity else self.samples[:end]
+        return rows[len(rows) - count:].copy()
+
+
+
+class SerialRecorder:
+    # Binary session log shared by the controller and IO board ports. After the
+    # magic, each record is
+    #   monotonic seconds since start f64 | port u8 | direction u8 (0 sent, 1 received) | length u32 | bytes
+    magic = b"ARSL1\n"
+    record = struct.Struct("<dBBI")
+    sent = 0
+    received = 1
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(self.magic)
+        self.lock = threading.Lock()
+        self.start = time.monotonic()
+
+    def wrap(self, ser, portId):
+        return RecordedPort(ser, self, portId)
+
+    def log(self, portId, direction, data):
+        if not data:
+            return
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.write(self.record.pack(time.monotonic() - self.start, portId, direction, len(data)))
+            self.file.write(data)
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    @classmethod
+    def load(cls, path):
+        # List of (seconds, port, direction, bytes) in recorded order
+        with open(path, "rb") as f:
+            content = f.read()
+        if not content.startswith(cls.magic):
+            raise ValueError(f"{path} is not a serial session log")
+        events = []
+        offset = len(cls.magic)
+        while offset + cls.record.size <= len(content):
+            seconds, portId, direction, length = cls.record.unpack_from(content, offset)
+            offset += cls.record.size
+            events.append((seconds, portId, direction, content[offset:offset + length]))
+            offset += length
+        return events
+
+
+class RecordedPort:
+    # Stands in for a serial.Serial and copies every byte through the recorder
+    def __init__(self, ser, recorder, portId):
+        self.__dict__.update(ser=ser, recorder=recorder, portId=portId)
+
+    def __getattr__(self, name):
+        return getattr(self.ser, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.ser, name, value)
+
+    def write(self, data):
+        self.recorder.log(self.portId, SerialRecorder.sent, data)
+        return self.ser.write(data)
+
+    def read(self, size=1):
+        data = self.ser.read(size)
+        self.recorder.log(self.portId, SerialRecorder.received, data)
+        return data
+
+    def readline(self):
+        data = self.ser.readline()
+        self.recorder.log(self.portId, SerialRecorder.received, data)
+        return data
+
+
+class FakePort:
+    # The part of the serial.Serial interface the app uses, backed by an in-memory
+    # receive buffer. Subclasses fill the buffer from write() or release().
+    def __init__(self):
+        self.timeout = None
+        self.baudrate = 0
+        self.is_open = True
+        self.lock = threading.Lock()
+        self.buffer = bytearray()
+
+    def reopen(self, baud, timeout=None):
+        self.baudrate = baud
+        self.timeout = timeout
+        self.is_open = True
+        return self
+
+    def release(self):
+        pass
+
+    @property
+    def in_waiting(self):
+        self.release()
+        return len(self.buffer)
+
+    def write(self, data):
+        return len(data)
+
+    def read(self, size=1):
+        return self.take(lambda: size if len(self.buffer) >= size else None)
+
+    def readline(self):
+        def lineEnd():
+            newline = self.buffer.find(b"\n")
+            return newline + 1 if newline != -1 else None
+        return self.take(lineEnd)
+
+    def take(self, ready):
+        # Wait up to the port timeout for enough data, then return what there is
+        deadline = time.monotonic() + (self.timeout or 0)
+        while True:
+            self.release()
+            with self.lock:
+                count = ready()
+                if count is None and time.monotonic() >= deadline:
+                    count = len(self.buffer)
+                if count is not None:
+                    data = bytes(self.buffer[:count])
+                    del self.buffer[:count]
+                    return data
+            time.sleep(0.001)
+
+    def reset_input_buffer(self):
+        self.release()
+        with self.lock:
+            self.buffer.clear()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+class ReplayPort(FakePort):
+    # Fake serial port that answers with the bytes recorded for one port. Received
+    # data recorded after the host's n-th write is held back until the host has
+    # written n times, so replies stay in step with the code under test. In real
+    # time mode it is also held for the recorded delay after that write.
+    def __init__(self, events, portId, realtime=True):
+        super().__init__()
+        self.realtime = realtime
+        self.replies = collections.deque()
+        self.writeTimes = [time.monotonic()]
+
+        writes = 0
+        lastWrite = 0.0
+        for seconds, eventPort, direction, data in events:
+            if eventPort != portId:
+                continue
+            if direction == SerialRecorder.sent:
+                writes += 1
+                lastWrite = seconds
+            else:
+                self.replies.append((writes, seconds - lastWrite, data))
+
+    def release(self):
+        now = time.monotonic()
+        with self.lock:
+            while self.replies:
+                writes, delay, data = self.replies[0]
+                if writes >= len(self.writeTimes):
+                    break
+                if self.realtime and now < self.writeTimes[writes] + delay:
+                    break
+                self.buffer.extend(data)
+                self.replies.popleft()
+
+    def write(self, data):
+        with self.lock:
+            self.writeTimes.append(time.monotonic())
+        return len(data)
+
+
+
+class ArmModel:
+    # Kinematics and motion timing shared by the simulated controller and the cycle
+    # time estimator. Joint angles are the state: the Cartesian pose comes from the
+    # DH table (forwardBatch takes thousands of joint vectors per call), and Cartesian
+    # targets are solved back to joints with damped least squares from the current
+    # angles. Damped least squares can stall short of a reachable pose, so solve
+    # restarts it from a spread of arm configurations before calling a pose out of
+    # reach. Move times follow a trapezoidal profile built from the speed, Ac and Dc
+    # values.
+    maxJointSpeed = 120.0
+    maxLinearSpeed = 500.0
+    rampTime = 0.5
+    minRamp = 10.0
+    ikIterations = 60
+    ikRetryIterations = 200
+    ikStall = 15
+    ikWeight = 100.0
+    homeJoints = (0.0, 0.0, 0.0, 0.0, 90.0, 0.0)
+
+    # AR4 kinematics and limits until the values from the kinematics tab are set
+    dhTheta = (0.0, -90.0, 0.0, 0.0, 0.0, 180.0)
+    dhAlpha = (-90.0, 0.0, 90.0, -90.0, 90.0, 0.0)
+    dhDist = (169.77, 0.0, 0.0, 222.63, 0.0, 41.0)
+    dhLink = (64.2, 305.0, 0.0, 0.0, 0.0, 0.0)
+    posLimits = (170.0, 90.0, 52.0, 165.0, 105.0, 155.0)
+    negLimits = (170.0, 42.0, 89.0, 165.0, 105.0, 155.0)
+
+    def __init__(self):
+        self.joints = np.array(self.homeJoints + (0.0, 0.0, 0.0))
+        self.tool = np.eye(4)
+        self.dh = np.array([self.dhTheta, self.dhAlpha, self.dhDist, self.dhLink])
+        self.limits = (np.array(self.posLimits), np.array(self.negLimits))
+
+    def setKinematics(self, tool=None, posLimits=None, negLimits=None, dh=None):
+        # tool is an X Y Z Rz Ry Rx frame, dh rows are theta, alpha, d, a per joint
+        if tool is not None:
+            self.tool = self.poseMatrix(tool)
+        if posLimits is not None and negLimits is not None:
+            self.limits = (np.array(posLimits, dtype=float), np.array(negLimits, dtype=float))
+        if dh is not None:
+            self.dh = np.array(dh, dtype=float).reshape(4, 6)
+
+    def checkLimits(self, target):
+        posLim, negLim = self.limits
+        over = (target > posLim) | (target < -negLim)
+        if over.any():
+            return "EL" + "".join("1" if flag else "0" for flag in over) + "000"
+        return None
+
+    def advance(self, target, external, fields, linear):
+        # Move the model to target and return how long the move takes
+        current = self.forward(self.joints[:6])
+        goal = self.forward(target)
+        jointDistance = np.abs(np.concatenate([target - self.joints[:6], external - self.joints[6:]])).max()
+        linearDistance = np.linalg.norm(goal[:3, 3] - current[:3, 3])
+        self.joints[:6] = target
+        self.joints[6:] = external
+        return self.duration(fields, jointDistance, linearDistance, linear)
+
+    def duration(self, fields, jointDistance, linearDistance, linear):
+        speed = fields["S"]
+        speedType = speed[:1] if speed[:1].isalpha() else "p"
+        value = float(speed[1:] if speed[:1].isalpha() else speed)
+        if speedType == "s":
+            return value
+        if speedType == "m":
+            distance, vmax = linearDistance, value
+        elif linear:
+            distance, vmax = linearDistance, self.maxLinearSpeed * value / 100
+        else:
+            distance, vmax = jointDistance, self.maxJointSpeed * value / 100
+        if distance <= 0 or vmax <= 0:
+            return 0.0
+
+        # Trapezoid, or a triangle when the move is too short to reach vmax
+        accTime = self.rampTime * 100 / min(max(float(fields["Ac"]), self.minRamp), 100)
+        decTime = self.rampTime * 100 / min(max(float(fields["Dc"]), self.minRamp), 100)
+        if distance >= vmax * (accTime + decTime) / 2:
+            return distance / vmax + (accTime + decTime) / 2
+        peak = math.sqrt(2 * distance / (accTime / vmax + decTime / vmax))
+        return peak * (accTime + decTime) / vmax
+
+    def forward(self, joints):
+        return self.forwardBatch(np.asarray(joints, dtype=float)[:6])[0]
+
+    def forwardBatch(self, joints):
+        # (N, 6) joint angles to (N, 4, 4) tool transforms; each DH link is built for
+        # all N at once and the chain is six stacked matrix products
+        joints = np.asarray(joints, dtype=float).reshape(-1, 6)
+        theta = np.radians(joints + self.dh[0])
+        alpha = np.radians(self.dh[1])
+        ct, st = np.cos(theta), np.sin(theta)
+        ca, sa = np.cos(alpha), np.sin(alpha)
+        links = np.zeros((len(joints), 6, 4, 4))
+        links[..., 0, 0] = ct
+        links[..., 0, 1] = -st * ca
+        links[..., 0, 2] = st * sa
+        links[..., 0, 3] = self.dh[3] * ct
+        links[..., 1, 0] = st
+        links[..., 1, 1] = ct * ca
+        links[..., 1, 2] = -ct * sa
+        links[..., 1, 3] = self.dh[3] * st
+        links[..., 2, 1] = sa
+        links[..., 2, 2] = ca
+        links[..., 2, 3] = self.dh[2]
+        links[..., 3, 3] = 1.0
+        matrices = links[:, 0]
+        for index in range(1, 6):
+            matrices = matrices @ links[:, index]
+        return matrices @ self.tool
+
+    def poses(self, joints):
+        # (N, 6) joint angles to (N, 6) X Y Z Rz Ry Rx rows
+        return self.matrixPoses(self.forwardBatch(joints))
+
+    def solve(self, target, seed=None):
+        # inverse from seed (the current joints), then from home and the elbow and wrist
+        # configurations facing the target. The first solution inside the joint limits
+        # wins, else the first one found; None when no start converges.
+        found = None
+        for start in self.seeds(target, seed):
+            angles = self.inverse(target, start, self.ikIterations if found is None and start is seed else self.ikRetryIterations)
+            if angles is None:
+                continue
+            if self.checkLimits(angles) is None:
+                return angles
+            if found is None:
+                found = angles
+        return found
+
+    def seeds(self, target, seed=None):
+        yield seed
+        yield np.array(self.homeJoints)
+        # J1 turned toward the target's wrist center, and away from it
+        wrist = target[:3, 3] - target[:3, 2] * self.dh[2, 5]
+        home = self.forward(self.homeJoints)
+        facing = math.degrees(math.atan2(wrist[1], wrist[0]) - math.atan2(home[1, 3], home[0, 3]))
+        for j1 in (facing, facing + 180.0):
+            for j2 in (-20.0, 40.0):
+                for j3 in (-60.0, 30.0):
+                    for j5 in (-60.0, 60.0):
+                        for j4 in (0.0, 90.0):
+                            yield (np.array([j1, j2, j3, j4, j5, 0.0]) + 180.0) % 360.0 - 180.0
+
+    def inverse(self, target, seed=None, iterations=None):
+        # Damped least squares from seed (the current joints), None when it does not converge
+        angles = np.array(self.joints[:6] if seed is None else seed, dtype=float)
+        step = 1e-4
+        nudges = np.vstack([np.zeros(6), np.eye(6) * step])
+        best, stalled = np.inf, 0
+        for _ in range(iterations or self.ikIterations):
+            # The current pose and the six nudged ones for the Jacobian in one batch
+            frames = self.forwardBatch(angles + nudges)
+            current = frames[0]
+            error = self.poseError(current, target)
+            size = np.abs(error).max()
+            if size < 1e-4:
+                return (angles + 180.0) % 360.0 - 180.0
+            # Give up on a start that has stopped closing in, e.g. against a singularity
+            best, stalled = (size, 0) if size < best * 0.99 else (best, stalled + 1)
+            if stalled > self.ikStall:
+                return None
+            jacobian = np.column_stack([self.poseError(current, frame) for frame in frames[1:]]) / step
+            delta = jacobian.T @ np.linalg.solve(jacobian @ jacobian.T + 1e-6 * np.eye(6), error)
+            angles += np.clip(delta, -20.0, 20.0)
+        return None
+
+    def poseError(self, current, target):
+        rotation = 0.5 * sum(np.cross(current[:3, i], target[:3, i]) for i in range(3))
+        return np.concatenate([target[:3, 3] - current[:3, 3], rotation * self.ikWeight])
+
+    @staticmethod
+    def poseMatrix(pose):
+        x, y, z, rz, ry, rx = pose
+        cz, sz = math.cos(math.radians(rz)), math.sin(math.radians(rz))
+        cy, sy = math.cos(math.radians(ry)), math.sin(math.radians(ry))
+        cx, sx = math.cos(math.radians(rx)), math.sin(math.radians(rx))
+        return np.array([
+            [cz * cy, cz * sy * sx - sz * cx, cz * sy * cx + sz * sx, x],
+            [sz * cy, sz * sy * sx + cz * cx, sz * sy * cx - cz * sx, y],
+            [-sy, cy * sx, cy * cx, z],
+            [0.0, 0.0, 0.0, 1.0],
+        ])
+
+    @staticmethod
+    def matrixPose(matrix):
+        rz = math.degrees(math.atan2(matrix[1, 0], matrix[0, 0]))
+        ry = math.degrees(math.atan2(-matrix[2, 0], math.hypot(matrix[0, 0], matrix[1, 0])))
+        rx = math.degrees(math.atan2(matrix[2, 1], matrix[2, 2]))
+        return matrix[0, 3], matrix[1, 3], matrix[2, 3], rz, ry, rx
+
+    @staticmethod
+    def matrixPoses(matrices):
+        # matrixPose for an (N, 4, 4) stack
+        rz = np.degrees(np.arctan2(matrices[:, 1, 0], matrices[:, 0, 0]))
+        ry = np.degrees(np.arctan2(-matrices[:, 2, 0], np.hypot(matrices[:, 0, 0], matrices[:, 1, 0])))
+        rx = np.degrees(np.arctan2(matrices[:, 2, 1], matrices[:, 2, 2]))
+        return np.column_stack([matrices[:, 0, 3], matrices[:, 1, 3], matrices[:, 2, 3], rz, ry, rx])
+
+
+class SimulatedTeensy(FakePort, ArmModel):
+    # In-process stand-in for the controller (and the IO board) that answers the
+    # same ASCII command set, with the kinematics from the UP values. Each move
+    # waits for its profile time multiplied by timeScale (0 answers immediately).
+    moveLabels = {
+        "MJ": ("X", "Y", "Z", "Rz", "Ry", "Rx", "J7", "J8", "J9", "S", "Ac", "Dc", "Rm"),
+        "ML": ("X", "Y", "Z", "Rz", "Ry", "Rx", "J7", "J8", "J9", "S", "Ac", "Dc", "Rm"),
+        "WC": ("X", "Y", "Z", "Rz", "Ry", "Rx", "J7", "J8", "J9", "S", "Ac", "Dc", "Rm", "Rnd", "W", "Lm", "Fn"),
+        "RJ": ("A", "B", "C", "D", "E", "F", "J7", "J8", "J9", "S", "Ac", "Dc", "Rm"),
+    }
+    flushedCodes = ("MJ", "ML", "RJ", "MC")
+    circleLabels = ("Cx", "Cy", "Cz", "Rz", "Ry", "Rx", "Bx", "By", "Bz", "Px", "Py", "Pz", "Tr", "S", "Ac", "Dc", "Rm")
+    # UP: tool frame, motor dir, cal dir, limit pairs, step/deg, encoder mult, DH theta, alpha, d, a
+    paramLabels = (
+        tuple("ABCDEF") + tuple(chr(71 + i) for i in range(9)) + tuple(chr(80 + i) for i in range(9)) +
+        tuple(chr(89 + i) for i in range(12)) + tuple(chr(107 + i) for i in range(12)) +
+        tuple(chr(119 + i) for i in range(6)) + tuple(chr(35 + i) for i in range(6)) +
+        tuple(chr(40 + i) for i in range(6)) + tuple(chr(60 + i) for i in range(6))
+    )
+
+    def __init__(self, timeScale=1.0):
+        FakePort.__init__(self)
+        ArmModel.__init__(self)
+        self.timeScale = timeScale
+        self.inputs = {}
+        self.outputs = {}
+        self.files = {}
+        self.spline = False
+        self.splineTime = 0.0
+        self.commands = collections.deque()
+        self.ready = threading.Condition()
+        self.pending = bytearray()
+        self.moving = False
+
+        self.worker = threading.Thread(target=self.run, name="simulated controller", daemon=True)
+        self.worker.start()
+
+    def write(self, data):
+        # Commands run one at a time in arrival order, like the controller's serial loop
+        with self.ready:
+            self.pending.extend(data)
+            while b"\n" in self.pending:
+                line, _, rest = bytes(self.pending).partition(b"\n")
+                self.pending = bytearray(rest)
+                command = str(line, 'utf-8', errors='replace').strip()
+                if command.startswith("FQ"):
+                    self.flushMoves()
+                self.commands.append(command)
+            self.ready.notify()
+        return len(data)
+
+    def run(self):
+        while True:
+            with self.ready:
+                while not self.commands:
+                    self.ready.wait()
+                command = self.commands.popleft()
+                self.moving = command[:2] in self.flushedCodes
+            reply = self.execute(command)
+            if reply is not None:
+                with self.lock:
+                    self.buffer.extend((reply + "\n").encode())
+            with self.ready:
+                self.moving = False
+
+    def flushMoves(self):
+        # Caller holds ready. Look-ahead moves are dropped in place so replies keep
+        # their order; the executing row's move is kept, started or not.
+        keep = not self.moving
+        commands = collections.deque()
+        for queued in self.commands:
+            if queued[:2] in self.flushedCodes:
+                if not keep:
+                    queued = "EQ"
+                keep = False
+            commands.append(queued)
+        self.commands = commands
+
+    def setInput(self, number, state):
+        with self.ready:
+            self.inputs[int(number)] = bool(state)
+            self.ready.notify_all()
+
+    def execute(self, command):
+        code = command[:2]
+        try:
+            if code in ("MJ", "ML", "RJ"):
+                return self.move(code, command)
+            if code == "MC":
+                return self.moveCircle(command)
+            if code == "WC":
+                return self.writeFile(command)
+            if code == "PG":
+                return self.playFile(command[command.find("Fn") + 2:])
+            if code == "DG":
+                self.files.pop(command[command.find("Fn") + 2:], None)
+            elif code == "SL":
+                self.spline = True
+            elif code == "SS":
+                self.spline = False
+                splineTime, self.splineTime = self.splineTime, 0.0
+                self.wait(splineTime)
+                return self.position()
+            elif code in ("RP", "CP"):
+                return self.position()
+            elif code == "FQ":
+                return "FQ"
+            elif code == "EQ":
+                return "EQ"
+            elif code == "LL":
+                return self.calibrate(command)
+            elif code == "UP":
+                self.configure(command)
+            elif code == "TF":
+                self.tool = self.poseMatrix(self.values(command, "ABCDEF"))
+                return self.position()
+            elif code == "SP":
+                values = self.values(command, "ABCDEFGHI")
+                self.joints[:len(values)] = values
+            elif code in ("ON", "OF"):
+                self.outputs[int(command[3:])] = code == "ON"
+            elif code == "JF":
+                number = command[3:].split("T")[0]
+                return "T" if self.inputs.get(int(number)) else "F"
+            elif code in ("WI", "WO"):
+                self.waitInput(int(command[3:]), code == "WI")
+            elif code == "WT":
+                self.wait(float(command[3:]))
+            elif code == "CL":
+                return None
+        except (ValueError, IndexError, KeyError):
+            return "EX"
+        return "Done"
+
+    def values(self, command, labels):
+        fields = BinaryFraming.splitFields(command, labels)
+        return [float(fields[label]) for label in labels]
+
+    def move(self, code, command):
+        fields = BinaryFraming.splitFields(command, self.moveLabels[code])
+        if code == "RJ":
+            target = np.array([float(fields[label]) for label in "ABCDEF"])
+        else:
+            target = self.solve(self.poseMatrix([float(fields[label]) for label in ("X", "Y", "Z", "Rz", "Ry", "Rx")]))
+            if target is None:
+                return "ER"
+        external = np.array([float(fields[label]) for label in ("J7", "J8", "J9")])
+
+        error = self.checkLimits(target)
+        if error:
+            return error
+        linear = code == "ML"
+        self.travel(target, external, fields, linear)
+        return self.position()
+
+    def moveCircle(self, command):
+        fields = BinaryFraming.splitFields(command, self.circleLabels)
+        center = np.array([float(fields[label]) for label in ("Cx", "Cy", "Cz")])
+        start = np.array([float(fields[label]) for label in ("Bx", "By", "Bz")])
+        pose = list(start) + [float(fields[label]) for label in ("Rz", "Ry", "Rx")]
+        target = self.solve(self.poseMatrix(pose))
+        if target is None:
+            return "ER"
+        error = self.checkLimits(target)
+        if error:
+            return error
+
+        # Full circle back to the start point, after a linear approach to it
+        self.travel(target, self.joints[6:], fields, True)
+        circumference = 2 * math.pi * np.linalg.norm(start - center)
+        self.wait(self.duration(fields, 0.0, circumference, True))
+        return self.position()
+
+    def writeFile(self, command):
+        # G-code lines are stored per file and answered with the target pose they reach
+        fields = BinaryFraming.splitFields(command, self.moveLabels["WC"])
+        target = self.solve(self.poseMatrix([float(fields[label]) for label in ("X", "Y", "Z", "Rz", "Ry", "Rx")]))
+        if target is None:
+            return "ER"
+        self.files.setdefault(fields["Fn"], []).append("ML" + command[2:command.find("Fn")])
+        return self.position(np.concatenate([target, [float(fields[label]) for label in ("J7", "J8", "J9")]]))
+
+    def playFile(self, filename):
+        if filename not in self.files:
+            return "EG"
+        for command in self.files[filename]:
+            reply = self.move("ML", command)
+            if reply.startswith("E"):
+                return reply
+        return self.position()
+
+    def calibrate(self, command):
+        # Flagged joints drive to their switch and come back at the calibration offset
+        values = [float(value) for value in re.split(r"[A-R]", command[2:])[1:]]
+        flags, offsets = values[:9], values[9:18]
+        count = 0
+        for index, (flag, offset) in enumerate(zip(flags, offsets)):
+            if flag:
+                self.joints[index] = offset
+                count += 1
+        self.wait(2.0 * count)
+        return self.position()
+
+    def configure(self, command):
+        values = self.values(command, self.paramLabels)
+        limits = np.array(values[24:36]).reshape(6, 2)
+        self.setKinematics(values[0:6], limits[:, 0], limits[:, 1], values[48:72])
+
+    def travel(self, target, external, fields, linear):
+        self.wait(self.advance(target, external, fields, linear))
+
+    def wait(self, seconds):
+        if self.spline:
+            self.splineTime += seconds
+        elif seconds > 0 and self.timeScale > 0:
+            time.sleep(seconds * self.timeScale)
+
+    def waitInput(self, number, state):
+        with self.ready:
+            while self.inputs.get(number, False) != state:
+                self.ready.wait()
+
+    def position(self, joints=None):
+        joints = self.joints if joints is None else joints
+        x, y, z, rz, ry, rx = self.matrixPose(self.forward(joints[:6]))
+        j = joints
+        return (
+            f"A{j[0]:.3f}B{j[1]:.3f}C{j[2]:.3f}D{j[3]:.3f}E{j[4]:.3f}F{j[5]:.3f}"
+            f"G{x:.3f}H{y:.3f}I{z:.3f}J{rz:.3f}K{ry:.3f}L{rx:.3f}M0NOP{j[6]:.3f}Q{j[7]:.3f}R{j[8]:.3f}"
+        )
+
+
+class ProgramCompileError(ValueError):
+    def __init__(self, row, text, reason):
+        self.row = row
+        self.text = text
+        self.reason = reason
+        location = f"Row {row}" if row is not None else "Program row"
+        super().__init__(f"{location}: {reason} - {text}")
+
+
+class Instruction:
+    # One program row. kind is the six-character prefix executeRow dispatches on.
+    __slots__ = ("row", "text", "kind")
+
+    def __init__(self, row, text):
+        self.row = row
+        self.text = text
+        self.kind = text[:6]
+
+
+class MoveInstruction(Instruction):
+    # Move J / Move L hold X Y Z Rz Ry Rx J7 J8 J9 targets, Move R holds J1..J9
+    __slots__ = ("targets", "speedType", "speed", "acc", "dec", "ramp", "rounding", "wrist")
+
+
+class BranchInstruction(Instruction):
+    # Tab Number rows (labels) and Jump Tab rows
+    __slots__ = ("tab",)
+
+
+class ProgramCompiler:
+    # Rows are "<type> [*] <label> <value> <label> <value> ... $ <wrist>"
+    moveLabels = {
+        "Move J": ("X", "Y", "Z", "Rz", "Ry", "Rx", "J7", "J8", "J9"),
+        "Move L": ("X", "Y", "Z", "Rz", "Ry", "Rx", "J7", "J8", "J9"),
+        "Move R": ("J1", "J2", "J3", "J4", "J5", "J6", "J7", "J8", "J9"),
+    }
+    speedTypes = ("Sp", "Ss", "Sm")
+
+    @classmethod
+    def compile(cls, lines):
+        instructions, errors = [], []
+        for row, text in enumerate(lines):
+            try:
+                instructions.append(cls.compileRow(row, text))
+            except ProgramCompileError as e:
+                errors.append(e)
+                instructions.append(Instruction(row, text.strip()))
+        return instructions, errors
+
+    @classmethod
+    def compileRow(cls, row, text):
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        text = text.strip()
+        kind = text[:6]
+        if kind in cls.moveLabels:
+            return cls.compileMove(row, text, cls.moveLabels[kind])
+        if kind == "Tab Nu":
+            return cls.compileBranch(row, text, text[len("Tab Number "):])
+        if kind == "Jump T":
+            return cls.compileBranch(row, text, text[text.find("Tab-") + 4:])
+        return Instruction(row, text)
+
+    @classmethod
+    def compileBranch(cls, row, text, tab):
+        tab = tab.strip()
+        if not tab:
+            raise ProgramCompileError(row, text, "missing tab number")
+        instruction = BranchInstruction(row, text)
+        instruction.tab = tab
+        return instruction
+
+    @classmethod
+    def compileMove(cls, row, text, labels):
+        marker = text.find("]")
+        tokens = text[marker + 1:].split() if marker != -1 else text.split()[2:]
+        if len(tokens) % 2:
+            raise ProgramCompileError(row, text, "unpaired label or value")
+        fields = dict(zip(tokens[0::2], tokens[1::2]))
+
+        instruction = MoveInstruction(row, text)
+        try:
+            instruction.targets = tuple(float(fields[label]) for label in labels)
+            speedType = next((label for label in cls.speedTypes if label in fields), None)
+            if speedType is None:
+                raise ProgramCompileError(row, text, "missing speed")
+            instruction.speedType = speedType
+            instruction.speed = float(fields[speedType])
+            instruction.acc = float(fields["Ac"])
+            instruction.dec = float(fields["Dc"])
+            instruction.ramp = float(fields["Rm"])
+            instruction.rounding = float(fields.get("Rnd", 0))
+            instruction.wrist = fields["$"]
+        except KeyError as e:
+            raise ProgramCompileError(row, text, f"missing {e.args[0]}") from None
+        except ValueError as e:
+            raise ProgramCompileError(row, text, f"bad value ({e})") from None
+        return instruction
+
+
+class CompiledProgram:
+    # Instructions for the program shown in progView. Rows are compiled once on
+    # load; a row whose text no longer matches (edited since) is compiled again
+    # on demand, and every compiled text is kept so loops never parse it twice.
+    def __init__(self, path=""):
+        self.path = path
+        self.instructions = []
+        self.byText = {}
+        self.failedRows = set()
+        self.labels = {}
+        self.errors = []
+
+    def load(self, lines):
+        self.instructions, errors = ProgramCompiler.compile(lines)
+        self.errors = list(errors)
+        self.failedRows = {error.row for error in errors}
+        self.byText = {
+            instruction.text: instruction
+            for instruction in self.instructions
+            if instruction.row not in self.failedRows
+        }
+        self.labels = {}
+        for row, instruction in enumerate(self.instructions):
+            if instruction.kind == "Tab Nu" and row not in self.failedRows:
+                self.labels.setdefault(instruction.tab, row)
+        return errors
+
+    def open(self, container):
+        # Rows are compiled from the container as they are first read, see LazyInstructions
+        self.instructions = LazyInstructions(self, container)
+        self.byText = {}
+        self.failedRows = set()
+        self.labels = container.labels()
+        self.errors = []
+
+    def materialize(self):
+        # Edits need a plain list; the container is compiled in full once and released
+        if isinstance(self.instructions, LazyInstructions):
+            lazy = self.instructions
+            self.instructions = list(lazy)
+            lazy.container.close()
+
+    def labelRow(self, tab):
+        # Row of the first "Tab Number <tab>", None if the program has no such tab
+        return self.labels.get(str(tab).strip())
+
+    def insertRow(self, row, text):
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        text = text.strip()
+        self.materialize()
+        row = max(0, min(row, len(self.instructions)))
+        try:
+            instruction = self.lookup(text)
+            failed = False
+        except ProgramCompileError:
+            instruction = Instruction(row, text)
+            failed = True
+
+        self.instructions.insert(row, instruction)
+        self.failedRows = {r + 1 if r >= row else r for r in self.failedRows}
+        if failed:
+            self.failedRows.add(row)
+        self.labels = {tab: r + 1 if r >= row else r for tab, r in self.labels.items()}
+        if instruction.kind == "Tab Nu" and not failed:
+            if self.labels.get(instruction.tab, row) >= row:
+                self.labels[instruction.tab] = row
+
+    def deleteRow(self, row):
+        if not 0 <= row < len(self.instructions):
+            return
+        self.materialize()
+        instruction = self.instructions.pop(row)
+        failed = row in self.failedRows
+        self.failedRows = {r - 1 if r > row else r for r in self.failedRows if r != row}
+        self.labels = {tab: r - 1 if r > row else r for tab, r in self.labels.items() if r != row}
+        if instruction.kind == "Tab Nu" and not failed and instruction.tab not in self.labels:
+            # A duplicate further down becomes the target
+            for r in range(row, len(self.instructions)):
+                other = self.instructions[r]
+                if other.kind == "Tab Nu" and r not in self.failedRows and other.tab == instruction.tab:
+                    self.labels[instruction.tab] = r
+                    break
+
+    def lookup(self, text):
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        text = text.strip()
+        instruction = self.byText.get(text)
+        if instruction is None:
+            instruction = ProgramCompiler.compileRow(None, text)
+            self.byText[text] = instruction
+        return instruction
+
+    def textAt(self, row):
+        return self.instructions[row].text if 0 <= row < len(self.instructions) else ""
+
+    def at(self, row, text=None):
+        if text is None:
+            text = self.textAt(row)
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        text = text.strip()
+        if 0 <= row < len(self.instructions):
+            # Read first, a lazily compiled row only lands in failedRows once read
+            instruction = self.instructions[row]
+            if row not in self.failedRows and instruction.text == text:
+                return instruction
+        # Edited or unparseable rows are compiled again so the error carries the row
+        try:
+            return self.lookup(text)
+        except ProgramCompileError as e:
+            raise ProgramCompileError(row, text, e.reason) from None
+
+
+
+class ProgramCache:
+    # Compiled programs keyed by absolute path. An entry is reused while the file's
+    # mtime is unchanged, so calling a subprogram again costs a stat() call. Each
+    # entry keeps the CRC of the file as loaded, the base for the program journal.
+    def __init__(self, limit=32):
+        self.limit = limit
+        self.programs = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.journal = None
+
+    def get(self, path):
+        key = os.path.abspath(path)
+        if self.journal:
+            # Fold in edits still in the journal, including ones left by a crash
+            self.journal.flush(key)
+        mtime = os.stat(key).st_mtime_ns
+        with self.lock:
+            entry = self.programs.get(key)
+            if entry and entry[0] == mtime:
+                self.programs.move_to_end(key)
+                return entry[1]
+
+        program = CompiledProgram(path)
+        if os.path.splitext(key)[1].lower() == ".arb":
+            container = ProgramContainer.open(key)
+            checksum = binascii.crc32(container.buffer)
+            program.open(container)
+        else:
+            with open(key, "rb") as f:
+                data = f.read()
+            checksum = binascii.crc32(data)
+            program.load(data.decode("utf-8").splitlines())
+
+        with self.lock:
+            self.programs[key] = (mtime, program, checksum)
+            self.programs.move_to_end(key)
+            while len(self.programs) > self.limit:
+                self.programs.popitem(last=False)
+        return program
+
+    def touch(self, path, checksum):
+        # The file was rewritten from the cached program itself, keep the entry
+        key = os.path.abspath(path)
+        with self.lock:
+            entry = self.programs.get(key)
+            if entry:
+                self.programs[key] = (os.stat(key).st_mtime_ns, entry[1], checksum)
+
+    def checksum(self, path):
+        # CRC of the file as last loaded or rewritten, None if it is not cached
+        with self.lock:
+            entry = self.programs.get(os.path.abspath(path))
+            return entry[2] if entry else None
+
+    def invalidate(self, path=None):
+        with self.lock:
+            if path is None:
+                self.programs.clear()
+            else:
+                self.programs.pop(os.path.abspath(path), None)
+
+
+class ProgramExecutor:
+    # Runs the compiled program on its own thread. The program counter and call stack
+    # live here instead of in progView's selection; listeners get ("started", row),
+    # ("row", row) before each row, ("pc", row) when the counter moves,
+    # ("program", program) on a call or return, ("error", row, exception) when a row
+    # raises, which stops the program, and ("stopped", row). Row handlers redirect
+    # the counter with jump(). Call stack frames are (program, row).
+    def __init__(self, program, runRow):
+        self.program = program
+        self.runRow = runRow
+        self.pc = 0
+        self.nextPc = None
+        self.callStack = []
+        self.running = False
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.finished = threading.Condition(self.lock)
+        self.thread = None
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def emit(self, event, *args):
+        for callback in list(self.listeners):
+            callback(event, *args)
+
+    def start(self, row):
+        with self.lock:
+            if self.running:
+                return False
+            self.running = True
+            self.pc = row
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return True
+
+    def run(self):
+        self.emit("started", self.pc)
+        try:
+            while self.running and 0 <= self.pc < len(self.program.instructions):
+                self.step()
+        except Exception as e:
+            # A failed row (a link timeout, a closed port) stops the program, not the thread
+            self.emit("error", self.pc, e)
+        finally:
+            with self.finished:
+                self.running = False
+                self.finished.notify_all()
+            self.emit("stopped", self.pc)
+
+    def wait(self, timeout=None):
+        # Block until the program stops, woken by the run thread rather than polling
+        with self.finished:
+            return self.finished.wait_for(lambda: not self.running, timeout)
+
+    def step(self):
+        row = self.pc
+        self.nextPc = row + 1
+        self.emit("row", row)
+        self.runRow(row)
+        self.pc = self.nextPc
+        self.emit("pc", self.pc)
+        return row
+
+    def seek(self, row):
+        self.pc = row
+        self.emit("pc", row)
+
+    def switch(self, program):
+        # Rows after the current one come from program; frames on callStack hold callers
+        self.program = program
+        self.emit("program", program)
+
+    def jump(self, row):
+        # Takes effect once the current row returns
+        self.nextPc = row
+
+    def stop(self):
+        self.running = False
+
+    def call(self, program, row):
+        self.callStack.append((program, row))
+
+    def ret(self):
+        return self.callStack.pop() if self.callStack else None
+
+
+
+class RegisterBank:
+    # Program registers R1..Rn and position registers PR1..PRn (X Y Z Rz Ry Rx), numbered
+    # from 1 as in program rows. Updates are atomic under one lock, and changed entries are
+    # collected so the GUI can repaint just those fields from its own loop.
+    elements = 6
+
+    def __init__(self, count=16):
+        self.values = np.zeros(count, dtype=np.int64)
+        self.positions = np.zeros((count, self.elements), dtype=np.float64)
+        self.changed = set()
+        self.lock = threading.Lock()
+
+    def get(self, reg):
+        return int(self.values[reg - 1])
+
+    def set(self, reg, value):
+        with self.lock:
+            self.values[reg - 1] = value
+            self.changed.add((reg, None))
+
+    def add(self, reg, delta):
+        with self.lock:
+            self.values[reg - 1] += delta
+            self.changed.add((reg, None))
+            return int(self.values[reg - 1])
+
+    def position(self, reg):
+        with self.lock:
+            return self.positions[reg - 1].copy()
+
+    def getPosition(self, reg, element):
+        return float(self.positions[reg - 1, element - 1])
+
+    def setPosition(self, reg, element, value):
+        with self.lock:
+            self.positions[reg - 1, element - 1] = value
+            self.changed.add((reg, element))
+
+    def addPosition(self, reg, element, delta):
+        with self.lock:
+            self.positions[reg - 1, element - 1] += delta
+            self.changed.add((reg, element))
+            return float(self.positions[reg - 1, element - 1])
+
+    def takeChanged(self):
+        with self.lock:
+            changed, self.changed = self.changed, set()
+        return changed
+
+    def markAll(self):
+        # Repaint every field next time, e.g. when the GUI switches to this bank
+        with self.lock:
+            for reg in range(1, len(self.values) + 1):
+                self.changed.add((reg, None))
+                self.changed.update((reg, element) for element in range(1, self.elements + 1))
+
+
+
+class CycleEstimate:
+    # Per-row (program, row, text, seconds, note) records from CycleTimeEstimator, and
+    # what the total assumes: loops counted as one pass, branches not taken, and so on.
+    # unbounded is set when the program loops back on itself with no exit counted.
+    def __init__(self, rows, assumptions=(), unbounded=False):
+        self.rows = rows
+        self.assumptions = list(assumptions)
+        self.unbounded = unbounded
+        self.total = sum(row[3] for row in rows)
+
+    def summary(self):
+        if self.unbounded:
+            return f"{self.total:.2f} s per pass, loops unbounded"
+        if self.assumptions:
+            return f"{self.total:.2f} s, with assumptions"
+        return f"{self.total:.2f} s"
+
+    def report(self):
+        lines = [f"{'Row':>5}  {'Seconds':>8}  Program row"]
+        for path, row, text, seconds, note in self.rows:
+            line = f"{row:>5}  {seconds:>8.3f}  {os.path.basename(path)}: {text}"
+            lines.append(f"{line}  ({note})" if note else line)
+        lines.append(f"Predicted cycle time: {self.summary()}")
+        lines.extend(f"  Assumes {assumption}" for assumption in self.assumptions)
+        return "\n".join(lines)
+
+
+class CycleTimeEstimator:
+    # Walks one pass of a compiled program offline and times each row with the arm
+    # model the simulator uses. Calls are followed through the program cache. A Jump
+    # Tab back to a row already run in the same program is a loop: the walk stops
+    # there and the estimate is flagged unbounded, timed as one pass. Branch rows
+    # (If ..., Vis Find, input jumps) are assumed not to jump and waits on inputs
+    # count as zero; each is marked on its row and listed in the report's assumptions.
+    branchTypes = ("If Inp", "If Reg", "If COM", "TifOn ", "TifOff", "Vis Fi")
+    inputWaits = ("Wait I", "Wait O", "TwaitI", "TwaitO")
+    untimedMoves = ("Move A", "Move C", "Move P", "Move V", "OFF J", "OFF PR")
+
+    def __init__(self, model, programs, maxRows=100000):
+        self.model = model
+        self.programs = programs
+        self.maxRows = maxRows
+
+    def estimate(self, program, joints=None):
+        if joints is not None:
+            self.model.joints[:len(joints)] = joints
+        rows, frames, seen = [], [], set()
+        pc, spline = 0, False
+        branches, waits, unbounded, assumptions = 0, 0, False, []
+
+        while len(rows) < self.maxRows:
+            if pc >= len(program.instructions):
+                if not frames:
+                    break
+                program, pc, seen = frames.pop()
+                pc += 1
+                continue
+
+            seen.add(pc)
+            try:
+                instruction = program.at(pc)
+            except ProgramCompileError as e:
+                rows.append((program.path, pc, program.textAt(pc), 0.0, e.reason))
+                pc += 1
+                continue
+            kind, text = instruction.kind, instruction.text
+            seconds, note = 0.0, "spline" if spline else ""
+
+            if isinstance(instruction, MoveInstruction):
+                seconds, note = self.move(instruction, note)
+            elif kind == "Wait T":
+                seconds = float(text[text.find("=") + 1:])
+            elif kind in ("Start ", "End Sp"):
+                spline = kind == "Start "
+            elif kind in self.inputWaits:
+                note = "input wait assumed 0 s"
+                waits += 1
+            elif kind in self.branchTypes:
+                note = "branch assumed not taken"
+                branches += 1
+            elif kind in self.untimedMoves:
+                note = "not estimated"
+            elif kind == "Call P":
+                name = text[text.find("Program -") + 10:].strip()
+                try:
+                    called = self.programs.get(name)
+                except FileNotFoundError:
+                    # Reported on the row and skipped, as if the call returned at once
+                    rows.append((program.path, pc, text, 0.0, f"called program {name} not found"))
+                    pc += 1
+                    continue
+                rows.append((program.path, pc, text, 0.0, f"call {name}"))
+                frames.append((program, pc, seen))
+                program, pc, seen = called, 0, set()
+                continue
+            elif kind == "Return":
+                rows.append((program.path, pc, text, 0.0, ""))
+                if not frames:
+                    break
+                program, pc, seen = frames.pop()
+                pc += 1
+                continue
+            elif kind == "Jump T":
+                target = program.labelRow(instruction.tab)
+                if target is None:
+                    rows.append((program.path, pc, text, 0.0, "tab not found, walk stopped"))
+                    assumptions.append(f"the program stops at row {pc} of {os.path.basename(program.path)}, where tab {instruction.tab} is missing")
+                    break
+                if target in seen:
+                    rows.append((program.path, pc, text, 0.0, f"loops back to row {target}, repeats unbounded"))
+                    assumptions.append(f"one pass of the loop from row {pc} back to row {target} of {os.path.basename(program.path)}")
+                    unbounded = True
+                    break
+                rows.append((program.path, pc, text, 0.0, ""))
+                pc = target
+                continue
+
+            rows.append((program.path, pc, text, seconds, note))
+            pc += 1
+        else:
+            assumptions.append(f"the walk was cut off after {self.maxRows} rows")
+            unbounded = True
+
+        if branches:
+            assumptions.append(f"none of the {branches} branch row(s) jump")
+        if waits:
+            assumptions.append(f"the {waits} input wait(s) are already satisfied")
+        return CycleEstimate(rows, assumptions, unbounded)
+
+    def move(self, instruction, note):
+        model = self.model
+        targets = np.array(instruction.targets)
+        if instruction.kind == "Move R":
+            target = targets[:6]
+        else:
+            target = model.solve(model.poseMatrix(targets[:6]))
+            if target is None:
+                return 0.0, "out of reach"
+        if model.checkLimits(target):
+            return 0.0, "outside joint limits"
+
+        fields = {
+            "S": instruction.speedType[1] + str(instruction.speed),
+            "Ac": instruction.acc,
+            "Dc": instruction.dec,
+        }
+        return model.advance(target, targets[6:9], fields, instruction.kind == "Move L"), note
+
+
+
+class RowProfiler:
+    # Opt-in timing of every executed row, aggregated per (program, row) and per
+    # command type. A row's wall time is split into parse (compiled lookup), serial
+    # (command out until the controller's ack), controller (ack until the reply) and
+    # other (handler code, vision, sleeps); without sequenced links there is no ack,
+    # so the whole wait counts as controller time. UI time is the repaint of the row
+    # on the Tk loop, which runs apart from the executor. Totals are also binned into
+    # a histogram with the upper edges in bins.
+    phases = ("parse", "serial", "controller", "other", "ui")
+    bins = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, float("inf"))
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.byRow = {}
+        self.byType = {}
+        self.current = None
+        self.last = None
+        self.lock = threading.Lock()
+        executor.subscribe(self.onEvent)
+
+    def watch(self, transport):
+        transport.timing(self.onReply)
+
+    def onEvent(self, event, *args):
+        if event == "row":
+            self.finish()
+            program = self.executor.program
+            kind = program.textAt(args[0])[:6]
+            with self.lock:
+                self.current = ((program.path, args[0]), kind, time.monotonic(), dict.fromkeys(self.phases, 0.0))
+        elif event in ("pc", "stopped"):
+            self.finish()
+
+    def add(self, phase, seconds):
+        with self.lock:
+            if self.current:
+                self.current[3][phase] += seconds
+
+    def onReply(self, future):
+        # Serial reader thread. Replies to look-ahead commands sent before this row
+        # started only count from its start.
+        with self.lock:
+            current = self.current
+            if current is None:
+                return
+            sent = max(future.sentAt, current[2])
+            if future.ackedAt is not None:
+                acked = max(future.ackedAt, sent)
+                current[3]["serial"] += acked - sent
+                current[3]["controller"] += max(future.repliedAt - acked, 0.0)
+            else:
+                current[3]["controller"] += max(future.repliedAt - sent, 0.0)
+
+    def addUi(self, seconds):
+        # Charged to the most recent row; the view only ever paints the latest one
+        last = self.last
+        if last:
+            self.record(last[0], last[1], {"ui": seconds}, counted=False)
+
+    def finish(self):
+        with self.lock:
+            current, self.current = self.current, None
+        if current is None:
+            return
+        key, kind, start, times = current
+        total = time.monotonic() - start
+        times["other"] = max(total - times["parse"] - times["serial"] - times["controller"], 0.0)
+        self.record(key, kind, times, total=total)
+        self.last = (key, kind)
+
+    def record(self, key, kind, times, total=None, counted=True):
+        with self.lock:
+            for store, storeKey in ((self.byRow, key), (self.byType, kind)):
+                stats = store.get(storeKey)
+                if stats is None:
+                    stats = store[storeKey] = {
+                        "count": 0, "total": 0.0, "max": 0.0,
+                        **dict.fromkeys(self.phases, 0.0),
+                        "histogram": [0] * len(self.bins),
+                    }
+                for phase, seconds in times.items():
+                    stats[phase] += seconds
+                if counted:
+                    stats["count"] += 1
+                    stats["total"] += total
+                    stats["max"] = max(stats["max"], total)
+                    stats["histogram"][next(i for i, edge in enumerate(self.bins) if total <= edge)] += 1
+
+    def summary(self):
+        # Rows and command types, slowest total first
+        with self.lock:
+            rows = [
+                {"program": key[0], "row": key[1], **stats, "histogram": list(stats["histogram"])}
+                for key, stats in self.byRow.items()
+            ]
+            types = [
+                {"type": kind.strip(), **stats, "histogram": list(stats["histogram"])}
+                for kind, stats in self.byType.items()
+            ]
+        rows.sort(key=lambda item: item["total"], reverse=True)
+        types.sort(key=lambda item: item["total"], reverse=True)
+        return {"bins": [str(edge) for edge in self.bins], "rows": rows, "types": types}
+
+    def export(self, path):
+        summary = self.summary()
+        if path.lower().endswith(".json"):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+            return
+
+        # CSV: one line per row and per command type, histogram counts as <=edge columns
+        columns = ["scope", "program", "row", "type", "count", "total", "max", *self.phases]
+        columns += [f"<={edge}" for edge in summary["bins"]]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for scope, items in (("row", summary["rows"]), ("type", summary["types"])):
+                for item in items:
+                    writer.writerow(
+                        [scope, item.get("program", ""), item.get("row", ""), item.get("type", "")] +
+                        [item[name] for name in ("count", "total", "max", *self.phases)] +
+                        item["histogram"]
+                    )
+
+
+
+class ProgramJournal:
+    # Row edits are appended to "<program>.journal" as they are made and folded into
+    # the program file by a background thread once edits have been quiet for delay
+    # seconds, so a teach click costs one short append instead of a full rewrite.
+    # Appends are fsynced once per batch, syncDelay after the first unsynced edit.
+    # The file is replaced through a temp file and os.replace, and the journal's
+    # first entry holds the CRC of the file it applies to, taken by the cache when
+    # it loaded the file: a journal left by a crash is replayed on the next load, one
+    # whose CRC no longer matches was already compacted (or the file was replaced)
+    # and is dropped. Compaction failures go to onError(path, error) from the
+    # background thread.
+    def __init__(self, cache=None, delay=2.0, onError=None, syncDelay=0.25):
+        self.cache = cache
+        self.delay = delay
+        self.syncDelay = syncDelay
+        self.onError = onError
+        self.files = {}
+        self.pending = {}
+        self.unsynced = {}
+        self.compacting = set()
+        self.running = True
+        self.lock = threading.Lock()
+        self.wake = threading.Condition(self.lock)
+        if cache is not None:
+            cache.journal = self
+        self.thread = threading.Thread(target=self.compactLoop, daemon=True)
+        self.thread.start()
+
+    def record(self, path, op, row, text=""):
+        if not path:
+            return
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        key = os.path.abspath(path)
+        with self.lock:
+            # Edits to a program being rewritten wait for the new file
+            self.wake.wait_for(lambda: key not in self.compacting)
+            journal = self.files.get(key)
+            if journal is None:
+                journal = self.files[key] = self.start(key)
+            journal.write(json.dumps([op, row, text.strip()]) + "\n")
+            journal.flush()
+            now = time.monotonic()
+            self.unsynced.setdefault(key, now)
+            self.pending[key] = now
+            self.wake.notify_all()
+
+    def start(self, key):
+        # Caller holds the lock. A journal left by a crash is applied before a new one
+        # replaces it.
+        base = self.replay(key)
+        if base is not None and self.cache:
+            self.cache.touch(key, base)
+        if base is None and self.cache:
+            base = self.cache.checksum(key)
+        if base is None:
+            with open(key, "rb") as f:
+                base = binascii.crc32(f.read())
+        journal = open(key + ".journal", "w", encoding="utf-8")
+        journal.write(json.dumps(["base", base]) + "\n")
+        return journal
+
+    def flush(self, path):
+        # Bring the file up to date now, e.g. before it is loaded or opened elsewhere
+        key = os.path.abspath(path)
+        with self.lock:
+            self.wake.wait_for(lambda: key not in self.compacting)
+            self.compact(key)
+
+    def close(self):
+        with self.lock:
+            self.running = False
+            self.wake.notify_all()
+        self.thread.join()
+
+    def compactLoop(self):
+        with self.lock:
+            while self.running or self.pending:
+                now = time.monotonic()
+                for key, edited in list(self.unsynced.items()):
+                    if now - edited >= self.syncDelay:
+                        del self.unsynced[key]
+                        try:
+                            os.fsync(self.files[key].fileno())
+                        except OSError as e:
+                            if self.onError:
+                                self.onError(key, e)
+                due = [key for key, edited in self.pending.items() if now - edited >= self.delay or not self.running]
+                if not due:
+                    waits = ([self.syncDelay - (now - edited) for edited in self.unsynced.values()] +
+                             [self.delay - (now - edited) for edited in self.pending.values()])
+                    self.wake.wait(max(min(waits), 0.01) if waits else None)
+                    continue
+                for key in due:
+                    try:
+                        self.compact(key)
+                    except OSError as e:
+                        # Left in the journal, replayed when the program is next loaded
+                        if self.onError:
+                            self.onError(key, e)
+
+    def compact(self, key):
+        # Caller holds the lock. It is released while the file is rewritten, so edits
+        # to other programs carry on; edits to this one wait in record.
+        self.pending.pop(key, None)
+        self.unsynced.pop(key, None)
+        journal = self.files.pop(key, None)
+        if journal:
+            journal.close()
+        self.compacting.add(key)
+        self.lock.release()
+        try:
+            checksum = self.replay(key)
+            if checksum is not None and self.cache:
+                self.cache.touch(key, checksum)
+        finally:
+            self.lock.acquire()
+            self.compacting.discard(key)
+            self.wake.notify_all()
+
+    @staticmethod
+    def replay(key):
+        # Apply key's journal to the file; the new file's CRC if it was rewritten, else None
+        journalPath = key + ".journal"
+        try:
+            with open(journalPath, "r", encoding="utf-8") as f:
+                entries = f.read().splitlines()
+        except FileNotFoundError:
+            return None
+        with open(key, "rb") as f:
+            data = f.read()
+
+        checksum = None
+        if entries and entries[0] == json.dumps(["base", binascii.crc32(data)]):
+            binary = data[:len(ProgramContainer.magic)] == ProgramContainer.magic
+            lines = ProgramContainer(data).lines() if binary else data.decode("utf-8").splitlines()
+            for entry in entries[1:]:
+                try:
+                    op, row, text = json.loads(entry)
+                except ValueError:
+                    break  # torn final append
+                # Same clamping as CompiledProgram.insertRow / deleteRow
+                if op == "insert":
+                    lines.insert(max(0, min(row, len(lines))), text)
+                elif 0 <= row < len(lines):
+                    del lines[row]
+            if binary:
+                checksum = ProgramContainer.write(key, lines)
+            else:
+                encoded = "".join(line + "\n" for line in lines).encode("utf-8")
+                temp = key + ".tmp"
+                with open(temp, "wb") as f:
+                    f.write(encoded)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp, key)
+                checksum = binascii.crc32(encoded)
+        os.remove(journalPath)
+        return checksum
+
+
+
+class ProgramContainer:
+    # Binary form of a .ar program (".arb") for very large generated programs:
+    #   header  "<4sIQQ" magic, row count, data offset, labels offset
+    #   index   row count + 1 little-endian uint64 offsets into the data
+    #   data    each row's UTF-8 text, back to back
+    #   labels  JSON {tab: row} for the first valid "Tab Number" of each tab
+    # Files are mapped rather than read, so opening one costs the same for any size
+    # and a row is only decoded when it is asked for.
+    magic = b"ARB1"
+    header = struct.Struct("<4sIQQ")
+    span = struct.Struct("<QQ")
+
+    def __init__(self, buffer, path=""):
+        self.buffer = buffer
+        self.path = path
+        magic, self.count, self.dataStart, self.labelStart = self.header.unpack_from(buffer, 0)
+        if magic != self.magic:
+            raise ValueError(f"{path or 'buffer'} is not a binary robot program")
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(buffer, path)
+        except ValueError:
+            buffer.close()
+            raise
+
+    def __len__(self):
+        return self.count
+
+    def text(self, row):
+        if not 0 <= row < self.count:
+            raise IndexError(row)
+        start, end = self.span.unpack_from(self.buffer, self.header.size + 8 * row)
+        return self.buffer[self.dataStart + start:self.dataStart + end].decode("utf-8")
+
+    def lines(self):
+        return [self.text(row) for row in range(self.count)]
+
+    def labels(self):
+        return json.loads(self.buffer[self.labelStart:].decode("utf-8"))
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    @classmethod
+    def write(cls, path, lines):
+        data, offsets, labels = [], [0], {}
+        for row, text in enumerate(lines):
+            encoded = text.encode("utf-8")
+            data.append(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+            if text.strip()[:6] == "Tab Nu":
+                try:
+                    labels.setdefault(ProgramCompiler.compileRow(row, text).tab, row)
+                except ProgramCompileError:
+                    pass
+
+        # Returns the CRC of the file written
+        dataStart = cls.header.size + 8 * len(offsets)
+        encoded = b"".join((
+            cls.header.pack(cls.magic, len(data), dataStart, dataStart + offsets[-1]),
+            struct.pack(f"<{len(offsets)}Q", *offsets),
+            b"".join(data),
+            json.dumps(labels).encode("utf-8"),
+        ))
+        temp = path + ".tmp"
+        with open(temp, "wb") as f:
+            f.write(encoded)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+        return binascii.crc32(encoded)
+
+    @classmethod
+    def convert(cls, path):
+        # .ar to .arb or back, row for row; returns the path written
+        root, ext = os.path.splitext(path)
+        if ext.lower() == ".arb":
+            container = cls.open(path)
+            try:
+                lines = container.lines()
+            finally:
+                container.close()
+            target = root + ".ar"
+            with open(target, "w", encoding="utf-8") as f:
+                f.write("".join(line + "\n" for line in lines))
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            target = root + ".arb"
+            cls.write(target, lines)
+        return target
+
+
+class LazyInstructions:
+    # CompiledProgram.instructions for a ProgramContainer. A row is compiled the first
+    # time it is read; rows that fail go into the program's failedRows and errors as
+    # they would on a text load.
+    def __init__(self, program, container):
+        self.program = program
+        self.container = container
+        self.compiled = {}
+
+    def __len__(self):
+        return len(self.container)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self.container)
+        instruction = self.compiled.get(row)
+        if instruction is None:
+            text = self.container.text(row)
+            try:
+                instruction = ProgramCompiler.compileRow(row, text)
+                self.program.byText.setdefault(instruction.text, instruction)
+            except ProgramCompileError as e:
+                self.program.failedRows.add(row)
+                self.program.errors.append(e)
+                instruction = Instruction(row, text.strip())
+            self.compiled[row] = instruction
+        return instruction
+
+    def __iter__(self):
+        for row in range(len(self.container)):
+            yield self[row]
+
+
+
+class RobotSession:
+    # One arm: its controller and IO board links, executor, program, registers and
+    # telemetry. The executor hands each row to the app's handlers together with the
+    # session running it, so the handlers drive that arm and several arms can run
+    # programs at once; GUI controls act on app.activeSession. Vision, the error log
+    # and the program cache/journal stay on the app and are shared by every session.
+    def __init__(self, app, name, portBase=0):
+        self.app = app
+        self.name = name
+        # Recorder, replay and simulator port ids: portBase Teensy, portBase + 1 IO board
+        self.portBase = portBase
+        self.comPort = ""
+        self.com2Port = ""
+        self.ser = None
+        self.ser2 = None
+        self.teensy = None
+        self.ioBoard = None
+        self.ioWorker = None
+        self.lookahead = None
+        self.moveInProc = 0
+        # Last error a row hit, shown when the arm is selected
+        self.lastError = None
+        self.telemetry = PositionTelemetry()
+        self.registers = RegisterBank()
+        self.program = CompiledProgram()
+        self.executor = ProgramExecutor(self.program, self.runRow)
+        self.executor.subscribe(self.followExecutor)
+        self.profiler = None
+        if app.profilePath:
+            # The first robot writes profilePath, robot n "<name>.<n><ext>"
+            root, ext = os.path.splitext(app.profilePath)
+            self.profilePath = f"{root}.{portBase // 2 + 1}{ext}" if portBase else app.profilePath
+            self.profiler = RowProfiler(self.executor)
+
+    def runRow(self, row):
+        ProgExec.executeRow(self.app, self, row)
+
+    def followExecutor(self, event, *args):
+        # Called on the executor thread, whether or not the GUI shows this arm
+        if event == "error":
+            row, error = args
+            self.lastError = f"Row {row + 1} Failed - {error}"
+            if self.lookahead:
+                self.lookahead.flush()
+            if self.ioWorker:
+                self.ioWorker.interrupt()
+
+    def close(self):
+        self.executor.stop()
+        self.telemetry.detach()
+        if self.ioWorker:
+            self.ioWorker.close()
+        for link in (self.teensy, self.ioBoard):
+            if link:
+                link.close()
+        if self.profiler:
+            self.profiler.export(self.profilePath)
+
+
+
+class SplineUpload:
+    # Sends a Start Spline ... End Spline block of Move L rows as one stream. Every
+    # point is solved against the arm model before anything is written, then SL, the
+    # ML commands and SS go out in batched writes with at most window commands
+    # unanswered, so the controller always holds the next points to blend into
+    # instead of waiting a serial round trip for each one. Each reply is waited for
+    # at most timeout seconds past the estimated length of its move.
+    window = 16
+    timeout = 2.0
+
+    def __init__(self, transport, model, window=None, timeout=None):
+        self.transport = transport
+        self.model = model
+        self.window = window or self.window
+        self.timeout = timeout or self.timeout
+        self.warnings = []
+
+    @staticmethod
+    def collect(program, row):
+        # (Move L rows, End Spline row) of the block started at row, None unless it is all Move L
+        rows = []
+        for r in range(row + 1, len(program.instructions)):
+            kind = program.textAt(r)[:6]
+            if kind == "End Sp":
+                return rows, r
+            if kind != "Move L":
+                return None
+            rows.append(r)
+        return None
+
+    def check(self, commands):
+        # (index, reason) of the first point outside the joint limits, None if there is
+        # none. A point the solver finds no joints for is not proof it is out of reach,
+        # so it is listed in warnings and left for the controller to judge.
+        labels = BinaryFraming.opcodes["ML"][1]
+        seed = self.model.joints[:6]
+        self.warnings = []
+        for index, command in enumerate(commands):
+            fields = BinaryFraming.splitFields(command, labels)
+            pose = [float(fields[label]) for label in labels[:6]]
+            joints = self.model.solve(self.model.poseMatrix(pose), seed)
+            if joints is None:
+                self.warnings.append((index, "no kinematic solution found"))
+                continue
+            error = self.model.checkLimits(joints)
+            if error:
+                return index, f"joint limit {error}"
+            seed = joints
+        return None
+
+    def durations(self, commands):
+        # Estimated seconds for each point, along the straight line from the point before
+        labels = BinaryFraming.opcodes["ML"][1]
+        position = self.model.forward(self.model.joints[:6])[:3, 3]
+        for command in commands:
+            fields = BinaryFraming.splitFields(command, labels)
+            point = np.array([float(fields[label]) for label in labels[:3]])
+            yield self.model.duration(fields, 0.0, np.linalg.norm(point - position), True)
+            position = point
+
+    def send(self, commands, running=lambda: True):
+        # Reply to SS (the final position), or the first error reply. On an error, or
+        # once running() turns false, the points already written are flushed from the
+        # controller (see MotionLookahead) and no more are sent; SS still ends the block.
+        # A reply that does not come in time raises FutureTimeoutError the same way.
+        stream = ["SL\n"] + list(commands)
+        waits = [self.timeout] + [self.timeout + seconds for seconds in self.durations(commands)]
+        pending = collections.deque()
+        index = 0
+        error = None
+        while True:
+            # Top the window up once half of it has been answered
+            if len(pending) <= self.window // 2 and index < len(stream) and running():
+                batch = stream[index:index + self.window - len(pending)]
+                pending.extend(zip(self.transport.submitBatch(batch), waits[index:index + len(batch)]))
+                index += len(batch)
+            if not pending:
+                break
+            future, wait = pending.popleft()
+            try:
+                reply = future.result(wait)
+            except FutureTimeoutError:
+                self.abort(pending)
+                self.transport.submit("SS\n")
+                raise
+            if reply.startswith('E') or (pending and not running()):
+                error = reply if reply.startswith('E') else None
+                self.abort(pending)
+                break
+        reply = self.transport.send("SS\n", self.timeout)
+        return error or reply
+
+    def abort(self, pending):
+        if pending:
+            self.transport.submit(MotionLookahead.flushCommand)
+        for future, _ in pending:
+            future.cancel()
+
+
+
+class IOWorker:
+    # Runs IO board commands on a thread of its own so the motion thread never waits
+    # on the board. Commands leave in the order they were queued, each after the
+    # previous reply, so an output is set before any wait or query queued after it.
+    # Outputs and servo moves are fire-and-forget (submit), waits and queries block
+    # on their future (send). Input states are kept as number -> (state, time read).
+    #
+    # Boards that answer "IE" with "IE1" stream an "IE<n>,<0|1>" line whenever an
+    # input changes. The table is then kept by those edges: If Input reads it without
+    # a query, and Wait Input blocks on a condition until the edge arrives instead of
+    # holding the board in WI/WO. Inputs not seen yet are queried once.
+    def __init__(self, link, onError=None, events=False):
+        self.link = link
+        self.onError = onError
+        self.events = events
+        self.commands = collections.deque()
+        self.ready = threading.Condition()
+        self.inputs = {}
+        self.changed = threading.Condition()
+        self.generation = 0
+        self.running = True
+        if events:
+            link.subscribe(self.edge, prefix="IE")
+        self.thread = threading.Thread(target=self.run, name=f"{link.name} worker", daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def negotiateEvents(ser):
+        try:
+            return SerialTransport.probe(ser, "IE\n") == "IE1"
+        except (serial.SerialException, OSError):
+            return False
+
+    def submit(self, command):
+        future = Future()
+        with self.ready:
+            if not self.running:
+                future.set_exception(serial.SerialException(f"{self.link.name} worker is closed"))
+                return future
+            self.commands.append((command, future))
+            self.ready.notify()
+        return future
+
+    def send(self, command, timeout=None):
+        if self.events and command[:2] in ("WI", "WO"):
+            return self.waitInput(int(command[3:]), command[:2] == "WI", timeout)
+        return self.submit(command).result(timeout)
+
+    def input(self, number, maxAge=0.05):
+        # State of input number; without events a cached read counts for maxAge seconds
+        entry = self.inputs.get(number)
+        if entry and (self.events or time.monotonic() - entry[1] <= maxAge):
+            return entry[0]
+        return self.send(f"JFX{number}\n") == "T"
+
+    def waitInput(self, number, state, timeout=None):
+        # "Done" once input number reads state, None if interrupted or timed out. Commands
+        # queued before the wait go out first, as a WI/WO would have.
+        generation = self.generation
+        self.submit(None).result(timeout)
+        if number not in self.inputs:
+            self.input(number)
+        with self.changed:
+            reached = self.changed.wait_for(
+                lambda: self.state(number) == state or self.generation != generation or not self.running,
+                timeout,
+            )
+            if reached and self.state(number) == state:
+                return "Done"
+        return None
+
+    def state(self, number):
+        # Last known state of input number, None while it is unknown
+        entry = self.inputs.get(number)
+        return entry[0] if entry else None
+
+    def interrupt(self):
+        # Release any Wait Input blocked on an edge, e.g. when the program stops
+        with self.changed:
+            self.generation += 1
+            self.changed.notify_all()
+
+    def edge(self, payload):
+        # Reader thread: "<n>,<0|1>"
+        try:
+            number, state = payload.split(",")
+            number, state = int(number), state.strip() == "1"
+        except ValueError:
+            return
+        with self.changed:
+            self.inputs[number] = (state, time.monotonic())
+            self.changed.notify_all()
+
+    def run(self):
+        while True:
+            with self.ready:
+                while self.running and not self.commands:
+                    self.ready.wait()
+                if not self.commands:
+                    return
+                command, future = self.commands.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            if command is None:
+                # Marker from waitInput, everything queued before it has been answered
+                future.set_result(None)
+                continue
+            try:
+                reply = self.link.send(command)
+            except Exception as e:
+                future.set_exception(e)
+                if self.onError:
+                    self.onError(command, e)
+                continue
+            self.remember(command, reply)
+            future.set_result(reply)
+
+    def remember(self, command, reply):
+        code = command[:2]
+        if code == "JF":
+            number, state = int(command[3:].split("T")[0]), reply == "T"
+        elif code in ("WI", "WO"):
+            number, state = int(command[3:]), code == "WI"
+        else:
+            return
+        with self.changed:
+            # With events on, an edge that arrived meanwhile is newer than this reply
+            if not (self.events and number in self.inputs):
+                self.inputs[number] = (state, time.monotonic())
+                self.changed.notify_all()
+
+    def close(self):
+        # Commands already queued still go out before the thread ends
+        with self.ready:
+            self.running = False
+            self.ready.notify()
+        self.interrupt()
+
 
 ## Run the application ##
 if __name__ == "__main__":
-    app = RobotArmApp()
+    parser = argparse.ArgumentParser(description="Robot Arm Software")
+    parser.add_argument("--record", metavar="LOG", help="record controller and IO board traffic to LOG")
+    parser.add_argument("--replay", metavar="LOG", help="use a recorded session instead of the serial ports")
+    parser.add_argument("--fast", action="store_true", help="replay without the recorded delays")
+    parser.add_argument("--sim-speed", type=float, default=1.0, metavar="SCALE",
+                        help="time scale for simulated moves on SIM ports, 0 answers immediately")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="profile executed rows and write the summary to FILE (.csv or .json) on exit")
+    parser.add_argument("--estimate", metavar="PROGRAM",
+                        help="print the predicted cycle time of PROGRAM with the default arm model and exit")
+    parser.add_argument("--convert", metavar="PROGRAM",
+                        help="convert PROGRAM between the text (.ar) and binary (.arb) formats and exit")
+    args = parser.parse_args()
+
+    if args.convert:
+        print(ProgramContainer.convert(args.convert))
+        sys.exit(0)
+
+    if args.estimate:
+        programs = ProgramCache()
+        try:
+            program = programs.get(args.estimate)
+        except FileNotFoundError:
+            sys.exit(f"Program not found: {args.estimate}")
+        estimate = CycleTimeEstimator(ArmModel(), programs).estimate(program)
+        print(estimate.report())
+        sys.exit(0)
+
+    app = RobotArmApp(args.record, args.replay, not args.fast, args.sim_speed, args.profile)
     app.root.mainloop()